@@ -0,0 +1,198 @@
+# audio_decode.py
+"""在后台线程中用 QAudioDecoder 解码音频，把单声道 float32 PCM 分块交给接收器（sink）。
+
+接收器是任意带有以下方法的对象，方法都在工作线程中调用：
+    begin(sample_rate)   收到第一块数据前调用一次
+    feed(samples)        每块单声道 float32 样本（numpy 数组）
+    finish()             解码完成，返回值通过 finished 信号送回界面线程
+"""
+import numpy as np
+
+from PySide6.QtCore import QObject, QThread, QUrl, Signal, Slot
+from PySide6.QtMultimedia import QAudioDecoder, QAudioFormat
+
+# 请求解码器输出的格式：单声道 float，采样率对波形和起音分析都足够
+DECODE_SAMPLE_RATE = 22050
+
+_SCALES = {
+    QAudioFormat.SampleFormat.UInt8: (np.uint8, 128.0, 128.0),
+    QAudioFormat.SampleFormat.Int16: (np.int16, 0.0, 32768.0),
+    QAudioFormat.SampleFormat.Int32: (np.int32, 0.0, 2147483648.0),
+    QAudioFormat.SampleFormat.Float: (np.float32, 0.0, 1.0),
+}
+
+
+def buffer_to_mono(buffer):
+    """把 QAudioBuffer 转换为单声道 float32 数组；后端不支持请求的格式时在这里转换"""
+    fmt = buffer.format()
+    dtype, offset, scale = _SCALES[fmt.sampleFormat()]
+    channels = max(1, fmt.channelCount())
+    data = np.frombuffer(buffer.constData(), dtype=dtype, count=buffer.byteCount() // np.dtype(dtype).itemsize)
+    samples = data.astype(np.float32)
+    if offset:
+        samples -= offset
+    if scale != 1.0:
+        samples /= scale
+    if channels > 1:
+        frames = len(samples) // channels
+        samples = samples[:frames * channels].reshape(frames, channels).mean(axis=1)
+    return samples
+
+
+class AudioDecodeWorker(QObject):
+    """运行在独立 QThread 中的解码任务。通过 start_decode() 创建"""
+    progress = Signal(float)      # 0..1，解码器不知道时长时不发出
+    finished = Signal(object)     # sink.finish() 的返回值，被取消时为 None
+    failed = Signal(str)
+
+    def __init__(self, path, sink):
+        super().__init__()
+        self.path = path
+        self.sink = sink
+        self.decoder = None
+        self._cancelled = False
+        self._began = False
+
+    @Slot()
+    def run(self):
+        """在工作线程中执行：先给接收器机会跳过解码（如命中缓存），再启动解码器"""
+        prepare = getattr(self.sink, "prepare", None)
+        if prepare is not None:
+            try:
+                result = prepare(self.path)
+            except (OSError, ValueError) as e:
+                self.failed.emit(str(e))
+                return
+            if result is not None:
+                self.finished.emit(result)
+                return
+
+        # 解码器必须在工作线程中创建，它的信号才会在这里处理
+        self.decoder = QAudioDecoder(self)
+        fmt = QAudioFormat()
+        fmt.setSampleRate(DECODE_SAMPLE_RATE)
+        fmt.setChannelCount(1)
+        fmt.setSampleFormat(QAudioFormat.SampleFormat.Float)
+        self.decoder.setAudioFormat(fmt)
+        self.decoder.bufferReady.connect(self._on_buffer_ready)
+        self.decoder.finished.connect(self._on_finished)
+        self.decoder.error.connect(self._on_error)
+        self.decoder.setSource(QUrl.fromLocalFile(self.path))
+        self.decoder.start()
+
+    def cancel(self):
+        """可在任意线程调用；下一块数据到达时停止解码"""
+        self._cancelled = True
+
+    def _on_buffer_ready(self, *args):
+        decoder = self.decoder
+        buffer = decoder.read()
+        if self._cancelled:
+            decoder.stop()
+            self.finished.emit(None)
+            return
+        if not buffer.isValid():
+            return
+        if not self._began:
+            self.sink.begin(buffer.format().sampleRate())
+            self._began = True
+        self.sink.feed(buffer_to_mono(buffer))
+        duration = decoder.duration()
+        if duration > 0:
+            self.progress.emit(min(1.0, decoder.position() / duration))
+
+    def _on_finished(self):
+        if self._cancelled or not self._began:
+            self.finished.emit(None)
+            return
+        self.finished.emit(self.sink.finish())
+
+    def _on_error(self, *args):
+        self.failed.emit(self.decoder.errorString())
+
+
+def start_decode(path, sink, parent=None):
+    """在新线程中解码 path，返回 (线程, 任务)。
+
+    调用方连接 worker.finished / worker.failed 即可；线程在任务结束后自动退出并释放。
+    """
+    thread = QThread(parent)
+    worker = AudioDecodeWorker(path, sink)
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    worker.finished.connect(thread.quit)
+    worker.failed.connect(thread.quit)
+    thread.finished.connect(worker.deleteLater)
+    thread.finished.connect(thread.deleteLater)
+    thread.start()
+    return thread, worker
+
+
+class DecodeJob(QObject):
+    """对音频文件运行某种接收器（波形、起音分析等），同一时间只保留最新一次请求。
+
+    sink_factory 每次请求创建一个新的接收器。旧请求被新请求取代后，它的结果和进度都会被丢弃。
+    """
+    loaded = Signal(str, object)   # 音频路径, sink.finish() 的返回值
+    progress = Signal(float)
+    failed = Signal(str, str)      # 音频路径, 错误信息
+
+    def __init__(self, sink_factory, parent=None):
+        super().__init__(parent)
+        self.sink_factory = sink_factory
+        self._worker = None
+        self._thread = None
+        self._path = None
+
+    def is_running(self):
+        return self._worker is not None
+
+    def load(self, audio_path):
+        self.cancel()
+        self._path = audio_path
+        self._thread, worker = start_decode(audio_path, self.sink_factory(), self)
+        # 连接到本对象的方法（而不是 lambda），槽函数才会排队到界面线程执行
+        worker.finished.connect(self._on_finished)
+        worker.failed.connect(self._on_failed)
+        worker.progress.connect(self._on_progress)
+        self._worker = worker
+
+    def cancel(self):
+        if self._worker is not None:
+            try:
+                self._worker.cancel()
+            except RuntimeError:
+                pass  # 任务已结束并被释放
+            self._worker = None
+
+    def wait(self, msecs=2000):
+        """退出前调用：停止解码线程并等待其结束"""
+        self.cancel()
+        if self._thread is not None:
+            try:
+                self._thread.quit()
+                self._thread.wait(msecs)
+            except RuntimeError:
+                pass
+            self._thread = None
+
+    def _is_current(self):
+        return self._worker is not None and self.sender() is self._worker
+
+    @Slot(object)
+    def _on_finished(self, result):
+        if self._is_current():
+            self._worker = None
+            if result is not None:
+                self.loaded.emit(self._path, result)
+
+    @Slot(str)
+    def _on_failed(self, message):
+        if self._is_current():
+            self._worker = None
+            self.failed.emit(self._path, message)
+
+    @Slot(float)
+    def _on_progress(self, fraction):
+        if self._is_current():
+            self.progress.emit(fraction)
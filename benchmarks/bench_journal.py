@@ -0,0 +1,93 @@
+# benchmarks/bench_journal.py
+"""恢复日志基准：每次修改在界面线程上的开销、日志大小，以及压缩前后的重放耗时；
+另外检查保存、修改、重放的往返结果（保存的文件重新解析后行的顺序会变）
+
+用法: python -m benchmarks.bench_journal [行数 ...]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+import journal
+from lrc import Lrc, LyricLine
+from benchmarks.lrc_gen import generate_lrc
+
+_EDITS = 5000
+
+
+def _edit(lyrics, rng, i):
+    row = rng.randrange(len(lyrics))
+    kind = i % 4
+    if kind == 0:
+        lyrics.set(row, 'ts', rng.uniform(0, 300))
+    elif kind == 1:
+        lyrics.set(row, 'original', f"edited {i}")
+    elif kind == 2:
+        lyrics.insert_lines(row, lyrics[row:row + 1])
+    else:
+        del lyrics[row]
+
+
+def _run(n, compact_records):
+    """返回 (每次修改的界面线程耗时, 日志大小, 重放耗时)"""
+    journal.COMPACT_RECORDS = compact_records
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "song.lrc")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(generate_lrc(n, "bilingual"))
+        lrc = Lrc()
+        lrc.parse_from_file(path)
+        log = journal.RecoveryJournal(directory, lrc)
+        log.start(path, parsed=True)
+        rng = random.Random(1)
+        start = time.perf_counter()
+        for i in range(_EDITS):
+            _edit(lrc.lyrics, rng, i)
+        t_edit = (time.perf_counter() - start) / _EDITS
+        expected = (list(lrc.lyrics.rows()), dict(lrc.meta))
+        log.close(discard=False)
+        size = os.path.getsize(log.path)
+
+        start = time.perf_counter()
+        recovered = journal.RecoveredSession(log.path).replay()
+        t_replay = time.perf_counter() - start
+        assert (list(recovered.lyrics.rows()), recovered.meta) == expected
+    return t_edit, size, t_replay
+
+
+def _check_save_round_trip():
+    """保存含未定时行、乱序行和空行的文档后继续修改，崩溃恢复应得到编辑器中的内容"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "song.lrc")
+        lrc = Lrc()
+        lrc.lyrics.extend([LyricLine(3.0, "c"), LyricLine(1.0, "a"), LyricLine(None, "b"),
+                           LyricLine(1.0, "a2"), LyricLine(2.0, "")])
+        lrc.save_to_file(path)
+        log = journal.RecoveryJournal(directory, lrc)
+        log.start(path)
+        lrc.lyrics.set(0, 'original', "c-edited")
+        lrc.lyrics.set(2, 'ts', 4.0)
+        del lrc.lyrics[3]
+        expected = (list(lrc.lyrics.rows()), dict(lrc.meta))
+        log.close(discard=False)
+        recovered = journal.RecoveredSession(log.path).replay()
+        assert (list(recovered.lyrics.rows()), recovered.meta) == expected, recovered.lyrics
+
+
+def main(argv):
+    _check_save_round_trip()
+    sizes = [int(a) for a in argv] or [2000, 20000]
+    default = journal.COMPACT_RECORDS
+    print(f"{'lines':>8}{'compact@':>10}{'edit us':>9}{'journal KB':>12}{'replay ms':>11}")
+    for n in sizes:
+        # 默认上限下 5000 次修改不会触发压缩；上限调低后日志只保留最近一份快照之后的修改
+        for limit in (default, 500):
+            t_edit, size, t_replay = _run(n, limit)
+            print(f"{n:>8}{limit:>10}{t_edit * 1e6:>9.1f}{size / 1024:>12.0f}{t_replay * 1000:>11.1f}")
+    journal.COMPACT_RECORDS = default
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,54 @@
+# benchmarks/bench_memory.py
+"""歌词存储内存基准：旧版 list-of-dicts 与 LyricList 的 tracemalloc 对比，以及撤销快照耗时
+
+用法: python -m benchmarks.bench_memory [行数 ...]
+"""
+import copy
+import sys
+import time
+import tracemalloc
+
+from lrc import Lrc
+from benchmarks.legacy import legacy_parse
+from benchmarks.lrc_gen import generate_lrc
+
+
+def _traced(build):
+    """返回 (对象, 构建后仍占用的字节数)"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    obj = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return obj, size
+
+
+def _copy_time(obj):
+    start = time.perf_counter()
+    copy.deepcopy(obj)
+    return time.perf_counter() - start
+
+
+def main(argv):
+    sizes = [int(a) for a in argv] or [10000, 100000]
+    print(f"{'lines':>8}{'dicts MB':>11}{'LyricList MB':>14}{'saving':>8}"
+          f"{'dict copy ms':>14}{'list copy ms':>14}")
+    for n in sizes:
+        text = generate_lrc(n, "single")
+        # 两种结构共享同样的字符串对象，只比较容器本身的开销
+        _, rows = legacy_parse(text)
+        lrc = Lrc()
+        lrc.parse_from_text(text)
+        for line, row in zip(lrc.lyrics.rows(), rows):
+            row['original'], row['translated'] = line[1], line[2]
+
+        dicts, dict_bytes = _traced(lambda: [dict(row) for row in rows])
+        compact, compact_bytes = _traced(lambda: lrc.lyrics[:])
+        print(f"{len(rows):>8}{dict_bytes / 1e6:>11.2f}{compact_bytes / 1e6:>14.2f}"
+              f"{dict_bytes / max(compact_bytes, 1):>7.1f}x"
+              f"{_copy_time(dicts) * 1000:>14.1f}{_copy_time(compact) * 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
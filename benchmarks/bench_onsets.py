@@ -0,0 +1,78 @@
+# benchmarks/bench_onsets.py
+"""打轴建议基准：对合成的整张专辑长度音频做起音分析的耗时与准确度
+
+音频按解码器的块大小（4096 样本）逐块送入 OnsetAccumulator，只统计分析本身，
+不含解码。合成乐句的真实起点已知，同时报告在 ±60 ms 内命中的比例。
+
+用法: python -m benchmarks.bench_onsets [分钟数 ...]
+"""
+import sys
+import time
+
+import numpy as np
+
+from onsets import OnsetAccumulator
+
+SAMPLE_RATE = 22050
+CHUNK = 4096
+
+
+def synth_chunks(minutes, seed=0):
+    """生成带底噪的“人声”乐句（谐波音 + 起音包络，句间停顿），返回 (块迭代器, 真实起点)"""
+    rng = np.random.default_rng(seed)
+    total = int(minutes * 60 * SAMPLE_RATE)
+    starts = []
+    t = 2.0
+    while t < minutes * 60 - 4:
+        starts.append(t)
+        t += rng.uniform(2.0, 4.0) + rng.uniform(0.8, 1.5)
+
+    def chunks():
+        phrase = 0
+        for offset in range(0, total, CHUNK):
+            n = min(CHUNK, total - offset)
+            out = rng.normal(0, 0.01, n).astype(np.float32)
+            times = (offset + np.arange(n)) / SAMPLE_RATE
+            # 当前块可能跨越的乐句
+            while phrase < len(starts) and starts[phrase] + 4.0 < times[0]:
+                phrase += 1
+            for p in range(phrase, min(phrase + 2, len(starts))):
+                tt = times - starts[p]
+                mask = (tt >= 0) & (tt < 2.5)
+                if mask.any():
+                    tt = tt[mask]
+                    f = 200 + 37 * (p % 11)
+                    env = np.minimum(1, tt * 20) * np.exp(-tt * 0.3)
+                    out[mask] += 0.3 * env * (np.sin(2 * np.pi * f * tt) + 0.5 * np.sin(4 * np.pi * f * tt))
+            yield out
+    return chunks(), np.array(starts)
+
+
+def main(argv):
+    durations = [float(a) for a in argv] or [4, 60]
+    print(f"{'minutes':>8}{'synth s':>9}{'analyze s':>11}{'x realtime':>12}{'phrases':>9}{'hit@60ms':>10}")
+    for minutes in durations:
+        chunks, truth = synth_chunks(minutes)
+        t0 = time.perf_counter()
+        data = list(chunks)
+        t_synth = time.perf_counter() - t0
+
+        acc = OnsetAccumulator()
+        acc.begin(SAMPLE_RATE)
+        start = time.perf_counter()
+        for chunk in data:
+            acc.feed(chunk)
+        found = acc.finish()
+        elapsed = time.perf_counter() - start
+
+        hit = 0.0
+        if len(truth) and len(found):
+            idx = np.clip(np.searchsorted(found.times, truth), 1, len(found.times) - 1)
+            err = np.minimum(np.abs(found.times[idx] - truth), np.abs(found.times[idx - 1] - truth))
+            hit = float((err < 0.06).mean())
+        print(f"{minutes:>8g}{t_synth:>9.2f}{elapsed:>11.2f}{minutes * 60 / elapsed:>12.0f}"
+              f"{len(truth):>9}{hit:>10.1%}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,45 @@
+# benchmarks/bench_parse.py
+"""解析吞吐量基准：对比旧版解析器与 Lrc.parse_from_text（行/秒）
+
+用法: python -m benchmarks.bench_parse [行数 ...]
+"""
+import sys
+import time
+
+from lrc import Lrc
+from benchmarks.legacy import legacy_parse
+from benchmarks.lrc_gen import generate_lrc
+
+KINDS = ("bilingual", "single", "multi_tag", "untimed", "disordered")
+
+
+def _best_of(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv):
+    sizes = [int(a) for a in argv] or [1000, 10000, 100000]
+    print(f"{'kind':<11}{'lines':>8}{'legacy l/s':>14}{'new l/s':>14}{'speedup':>9}")
+    for n in sizes:
+        for kind in KINDS:
+            text = generate_lrc(n, kind)
+            line_count = text.count('\n') + 1
+            lrc = Lrc()
+            lrc.parse_from_text(text)
+            # 结果必须与旧实现一致
+            _, expected = legacy_parse(text)
+            assert list(lrc.lyrics.rows()) == \
+                   [(l['ts'], l['original'], l['translated']) for l in expected], kind
+            t_old = _best_of(lambda: legacy_parse(text))
+            t_new = _best_of(lambda: lrc.parse_from_text(text))
+            print(f"{kind:<11}{line_count:>8}{line_count / t_old:>14,.0f}"
+                  f"{line_count / t_new:>14,.0f}{t_old / t_new:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
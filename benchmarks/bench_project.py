@@ -0,0 +1,51 @@
+# benchmarks/bench_project.py
+"""工程文件基准：重新解析 LRC 与内存映射读取工程文件的耗时对比
+
+用法: python -m benchmarks.bench_project [行数 ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from lrc import Lrc
+from project import Project, read_project, write_project
+from benchmarks.lrc_gen import generate_lrc
+
+
+def _best(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv):
+    sizes = [int(a) for a in argv] or [5000, 50000]
+    print(f"{'lines':>8}{'kind':>11}{'lrc KB':>8}{'proj KB':>9}{'parse ms':>10}{'mmap ms':>9}{'save ms':>9}")
+    for n in sizes:
+        for kind in ("bilingual", "words"):
+            with tempfile.TemporaryDirectory() as directory:
+                lrc_path = os.path.join(directory, "song.lrc")
+                project_path = os.path.join(directory, "song.lrcproj")
+                with open(lrc_path, 'w', encoding='utf-8') as f:
+                    f.write(generate_lrc(n, kind))
+
+                def parse():
+                    lrc = Lrc()
+                    lrc.parse_from_file(lrc_path)
+                    return lrc
+
+                t_parse, lrc = _best(parse)
+                t_save, _ = _best(lambda: write_project(project_path, Project(lrc, lrc_path)))
+                t_read, project = _best(lambda: read_project(project_path))
+                assert project.lrc.lyrics == lrc.lyrics and project.lrc.meta == lrc.meta
+                print(f"{n:>8}{kind:>11}{os.path.getsize(lrc_path) / 1024:>8.0f}"
+                      f"{os.path.getsize(project_path) / 1024:>9.0f}{t_parse * 1000:>10.1f}"
+                      f"{t_read * 1000:>9.1f}{t_save * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,86 @@
+# benchmarks/bench_rows.py
+"""表格行高基准：整份重载后 resizeRowsToContents 与 LazyRowSizer 的耗时
+
+在 offscreen 平台上创建真实的 QTableView，测量“重置模型 + 计算行高”的总耗时，
+以及之后修改一行文字再重新计算行高的耗时。
+
+用法: python -m benchmarks.bench_rows [行数 ...]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication, QTableView
+
+from lrc import Lrc
+from lyrics_model import LyricsTableModel
+from row_sizer import LazyRowSizer
+from benchmarks.lrc_gen import generate_lrc
+
+
+def _make_view(lrc):
+    model = LyricsTableModel(lrc)
+    view = QTableView()
+    view.setModel(model)
+    view.resize(800, 600)
+    view.show()
+    QApplication.processEvents()
+    return model, view
+
+
+def _reload(model, lrc, text):
+    with model.resetting():
+        lrc.parse_from_text(text)
+
+
+def bench_eager(text):
+    lrc = Lrc()
+    model, view = _make_view(lrc)
+    start = time.perf_counter()
+    _reload(model, lrc, text)
+    view.resizeRowsToContents()
+    rebuild = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model.set_value(5, 'original', "edited " * 20)
+    view.resizeRowsToContents()
+    edit = time.perf_counter() - start
+    view.close()
+    return rebuild, edit
+
+
+def bench_lazy(text):
+    lrc = Lrc()
+    model, view = _make_view(lrc)
+    sizer = LazyRowSizer(view)
+    start = time.perf_counter()
+    _reload(model, lrc, text)
+    sizer.size_visible_rows()
+    rebuild = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model.set_value(5, 'original', "edited " * 20)
+    sizer.size_visible_rows()
+    edit = time.perf_counter() - start
+    view.close()
+    return rebuild, edit
+
+
+def main(argv):
+    sizes = [int(a) for a in argv] or [10000, 100000]
+    app = QApplication.instance() or QApplication(sys.argv)
+    print(f"{'rows':>8}{'eager rebuild ms':>18}{'lazy rebuild ms':>17}"
+          f"{'eager edit ms':>15}{'lazy edit ms':>14}")
+    for n in sizes:
+        text = generate_lrc(n, "bilingual")
+        eager_rebuild, eager_edit = bench_eager(text)
+        lazy_rebuild, lazy_edit = bench_lazy(text)
+        print(f"{n:>8}{eager_rebuild * 1000:>18.1f}{lazy_rebuild * 1000:>17.1f}"
+              f"{eager_edit * 1000:>15.1f}{lazy_edit * 1000:>14.2f}")
+    return app
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,54 @@
+# benchmarks/bench_save.py
+"""保存基准：旧版 to_lrc_string + open('w') 与流式原子写入 Lrc.save_to_file 的耗时和峰值内存
+
+用法: python -m benchmarks.bench_save [行数 ...]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from lrc import Lrc
+from benchmarks.lrc_gen import generate_lrc
+
+
+def _legacy_save(lrc, path, separated):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(lrc.to_lrc_string(separated))
+
+
+def _measure(fn):
+    # 计时与内存分开测量，避免 tracemalloc 的开销影响耗时
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(argv):
+    sizes = [int(a) for a in argv] or [10000, 100000]
+    print(f"{'rows':>8}{'mode':>11}{'legacy ms':>11}{'legacy MB':>11}{'atomic ms':>11}{'atomic MB':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.lrc")
+        for n in sizes:
+            lrc = Lrc()
+            lrc.parse_from_text(generate_lrc(n, "bilingual"))
+            for separated in (True, False):
+                t_old, m_old = _measure(lambda: _legacy_save(lrc, path, separated))
+                with open(path, encoding='utf-8') as f:
+                    expected = f.read()
+                t_new, m_new = _measure(lambda: lrc.save_to_file(path, separated))
+                with open(path, encoding='utf-8') as f:
+                    assert f.read() == expected
+                mode = "separated" if separated else "single"
+                print(f"{len(lrc.lyrics):>8}{mode:>11}{t_old * 1000:>11.1f}{m_old / 1e6:>11.2f}"
+                      f"{t_new * 1000:>11.1f}{m_new / 1e6:>11.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,59 @@
+# benchmarks/bench_search.py
+"""查找基准：三元组索引的建立耗时、逐字输入时每次查询的耗时，与逐行扫描对比
+
+用法: python -m benchmarks.bench_search [行数 ...]
+"""
+import sys
+import time
+
+from lrc import Lrc, LyricLine
+from search_index import TextSearchIndex
+from benchmarks.lrc_gen import generate_lrc
+
+# 模拟边输入边查找：每个前缀都查询一次
+_QUERIES = ("heart sky", "君の 声", "dream")
+
+
+def _scan(lyrics, query):
+    folded = query.lower()
+    return [row for row, (_, original, translated) in enumerate(lyrics.rows())
+            if folded in original.lower() or folded in translated.lower()]
+
+
+def _per_keystroke(search, query):
+    start = time.perf_counter()
+    for i in range(1, len(query) + 1):
+        search(query[:i])
+    return (time.perf_counter() - start) / len(query)
+
+
+def main(argv):
+    sizes = [int(a) for a in argv] or [5000, 50000]
+    print(f"{'lines':>8}{'build ms':>10}{'index ms/key':>14}{'scan ms/key':>13}{'edit us':>9}")
+    for n in sizes:
+        lrc = Lrc()
+        lrc.parse_from_text(generate_lrc(n, "single"))
+        lyrics = lrc.lyrics
+        index = TextSearchIndex(lyrics)
+        start = time.perf_counter()
+        index.rebuild()
+        t_build = time.perf_counter() - start
+
+        fields = ('original', 'translated')
+        t_index = sum(_per_keystroke(lambda q: index.search(q, fields), q) for q in _QUERIES) / len(_QUERIES)
+        t_scan = sum(_per_keystroke(lambda q: _scan(lyrics, q), q) for q in _QUERIES) / len(_QUERIES)
+        for query in _QUERIES:
+            assert index.search(query, fields) == _scan(lyrics, query)
+
+        # 增量维护：修改单元格、插入和删除行
+        start = time.perf_counter()
+        for i in range(200):
+            lyrics.set(i, 'original', f"edited line {i}")
+            lyrics.insert_lines(i, [LyricLine(None, "inserted")])
+            del lyrics[i]
+        t_edit = (time.perf_counter() - start) / 600
+        print(f"{n:>8}{t_build * 1000:>10.1f}{t_index * 1000:>14.2f}{t_scan * 1000:>13.2f}{t_edit * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,54 @@
+# benchmarks/bench_startup.py
+"""启动耗时基准：在全新的解释器进程中测量创建 Lrc 的耗时
+
+旧版每个 Lrc 在 __init__ 中导入并构造 pykakasi.kakasi()，这里用同样的调用模拟旧行为。
+
+用法: python -m benchmarks.bench_startup [重复次数]
+"""
+import os
+import subprocess
+import sys
+
+SNIPPETS = {
+    "legacy: import + kakasi() per Lrc": (
+        "import lrc, pykakasi\n"
+        "for _ in range(10):\n"
+        "    lrc.Lrc(); pykakasi.kakasi()\n"
+    ),
+    "lazy: 10 x Lrc()": (
+        "import lrc\n"
+        "for _ in range(10):\n"
+        "    lrc.Lrc()\n"
+    ),
+    "lazy: 10 x Lrc() + first romaji": (
+        "import lrc\n"
+        "docs = [lrc.Lrc() for _ in range(10)]\n"
+        "docs[0].convert_to_romaji('君の声')\n"
+    ),
+}
+
+_TIMER = (
+    "import time\n"
+    "_t0 = time.perf_counter()\n"
+    "{body}"
+    "print(time.perf_counter() - _t0)\n"
+)
+
+
+def _run(body):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", _TIMER.format(body=body)], cwd=root,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv):
+    repeat = int(argv[0]) if argv else 5
+    print(f"{'scenario':<36}{'best ms':>10}")
+    for name, body in SNIPPETS.items():
+        best = min(_run(body) for _ in range(repeat))
+        print(f"{name:<36}{best * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,52 @@
+# benchmarks/bench_timeline.py
+"""播放行查找基准：旧版线性扫描与 TimelineIndex 二分查找的单次 tick 耗时
+
+用法: python -m benchmarks.bench_timeline [行数 ...]
+"""
+import random
+import sys
+import time
+
+from lrc import Lrc
+from benchmarks.lrc_gen import generate_lrc
+
+TICKS = 2000
+
+
+def legacy_find_current_play_row(lyrics, current_sec):
+    """旧版 MainWindow.find_current_play_row 的逻辑"""
+    target_idx = -1
+    for i, ts in enumerate(lyrics.timestamps):
+        if ts != ts:
+            continue
+        if current_sec >= ts:
+            target_idx = i
+        else:
+            break
+    return target_idx
+
+
+def _per_tick(fn, positions):
+    start = time.perf_counter()
+    for pos in positions:
+        fn(pos)
+    return (time.perf_counter() - start) / len(positions)
+
+
+def main(argv):
+    sizes = [int(a) for a in argv] or [1000, 10000, 100000]
+    rng = random.Random(0)
+    print(f"{'rows':>8}{'linear us/tick':>16}{'index us/tick':>15}")
+    for n in sizes:
+        lrc = Lrc()
+        lrc.parse_from_text(generate_lrc(n, "single"))
+        end = lrc.lyrics.timestamps[-1]
+        positions = [rng.uniform(0, end) for _ in range(TICKS)]
+        index = lrc.timeline
+        t_old = _per_tick(lambda p: legacy_find_current_play_row(lrc.lyrics, p), positions)
+        t_new = _per_tick(index.active_row, positions)
+        print(f"{n:>8}{t_old * 1e6:>16.1f}{t_new * 1e6:>15.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,56 @@
+# benchmarks/bench_words.py
+"""逐字时间基准：增强型LRC的解析、保存耗时，以及逐字时间列的内存占用
+
+用法: python -m benchmarks.bench_words [行数 ...]
+"""
+import sys
+import time
+import tracemalloc
+
+from lrc import Lrc
+from benchmarks.lrc_gen import generate_lrc
+
+
+def _parse(text):
+    lrc = Lrc()
+    lrc.parse_from_text(text)
+    return lrc
+
+
+def main(argv):
+    sizes = [int(a) for a in argv] or [1000, 20000]
+    print(f"{'lines':>8}{'words':>9}{'plain ms':>10}{'tagged ms':>11}{'save ms':>9}"
+          f"{'column KB':>11}{'B/word':>8}{'round trip':>12}")
+    for n in sizes:
+        plain = generate_lrc(n, "single")
+        tagged = generate_lrc(n, "words")
+
+        start = time.perf_counter()
+        _parse(plain)
+        t_plain = time.perf_counter() - start
+
+        start = time.perf_counter()
+        lrc = _parse(tagged)
+        t_tagged = time.perf_counter() - start
+
+        start = time.perf_counter()
+        text = lrc.to_lrc_string()
+        t_save = time.perf_counter() - start
+
+        # 逐字时间列单独复制一份，测量它自身占用的内存
+        column = lrc.lyrics.word_timings
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        copied = [words[:] if words is not None else None for words in column]
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+        n_words = sum(len(words) // 2 for words in copied if words is not None)
+
+        same = _parse(text).lyrics == lrc.lyrics
+        print(f"{len(lrc.lyrics):>8}{n_words:>9}{t_plain * 1000:>10.1f}{t_tagged * 1000:>11.1f}"
+              f"{t_save * 1000:>9.1f}{size / 1024:>11.1f}{size / max(n_words, 1):>8.1f}{str(same):>12}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
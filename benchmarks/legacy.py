@@ -0,0 +1,60 @@
+# benchmarks/legacy.py
+"""旧版解析器的原样副本，仅用作基准测试和结果对照"""
+import re
+from collections import defaultdict
+
+
+def legacy_parse(text):
+    """返回 (meta, lyrics)，lyrics 为 [{'ts', 'original', 'translated'}, ...]"""
+    meta = {"ti": "", "ar": "", "al": ""}
+    lyrics = []
+    time_map = defaultdict(list)
+    unstimed_lyrics = []
+
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+
+        meta_match = re.match(r'\[(ti|ar|al):(.*?)\]', line)
+        if meta_match:
+            key, value = meta_match.groups()
+            meta[key.strip()] = value.strip()
+            continue
+
+        time_tags_matches = re.findall(r'\[(\d{2,}):(\d{2,})\.(\d{2,3})\]', line)
+        lyric_text = line[line.rfind(']') + 1:].strip() if ']' in line else line
+
+        if time_tags_matches:
+            for m, s, fraction in time_tags_matches:
+                minutes = int(m)
+                seconds = int(s)
+                if len(fraction) == 3:
+                    centiseconds = int(fraction) // 10
+                else:
+                    centiseconds = int(fraction)
+                ts = minutes * 60 + seconds + centiseconds / 100.0
+                time_map[ts].append(lyric_text)
+        elif lyric_text:
+            unstimed_lyrics.append(lyric_text)
+
+    for ts in sorted(time_map.keys()):
+        lyrics_at_ts = time_map[ts]
+        original = ""
+        translated = ""
+        if len(lyrics_at_ts) >= 2:
+            original = lyrics_at_ts[0]
+            translated = lyrics_at_ts[1]
+        elif len(lyrics_at_ts) == 1:
+            parts = re.split(r'\s*[/|]\s*', lyrics_at_ts[0], maxsplit=1)
+            original = parts[0]
+            if len(parts) > 1:
+                translated = parts[1]
+        lyrics.append({'ts': ts, 'original': original, 'translated': translated})
+
+    for text_line in unstimed_lyrics:
+        parts = re.split(r'\s*[/|]\s*', text_line, maxsplit=1)
+        original = parts[0]
+        translated = parts[1] if len(parts) > 1 else ""
+        lyrics.append({'ts': None, 'original': original, 'translated': translated})
+    return meta, lyrics
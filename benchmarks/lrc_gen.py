@@ -0,0 +1,67 @@
+# benchmarks/lrc_gen.py
+"""合成LRC文本生成器，供基准测试使用"""
+import random
+
+_WORDS = ["夜空", "ひかり", "君の", "声", "love", "dream", "星", "遠く", "風", "歌",
+          "明日", "heart", "涙", "sky", "永远", "心", "light", "走って", "世界", "time"]
+
+
+def _sentence(rng, n_words):
+    return " ".join(rng.choice(_WORDS) for _ in range(n_words))
+
+
+def _tag(ts):
+    minutes = int(ts // 60)
+    seconds = ts - minutes * 60
+    return f"[{minutes:02d}:{seconds:05.2f}]"
+
+
+def _word_tagged(rng, ts, n_words):
+    """增强型LRC：每个词前带 <mm:ss.xx> 标签，行尾带结束标签"""
+    parts = []
+    for _ in range(n_words):
+        parts.append(f"<{_tag(ts)[1:-1]}>{rng.choice(_WORDS)} ")
+        ts += rng.uniform(0.2, 0.6)
+    return "".join(parts).rstrip() + f"<{_tag(ts)[1:-1]}>"
+
+
+def generate_lrc(n_lines, kind="bilingual", seed=0):
+    """生成约 n_lines 行歌词的LRC文本。
+
+    kind:
+      - "bilingual":  分行双语（同一时间戳两行）
+      - "single":     单行 '/' 分隔双语
+      - "multi_tag":  一行带多个时间标签（副歌复用）
+      - "untimed":    纯文本，无时间戳
+      - "disordered": 时间戳局部乱序
+      - "words":      增强型LRC，逐词时间标签
+    """
+    rng = random.Random(seed)
+    out = ["[ti:Benchmark]", "[ar:Synthetic]", "[al:LRC Gen]", "[by:bench]", "[offset:0]"]
+    ts = 0.0
+    i = 0
+    while i < n_lines:
+        ts += rng.uniform(1.0, 5.0)
+        original = _sentence(rng, rng.randint(2, 6))
+        translated = _sentence(rng, rng.randint(2, 6))
+        if kind == "bilingual":
+            out.append(f"{_tag(ts)}{original}")
+            out.append(f"{_tag(ts)}{translated}")
+            i += 2
+            continue
+        if kind == "single":
+            out.append(f"{_tag(ts)}{original} / {translated}")
+        elif kind == "multi_tag":
+            extra = ts + rng.uniform(60.0, 120.0)
+            out.append(f"{_tag(ts)}{_tag(extra)}{original}")
+        elif kind == "untimed":
+            out.append(original)
+        elif kind == "words":
+            out.append(f"{_tag(ts)}{_word_tagged(rng, ts, rng.randint(2, 6))}")
+        elif kind == "disordered":
+            jitter = -rng.uniform(5.0, 10.0) if rng.random() < 0.1 else 0.0
+            out.append(f"{_tag(max(0.0, ts + jitter))}{original}")
+        else:
+            raise ValueError(f"unknown kind: {kind}")
+        i += 1
+    return "\n".join(out)
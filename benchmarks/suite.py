@@ -0,0 +1,324 @@
+# benchmarks/suite.py
+"""回归基准套件：解析、序列化、撤销命令以及表格刷新等界面热点路径
+
+每个用例在 1k / 10k / 100k 行的合成歌词上运行（双语、多标签、无时间戳、乱序），
+取多次运行中的最短耗时。界面用例在 offscreen Qt 平台上创建真实的 MainWindow，
+环境中缺少 QtMultimedia 等依赖时自动跳过并注明原因。
+
+用法:
+    python -m benchmarks.suite                              # 运行并打印结果
+    python -m benchmarks.suite --save benchmarks/baseline.json
+    python -m benchmarks.suite --compare benchmarks/baseline.json --threshold 0.25
+
+--compare 时任一用例比基线慢超过阈值（且绝对差超过 --min-delta 毫秒）即以退出码 1 结束。
+耗时与机器有关，仓库中不附带基线：先在同一台机器上（例如在改动前的提交上）用 --save
+生成基线；基线文件不存在或没有一个用例能与之对照时以退出码 2 结束。
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from lrc import Lrc, LyricLine
+from benchmarks.lrc_gen import generate_lrc
+
+KINDS = ("bilingual", "multi_tag", "untimed", "disordered")
+SIZES = (1000, 10000, 100000)
+
+# 用例注册表：(分组, 是否需要界面, 构造函数)。构造函数接收一个 Document，
+# 返回待计时的无参函数；构造过程本身不计时。
+CASES = []
+
+
+def bench(group, gui=False):
+    def register(factory):
+        CASES.append((group, gui, factory))
+        return factory
+    return register
+
+
+class Document:
+    """一份合成歌词及其懒加载的解析结果和主窗口，供同一规模的各个用例共享"""
+    def __init__(self, kind, n_lines):
+        self.kind = kind
+        self.n_lines = n_lines
+        self.text = generate_lrc(n_lines, kind)
+        self._lrc = None
+        self._window = None
+
+    @property
+    def lrc(self):
+        if self._lrc is None:
+            self._lrc = Lrc()
+            self._lrc.parse_from_text(self.text)
+        return self._lrc
+
+    def window(self):
+        if self._window is None:
+            from PySide6.QtWidgets import QApplication
+            from main_window import MainWindow
+            QApplication.instance() or QApplication(sys.argv)
+            w = MainWindow()
+            # 罗马音在后台线程中计算，会干扰计时
+            w.romaji_tooltips_action.setChecked(False)
+            w.resize(1000, 800)
+            w.show()
+            with w.lyrics_model.resetting():
+                w.lrc.parse_from_text(self.text)
+            w.update_ui_from_lrc()
+            QApplication.processEvents()
+            self._window = w
+        return self._window
+
+    def close(self):
+        if self._window is not None:
+            self._window.is_dirty = False
+            self._window.close()
+            self._window = None
+
+
+# ---- 核心用例（不依赖 Qt） ----
+
+@bench("parse")
+def case_parse(doc):
+    lrc = Lrc()
+    return lambda: lrc.parse_from_text(doc.text)
+
+
+@bench("serialize")
+def case_serialize(doc):
+    lrc = doc.lrc
+    return lambda: lrc.to_lrc_string(True)
+
+
+@bench("timeline_build")
+def case_timeline(doc):
+    lrc = doc.lrc
+    def run():
+        lrc._timeline = None
+        lrc.timeline.active_row(60.0)
+    return run
+
+
+# ---- 界面用例 ----
+
+@bench("command_mark", gui=True)
+def case_mark_command(doc):
+    """打轴命令：push 后立即撤销，保持文档不变"""
+    from commands import SetTimestampsCommand
+    w = doc.window()
+    row = len(w.lrc.lyrics) // 2
+    def run():
+        w.undo_stack.push(SetTimestampsCommand(w, [row], 1.0))
+        w.undo_stack.undo()
+    return run
+
+
+@bench("command_insert", gui=True)
+def case_insert_command(doc):
+    from commands import InsertRowsCommand
+    w = doc.window()
+    row = len(w.lrc.lyrics) // 2
+    def run():
+        w.undo_stack.push(InsertRowsCommand(w, row, [LyricLine(None, "new")]))
+        w.undo_stack.undo()
+    return run
+
+
+@bench("update_lyrics_table", gui=True)
+def case_table_reload(doc):
+    """整份歌词替换后的表格刷新（模型重置 + 可见行测量）"""
+    from PySide6.QtWidgets import QApplication
+    w = doc.window()
+    def run():
+        with w.lyrics_model.resetting():
+            pass
+        w.update_lyrics_table()
+        QApplication.processEvents()
+    return run
+
+
+@bench("update_highlight_styles", gui=True)
+def case_highlight(doc):
+    w = doc.window()
+    rows = len(w.lrc.lyrics)
+    state = {"row": 0}
+    def run():
+        state["row"] = (state["row"] + 7) % max(rows, 1)
+        w.update_active_row_style(state["row"])
+        w.update_highlight_styles()
+    return run
+
+
+def _switch_tabs(w):
+    """在歌词标签页和一个空白标签页之间来回切换一次，结束时回到歌词标签页"""
+    from PySide6.QtWidgets import QApplication
+    if w.tab_bar.count() < 2:
+        w.new_document()
+        w.tab_bar.setCurrentIndex(0)
+    def run():
+        w.tab_bar.setCurrentIndex(1)
+        w.tab_bar.setCurrentIndex(0)
+        QApplication.processEvents()
+    return run
+
+
+@bench("switch_tab", gui=True)
+def case_switch_tab(doc):
+    """切换标签页：表格视图仍在内存中"""
+    return _switch_tabs(doc.window())
+
+
+@bench("switch_tab_reload", gui=True)
+def case_switch_tab_reload(doc):
+    """切换标签页：内存预算为 0，每次切回都要重建表格视图"""
+    w = doc.window()
+    w.view_memory_budget = 0
+    return _switch_tabs(w)
+
+
+# ---- 运行与比较 ----
+
+def _best_time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def gui_unavailable_reason():
+    """界面用例无法运行时返回原因，可以运行时返回 None"""
+    try:
+        import main_window  # noqa: F401
+    except ImportError as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+def run_suite(sizes, kinds, groups=None, repeat=5, out=sys.stdout):
+    skip_gui = gui_unavailable_reason()
+    if skip_gui:
+        print(f"GUI cases skipped ({skip_gui})", file=out)
+    results = {}
+    for n in sizes:
+        for kind in kinds:
+            doc = Document(kind, n)
+            try:
+                for group, gui, factory in CASES:
+                    if groups and group not in groups:
+                        continue
+                    if gui and skip_gui:
+                        continue
+                    # 大文档减少重复次数，控制总耗时
+                    reps = repeat if n < 100000 else max(1, repeat // 2)
+                    key = f"{group}/{kind}/{n}"
+                    ms = _best_time(factory(doc), reps) * 1000
+                    results[key] = ms
+                    print(f"{key:<44}{ms:>12.3f} ms", file=out, flush=True)
+            finally:
+                doc.close()
+    return results
+
+
+def environment():
+    try:
+        import PySide6
+        qt = PySide6.__version__
+    except ImportError:
+        qt = None
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "machine": platform.machine(), "pyside6": qt}
+
+
+def load_baseline(path):
+    """读取基线文件，返回 (环境, 结果)"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("environment", {}), data["results"]
+
+
+def compare(results, baseline, threshold, min_delta, out=sys.stdout):
+    """与基线比较，返回 (超出阈值的用例列表, 参与比较的用例数)"""
+    regressions = []
+    compared = 0
+    print(f"\n{'case':<44}{'baseline':>12}{'current':>12}{'change':>9}", file=out)
+    for key, ms in results.items():
+        base = baseline.get(key)
+        if base is None:
+            print(f"{key:<44}{'-':>12}{ms:>12.3f}{'new':>9}", file=out)
+            continue
+        compared += 1
+        change = (ms - base) / base if base else 0.0
+        flag = ""
+        if change > threshold and ms - base > min_delta:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(f"{key:<44}{base:>12.3f}{ms:>12.3f}{change:>+9.1%}{flag}", file=out)
+    return regressions, compared
+
+
+def _parse_sizes(text):
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower()
+        sizes.append(int(float(part[:-1]) * 1000) if part.endswith("k") else int(part))
+    return sizes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmarks.suite", description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", default="1k,10k,100k", help="comma separated line counts (default: %(default)s)")
+    parser.add_argument("--kinds", default=",".join(KINDS), help="comma separated generator kinds")
+    parser.add_argument("--only", help="comma separated case groups to run")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case, the best one is kept")
+    parser.add_argument("--save", metavar="JSON", help="write the results as a baseline file")
+    parser.add_argument("--compare", metavar="JSON", help="compare against a baseline file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown as a fraction of the baseline (default: %(default)s)")
+    parser.add_argument("--min-delta", type=float, default=0.05,
+                        help="ignore slowdowns smaller than this many ms (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        # 在运行整个套件之前检查基线，缺失时不要跑完才发现无从比较
+        if not os.path.isfile(args.compare):
+            parser.error(f"baseline {args.compare} does not exist; create it on this machine first with "
+                         f"'python -m benchmarks.suite --save {args.compare}'")
+        try:
+            baseline_env, baseline = load_baseline(args.compare)
+        except (OSError, ValueError, KeyError) as e:
+            parser.error(f"cannot read baseline {args.compare}: {e}")
+
+    groups = set(args.only.split(",")) if args.only else None
+    results = run_suite(_parse_sizes(args.sizes), args.kinds.split(","), groups, args.repeat)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2, sort_keys=True)
+        print(f"\nbaseline written to {args.save}")
+
+    if args.compare:
+        current_env = environment()
+        for key in ("machine", "python", "pyside6"):
+            if baseline_env.get(key) != current_env[key]:
+                print(f"\nwarning: baseline {key} {baseline_env.get(key)} differs from {current_env[key]}")
+        regressions, compared = compare(results, baseline, args.threshold, args.min_delta)
+        if not compared:
+            print(f"\nerror: no case of this run appears in {args.compare}; "
+                  f"check --sizes/--kinds/--only or re-create the baseline with --save", file=sys.stderr)
+            return 2
+        if regressions:
+            print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+            return 1
+        print("\nno regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
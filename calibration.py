@@ -0,0 +1,143 @@
+# calibration.py
+"""打轴延迟校准：跟着节拍音轨按键，测出音频输出延迟与个人反应时间之和，作为打轴时的补偿量"""
+import os
+import struct
+import tempfile
+import wave
+from math import exp, pi, sin
+from statistics import median
+
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton
+
+from player import Player
+from i18n import LANG
+
+_SAMPLE_RATE = 44100
+_LEAD_IN_MS = 1500
+_INTERVAL_MS = 600      # 100 BPM
+_CLICKS = 24
+_WARM_UP_TAPS = 4       # 前几次按键通常还没跟上节拍，不计入
+_MIN_TAPS = 8
+
+
+def click_times():
+    """节拍音轨中每个节拍的时间（毫秒）"""
+    return [_LEAD_IN_MS + i * _INTERVAL_MS for i in range(_CLICKS)]
+
+
+def write_click_track(path):
+    """生成节拍音轨：16 位单声道 WAV，每拍一个 5 ms 的短促高音"""
+    total = (click_times()[-1] + 1000) * _SAMPLE_RATE // 1000
+    samples = bytearray(total * 2)
+    click_len = _SAMPLE_RATE * 5 // 1000
+    click = b"".join(struct.pack("<h", int(20000 * exp(-i / (click_len / 4)) * sin(2 * pi * 2000 * i / _SAMPLE_RATE)))
+                     for i in range(click_len))
+    for ms in click_times():
+        start = ms * _SAMPLE_RATE // 1000 * 2
+        samples[start:start + len(click)] = click
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(_SAMPLE_RATE)
+        f.writeframes(bytes(samples))
+
+
+def estimate_offset(taps):
+    """由按键时间（毫秒）估计补偿量，返回 (中位偏差, 离散程度, 有效次数)，数据不足时返回 None。
+
+    每次按键与最近的节拍配对，偏差超过半个节拍间隔的视为漏拍或多按而丢弃。
+    离散程度为偏差的中位绝对偏差（MAD），反映按键的稳定性。
+    """
+    clicks = click_times()
+    deviations = []
+    for tap in taps[_WARM_UP_TAPS:]:
+        nearest = min(clicks, key=lambda c: abs(c - tap))
+        if abs(tap - nearest) < _INTERVAL_MS / 2:
+            deviations.append(tap - nearest)
+    if len(deviations) < _MIN_TAPS:
+        return None
+    offset = median(deviations)
+    spread = median(abs(d - offset) for d in deviations)
+    return offset, spread, len(deviations)
+
+
+class CalibrationDialog(QDialog):
+    """播放节拍音轨并记录按键时间。音轨通过与歌曲相同的播放器路径输出，测得的延迟与打轴时一致"""
+    def __init__(self, current_offset, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(LANG["calibration_title"])
+        self.offset = current_offset
+        self.taps = []
+        self.player = None
+        self.track_path = os.path.join(tempfile.gettempdir(), "lrc-editor-click-track.wav")
+
+        layout = QVBoxLayout(self)
+        intro = QLabel(LANG["calibration_intro"])
+        intro.setWordWrap(True)
+        layout.addWidget(intro)
+        self.status_label = QLabel(LANG["calibration_current"].format(ms=current_offset))
+        layout.addWidget(self.status_label)
+
+        buttons = QHBoxLayout()
+        self.start_button = QPushButton(LANG["calibration_start"])
+        self.reset_button = QPushButton(LANG["calibration_reset"])
+        self.save_button = QPushButton(LANG["calibration_save"])
+        cancel_button = QPushButton(LANG["calibration_cancel"])
+        self.start_button.clicked.connect(self.start)
+        self.reset_button.clicked.connect(self.reset_offset)
+        self.save_button.clicked.connect(self.accept)
+        cancel_button.clicked.connect(self.reject)
+        for button in (self.start_button, self.reset_button, self.save_button, cancel_button):
+            button.setFocusPolicy(Qt.FocusPolicy.NoFocus)  # 空格键留给按键计时
+            buttons.addWidget(button)
+        layout.addLayout(buttons)
+
+        self.finish_timer = QTimer(self)
+        self.finish_timer.setSingleShot(True)
+        self.finish_timer.timeout.connect(self.finish)
+
+    def start(self):
+        try:
+            write_click_track(self.track_path)
+        except OSError as e:
+            self.status_label.setText(LANG["error_save_system"].format(e=e))
+            return
+        if self.player is None:
+            self.player = Player()
+        self.taps = []
+        self.player.load(self.track_path)
+        self.player.set_pos(0)
+        self.player.play()
+        self.start_button.setEnabled(False)
+        self.status_label.setText(LANG["calibration_running"])
+        self.finish_timer.start(click_times()[-1] + 1000)
+        self.setFocus()
+
+    def keyPressEvent(self, event):
+        if self.player is not None and self.player.is_playing() and not event.isAutoRepeat():
+            self.taps.append(self.player.get_precise_pos())
+            self.status_label.setText(LANG["calibration_taps"].format(n=len(self.taps)))
+            return
+        super().keyPressEvent(event)
+
+    def finish(self):
+        self.player.stop()
+        self.start_button.setEnabled(True)
+        result = estimate_offset(self.taps)
+        if result is None:
+            self.status_label.setText(LANG["calibration_too_few"])
+            return
+        offset, spread, count = result
+        self.offset = round(offset)
+        self.status_label.setText(LANG["calibration_result"].format(ms=self.offset, spread=spread, n=count))
+
+    def reset_offset(self):
+        self.offset = 0
+        self.status_label.setText(LANG["calibration_current"].format(ms=0))
+
+    def done(self, result):
+        self.finish_timer.stop()
+        if self.player is not None:
+            self.player.stop()
+        super().done(result)
@@ -0,0 +1,314 @@
+# commands.py
+"""基于增量的撤销命令：每条命令只保存被修改的行或字段，而不是整份文档的快照"""
+from PySide6.QtGui import QUndoCommand
+
+from lrc import LyricLine, LyricList, contiguous_runs
+
+
+class LyricsCommand(QUndoCommand):
+    """所有歌词编辑命令的基类"""
+    def __init__(self, main_window, description):
+        super().__init__(description)
+        self.main_window = main_window
+
+    @property
+    def lyrics(self):
+        return self.main_window.lrc.lyrics
+
+    @property
+    def model(self):
+        return self.main_window.lyrics_model
+
+    def _mark_dirty(self):
+        self.main_window.is_dirty = True
+
+
+class SetCellCommand(LyricsCommand):
+    """修改单个单元格（时间戳、原文或译文）"""
+    def __init__(self, main_window, row, field, new_value, description="编辑歌词"):
+        super().__init__(main_window, description)
+        self.row = row
+        self.field = field
+        self.old_value = main_window.lrc.lyrics.get(row, field)
+        self.new_value = new_value
+        # 逐字时间按字符位置记录，原文改动后不再对应，随之清除（撤销时恢复）
+        self.old_words = main_window.lrc.lyrics.get(row, 'words') if field == 'original' else None
+
+    def _apply(self, value, words):
+        self.model.set_value(self.row, self.field, value)
+        if self.old_words is not None:
+            self.model.set_value(self.row, 'words', words)
+        self.main_window.refresh_lyric_rows([self.row])
+        self._mark_dirty()
+
+    def redo(self):
+        self._apply(self.new_value, None)
+
+    def undo(self):
+        self._apply(self.old_value, self.old_words)
+
+
+class SetTimestampsCommand(LyricsCommand):
+    """批量修改多行的时间戳（打轴、批量变换）"""
+    def __init__(self, main_window, rows, new_values, description="标记时间戳"):
+        super().__init__(main_window, description)
+        lyrics = main_window.lrc.lyrics
+        self.rows = list(rows)
+        if not isinstance(new_values, (list, tuple)):
+            new_values = [new_values] * len(self.rows)
+        self.new_values = list(new_values)
+        self.old_values = [lyrics.get(row, 'ts') for row in self.rows]
+
+    def _apply(self, values):
+        # 时间戳不影响罗马音提示，不需要 refresh_lyric_rows
+        self.model.set_timestamps(self.rows, values)
+        self._mark_dirty()
+
+    def redo(self):
+        self._apply(self.new_values)
+
+    def undo(self):
+        self._apply(self.old_values)
+
+
+class SetWordTimingsCommand(LyricsCommand):
+    """修改若干行的逐字时间（逐字打轴、清除逐字时间）"""
+    def __init__(self, main_window, rows, new_words, description="逐字打轴"):
+        super().__init__(main_window, description)
+        lyrics = main_window.lrc.lyrics
+        self.rows = list(rows)
+        self.new_words = list(new_words)
+        self.old_words = [lyrics.get(row, 'words') for row in self.rows]
+
+    def _apply(self, words):
+        for row, value in zip(self.rows, words):
+            self.model.set_value(row, 'words', value)
+        self._mark_dirty()
+
+    def redo(self):
+        self._apply(self.new_words)
+
+    def undo(self):
+        self._apply(self.old_words)
+
+
+class ReplaceTextCommand(LyricsCommand):
+    """批量修改文本单元格（查找替换），整体作为一次撤销操作，视图按连续区间重绘"""
+    def __init__(self, main_window, changes, description="替换"):
+        super().__init__(main_window, description)
+        lyrics = main_window.lrc.lyrics
+        self.new_values = []
+        self.old_values = []
+        for row, field, value in changes:
+            self.new_values.append((row, field, value))
+            self.old_values.append((row, field, lyrics.get(row, field)))
+            # 与 SetCellCommand 相同：原文改动后逐字时间失效
+            words = lyrics.get(row, 'words') if field == 'original' else None
+            if words is not None:
+                self.new_values.append((row, 'words', None))
+                self.old_values.append((row, 'words', words))
+        self.rows = sorted({row for row, field, _ in changes if field == 'original'})
+
+    def _apply(self, changes):
+        self.model.set_values(changes)
+        self.main_window.refresh_lyric_rows(self.rows)
+        self._mark_dirty()
+
+    def redo(self):
+        self._apply(self.new_values)
+
+    def undo(self):
+        self._apply(self.old_values)
+
+
+class InsertRowsCommand(LyricsCommand):
+    """在指定位置插入若干行"""
+    def __init__(self, main_window, row, lines, description="添加行"):
+        super().__init__(main_window, description)
+        self.row = row
+        self.lines = LyricList(lines)
+
+    def redo(self):
+        self.model.insert_lines(self.row, self.lines)
+        self.main_window.on_lyrics_rows_inserted(self.row, len(self.lines))
+        self._mark_dirty()
+
+    def undo(self):
+        self.model.remove_rows(self.row, len(self.lines))
+        self.main_window.on_lyrics_rows_removed(self.row, len(self.lines))
+        self._mark_dirty()
+
+
+class DeleteRowsCommand(LyricsCommand):
+    """删除若干行（可以不连续），只保存被删除的行"""
+    def __init__(self, main_window, rows, description="删除行"):
+        super().__init__(main_window, description)
+        lyrics = main_window.lrc.lyrics
+        self.runs = [(start, lyrics[start:start + count])
+                     for start, count in contiguous_runs(sorted(set(rows)))]
+
+    def redo(self):
+        # 从后往前删除，前面区间的行号保持不变
+        for start, lines in reversed(self.runs):
+            self.model.remove_rows(start, len(lines))
+            self.main_window.on_lyrics_rows_removed(start, len(lines))
+        self._mark_dirty()
+
+    def undo(self):
+        for start, lines in self.runs:
+            self.model.insert_lines(start, lines)
+            self.main_window.on_lyrics_rows_inserted(start, len(lines))
+        self._mark_dirty()
+
+
+class CompositeCommand(LyricsCommand):
+    """由若干步骤组成的命令，redo 按顺序执行，undo 逆序撤销。
+
+    步骤保存在 Python 列表中，而不是作为 Qt 子命令：PySide 不会把子命令的所有权
+    转交给父命令，用 Qt 的父子关系会导致重复释放。
+    """
+    def __init__(self, main_window, description):
+        super().__init__(main_window, description)
+        self.steps = []
+
+    def add_step(self, command):
+        """添加一个步骤。步骤在构造时读取当前状态，因此调用方需按执行顺序依次创建"""
+        self.steps.append(command)
+        return command
+
+    def redo(self):
+        for step in self.steps:
+            step.redo()
+
+    def undo(self):
+        for step in reversed(self.steps):
+            step.undo()
+
+
+class MergeRowsCommand(CompositeCommand):
+    """把多行合并到第一行：修改首行文本，再删除其余行"""
+    def __init__(self, main_window, rows, description="合并行"):
+        super().__init__(main_window, description)
+        lyrics = main_window.lrc.lyrics
+        rows = sorted(rows)
+        base_row = rows[0]
+        for field in ('original', 'translated'):
+            merged = " ".join(lyrics.get(row, field) for row in rows).strip()
+            if merged != lyrics.get(base_row, field):
+                self.add_step(SetCellCommand(main_window, base_row, field, merged))
+        self.add_step(DeleteRowsCommand(main_window, rows[1:]))
+
+
+class SplitRowCommand(CompositeCommand):
+    """按空白把一行原文拆分为多行：修改原行，并在其后插入新行"""
+    def __init__(self, main_window, row, parts, description="拆分行"):
+        super().__init__(main_window, description)
+        self.add_step(SetCellCommand(main_window, row, 'original', parts[0]))
+        self.add_step(InsertRowsCommand(main_window, row + 1, [LyricLine(None, part) for part in parts[1:]]))
+
+
+class MetaCommand(LyricsCommand):
+    """修改歌曲信息（标题、歌手、专辑等）"""
+    def __init__(self, main_window, key, new_value, description):
+        super().__init__(main_window, description)
+        self.key = key
+        self.old_value = main_window.lrc.meta.get(key, "")
+        self.new_value = new_value
+
+    def _apply(self, value):
+        self.main_window.lrc.meta[self.key] = value
+        self.main_window.update_meta_fields()
+        self._mark_dirty()
+
+    def redo(self):
+        self._apply(self.new_value)
+
+    def undo(self):
+        self._apply(self.old_value)
+
+
+# ---- 撤销历史的保存与恢复（工程文件） ----
+_COMMAND_TYPES = {cls.__name__: cls for cls in (
+    SetCellCommand, SetTimestampsCommand, SetWordTimingsCommand, ReplaceTextCommand, InsertRowsCommand,
+    DeleteRowsCommand, CompositeCommand, MergeRowsCommand, SplitRowCommand, MetaCommand)}
+
+
+def command_state(command):
+    """导出命令的数据 (类名, 描述, 字段)：命令只保存增量，字段都是普通值、数组或 LyricList"""
+    fields = {key: value for key, value in vars(command).items() if key != 'main_window'}
+    if isinstance(command, CompositeCommand):
+        fields['steps'] = [command_state(step) for step in command.steps]
+    return type(command).__name__, command.text(), fields
+
+
+def restore_command(main_window, state):
+    """由 command_state() 的结果重建命令（不执行）"""
+    name, description, fields = state
+    cls = _COMMAND_TYPES[name]
+    command = cls.__new__(cls)
+    LyricsCommand.__init__(command, main_window, description)
+    for key, value in fields.items():
+        setattr(command, key, value)
+    if isinstance(command, CompositeCommand):
+        command.steps = [restore_command(main_window, step) for step in fields['steps']]
+    return command
+
+
+def _rebind(command, main_window):
+    command.main_window = main_window
+    for step in getattr(command, 'steps', ()):
+        _rebind(step, main_window)
+
+
+class _DetachedWindow:
+    """重建撤销栈时命令的临时宿主：直接修改歌词数据，不通知视图"""
+    def __init__(self, lrc):
+        self.lrc = lrc
+        self.lyrics_model = self
+        self.is_dirty = False
+
+    def set_value(self, row, field, value):
+        self.lrc.lyrics.set(row, field, value)
+
+    def set_timestamps(self, rows, values):
+        self.lrc.lyrics.set_timestamps(rows, values)
+
+    def set_values(self, changes):
+        for row, field, value in changes:
+            self.lrc.lyrics.set(row, field, value)
+
+    def insert_lines(self, row, lines):
+        self.lrc.lyrics.insert_lines(row, lines)
+
+    def remove_rows(self, row, count):
+        del self.lrc.lyrics[row:row + count]
+
+    def refresh_lyric_rows(self, rows):
+        pass
+
+    def on_lyrics_rows_inserted(self, row, count):
+        pass
+
+    def on_lyrics_rows_removed(self, row, count):
+        pass
+
+    def update_meta_fields(self):
+        pass
+
+
+def restore_history(main_window, undo_stack, states, index):
+    """在当前文档（处于第 index 条命令之后的状态）上重建撤销栈。
+
+    QUndoStack.push 总会执行一次 redo，所以先把前 index 条命令撤销回初始状态，再依次压栈
+    并回到 index。这些步骤都在临时宿主上直接修改数据，调用方需在 lyrics_model.resetting() 中执行。
+    """
+    host = _DetachedWindow(main_window.lrc)
+    commands = [restore_command(host, state) for state in states]
+    for command in reversed(commands[:index]):
+        command.undo()
+    undo_stack.clear()
+    for command in commands:
+        undo_stack.push(command)
+    undo_stack.setIndex(index)
+    for command in commands:
+        _rebind(command, main_window)
@@ -0,0 +1,149 @@
+# document.py
+"""标签页中的歌词文档：每个文档有自己的歌词数据、表格模型、撤销栈、查找索引和恢复日志"""
+import os
+
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtGui import QUndoStack
+from PySide6.QtWidgets import QTableView, QAbstractItemView, QHeaderView
+
+from lrc import Lrc
+from lyrics_model import LyricsTableModel
+from row_sizer import LazyRowSizer
+from karaoke import KaraokeDelegate
+from search_index import TextSearchIndex
+from journal import RecoveryJournal
+from i18n import LANG
+
+# 表格视图每行的大致开销（行头分段和行高缓存），用于估算可卸载的界面状态
+_VIEW_BYTES_PER_ROW = 80
+
+
+class Document(QObject):
+    """一个打开的歌词文档。
+
+    数据部分（歌词、模型、撤销栈、恢复日志、文件和音频路径）一直保留；表格视图和查找索引
+    是可以重建的界面状态，标签页不在前台且超出内存预算时由主窗口调用 unload_view() 卸载，
+    切换回来时重新创建，只恢复滚动位置和选中行。
+    """
+    titleChanged = Signal()
+
+    def __init__(self, journal_dir, parent=None):
+        super().__init__(parent)
+        self.lrc = Lrc()
+        # 表格模型直接读写 self.lrc，是歌词数据的唯一来源
+        self.lyrics_model = LyricsTableModel(self.lrc, self)
+        # 查找用的文本索引：第一次查找时才建立，之后随歌词修改增量维护
+        self.search_index = TextSearchIndex(self.lrc.lyrics)
+        # 崩溃恢复日志：修改在后台成批追加写盘，正常关闭时删除
+        self.journal = RecoveryJournal(journal_dir, self.lrc)
+
+        self.undo_stack = QUndoStack(self)
+        # 命令只保存增量，可以保留很长的撤销历史
+        self.undo_stack.setUndoLimit(5000)
+        # 歌词修改由日志直接监听，歌曲信息在撤销栈变化时检查
+        self.undo_stack.indexChanged.connect(self.journal.note_meta)
+        self.undo_stack.indexChanged.connect(self._on_undo_index_changed)
+
+        self.current_lrc_file = None
+        self.current_project_file = None
+        self.current_audio_file = ""
+        # 切到其他标签页时记下的播放位置（毫秒）
+        self.audio_position = 0
+        self._dirty = False
+        # 每次撤销栈变化加一：后台保存完成时据此判断保存期间是否又有修改
+        self.edit_generation = 0
+
+        # 界面状态
+        self.view = None
+        self.row_sizer = None
+        self.user_selected_row = []
+        self.row_filter_active = False
+        self._scroll_value = 0
+        # 最近一次切换到该标签页的顺序号，内存超出预算时先卸载最久未查看的
+        self.last_shown = 0
+
+    # ---- 状态 ----
+    @property
+    def is_dirty(self):
+        return self._dirty
+
+    @is_dirty.setter
+    def is_dirty(self, dirty):
+        if dirty != self._dirty:
+            self._dirty = dirty
+            self.titleChanged.emit()
+
+    def _on_undo_index_changed(self, index):
+        self.edit_generation += 1
+
+    def title(self):
+        path = self.current_lrc_file or self.current_project_file
+        name = os.path.basename(path) if path else LANG["tab_untitled"]
+        return f"*{name}" if self._dirty else name
+
+    def notify_title(self):
+        """文件路径变化后更新标签页标题"""
+        self.titleChanged.emit()
+
+    def is_pristine(self):
+        """没有打开任何文件也没有任何编辑的空文档，打开文件时可以直接复用"""
+        return (not self._dirty and self.current_lrc_file is None and self.current_project_file is None
+                and not len(self.lrc.lyrics) and self.undo_stack.count() == 0)
+
+    # ---- 界面状态 ----
+    def create_view(self):
+        """创建表格视图（已存在时直接返回），恢复卸载前的滚动位置和选中行"""
+        if self.view is not None:
+            return self.view
+        table = self.view = QTableView()
+        table.setModel(self.lyrics_model)
+        # 行高只在行进入视口时测量，不再对整个文档调用 resizeRowsToContents
+        self.row_sizer = LazyRowSizer(table)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        table.setShowGrid(False)
+        # 原文列：播放行按逐字时间做卡拉 OK 式高亮
+        table.setItemDelegateForColumn(1, KaraokeDelegate(table))
+
+        header = table.horizontalHeader()
+        # 时间列宽度固定可知，不用 ResizeToContents：那会在每次数据变化时测量所有行
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Interactive)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        table.resizeColumnToContents(0)
+
+        rows = self.lyrics_model.rowCount()
+        selection = table.selectionModel()
+        for row in self.user_selected_row:
+            if row < rows:
+                selection.select(self.lyrics_model.index(row, 0),
+                                 selection.SelectionFlag.Select | selection.SelectionFlag.Rows)
+        # 布局完成后滚动条才有范围
+        value = self._scroll_value
+        QTimer.singleShot(0, lambda: self.view is table and table.verticalScrollBar().setValue(value))
+        return table
+
+    def unload_view(self):
+        """卸载表格视图和查找索引，只记下滚动位置（选中行本来就保存在文档中）"""
+        if self.view is None:
+            return
+        self._scroll_value = self.view.verticalScrollBar().value()
+        self.view.deleteLater()
+        self.view = None
+        self.row_sizer = None
+        self.row_filter_active = False
+        self.search_index.release()
+
+    def view_memory(self):
+        """估算可卸载的界面状态占用的内存（字节）"""
+        if self.view is None:
+            return 0
+        return self.lyrics_model.rowCount() * _VIEW_BYTES_PER_ROW + self.search_index.memory_estimate()
+
+    def close(self):
+        """关闭文档：删除恢复日志，断开查找索引"""
+        self.journal.close()
+        self.search_index.detach()
+        if self.view is not None:
+            self.view.deleteLater()
+            self.view = None
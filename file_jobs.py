@@ -0,0 +1,129 @@
+# file_jobs.py
+"""在线程池中执行文件读写（打开/保存歌词和工程），界面线程只接收进度和结果"""
+import threading
+
+from PySide6.QtCore import QEventLoop, QObject, QRunnable, QThreadPool, Signal, Slot
+
+# 进度至少变化这么多才通知界面
+_PROGRESS_STEP = 0.01
+
+
+class JobCancelled(Exception):
+    """任务被取消（由进度回调在工作线程中抛出）"""
+
+
+class _TaskSignals(QObject):
+    """工作线程发出的信号；在界面线程中创建，连接到 FileJob 的槽时自动排队"""
+    progress = Signal(float)
+    finished = Signal(object)
+    failed = Signal(str)
+    cancelled = Signal()
+
+
+class _FileTask(QRunnable):
+    def __init__(self, work, signals, cancel_event):
+        super().__init__()
+        self.work = work
+        self.signals = signals
+        self.cancel_event = cancel_event
+        self._reported = -1.0
+
+    def run(self):
+        try:
+            result = self.work(self._report)
+        except JobCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+    def _report(self, fraction):
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+        if fraction - self._reported >= _PROGRESS_STEP or fraction >= 1.0:
+            self._reported = fraction
+            self.signals.progress.emit(fraction)
+
+
+class FileJob(QObject):
+    """一次后台文件读写。
+
+    work(progress) 在工作线程中执行，返回值通过 finished 送回界面线程；它应定期调用
+    progress(fraction)，取消后该调用会抛出 JobCancelled 使任务尽快结束。work 不能
+    访问界面线程正在修改的数据：打开时解析到新的 Lrc 对象，保存时写出数据的快照。
+
+    结束时恰好发出 finished(result)、failed(message) 或 cancelled() 之一，随后发出 done()。
+    """
+    progress = Signal(float)
+    finished = Signal(object)
+    failed = Signal(str)
+    cancelled = Signal()
+    done = Signal()
+
+    _pool = None
+
+    def __init__(self, work, parent=None):
+        super().__init__(parent)
+        self._cancel_event = threading.Event()
+        self._signals = _TaskSignals(self)
+        # 连接到本对象的方法（而不是 lambda），槽函数才会排队到界面线程执行
+        self._signals.progress.connect(self._on_progress)
+        self._signals.finished.connect(self._on_finished)
+        self._signals.failed.connect(self._on_failed)
+        self._signals.cancelled.connect(self._on_cancelled)
+        self._work = work
+        self.running = False
+        self.succeeded = False
+
+    @classmethod
+    def pool(cls):
+        # 文件读写共用一个单线程池：同一时间只有一个任务在读写磁盘
+        if cls._pool is None:
+            cls._pool = QThreadPool()
+            cls._pool.setMaxThreadCount(1)
+        return cls._pool
+
+    def start(self):
+        self.running = True
+        self.pool().start(_FileTask(self._work, self._signals, self._cancel_event))
+
+    def cancel(self):
+        """请求取消；任务在下一次报告进度时停止"""
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def wait(self):
+        """在局部事件循环中等待任务结束（界面仍可重绘、可点取消），返回是否成功"""
+        if self.running:
+            loop = QEventLoop()
+            self.done.connect(loop.quit)
+            loop.exec()
+        return self.succeeded
+
+    def _finish(self):
+        self.running = False
+        self.done.emit()
+
+    @Slot(float)
+    def _on_progress(self, fraction):
+        if self.running:
+            self.progress.emit(fraction)
+
+    @Slot(object)
+    def _on_finished(self, result):
+        self.succeeded = True
+        self.finished.emit(result)
+        self._finish()
+
+    @Slot(str)
+    def _on_failed(self, message):
+        self.failed.emit(message)
+        self._finish()
+
+    @Slot()
+    def _on_cancelled(self):
+        self.cancelled.emit()
+        self._finish()
@@ -0,0 +1,179 @@
+# find_panel.py
+"""歌词表格上方的查找/替换栏：边输入边检索，可只显示匹配行"""
+from bisect import bisect_left, bisect_right
+
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QLabel, QPushButton, QCheckBox, QToolButton
+)
+
+from search_index import FIELDS
+from i18n import LANG
+
+
+class FindReplacePanel(QWidget):
+    """查找/替换栏。检索交给 TextSearchIndex，修改歌词由主窗口生成撤销命令完成。
+
+    信号：
+      - matchesChanged(rows)：匹配行变化（升序行号列表）
+      - rowActivated(row)：跳转到某个匹配行
+      - replaceRequested(rows)：替换这些行中的匹配文本（“替换”为当前行，“全部替换”为所有匹配行）
+      - romajiRequested()：勾选了在罗马音中查找，需要后台补全罗马音
+    """
+    matchesChanged = Signal(list)
+    rowActivated = Signal(int)
+    replaceRequested = Signal(list)
+    romajiRequested = Signal()
+
+    def __init__(self, index, romaji_available=True, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.matches = []
+        self.current_row = -1
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        find_row = QHBoxLayout()
+        self.find_edit = QLineEdit()
+        self.find_edit.setPlaceholderText(LANG["find_placeholder"])
+        self.find_edit.setClearButtonEnabled(True)
+        self.count_label = QLabel()
+        self.prev_button = QPushButton(LANG["find_prev"])
+        self.next_button = QPushButton(LANG["find_next"])
+        close_button = QToolButton()
+        close_button.setText("✕")
+        close_button.setAutoRaise(True)
+        find_row.addWidget(self.find_edit, 1)
+        find_row.addWidget(self.count_label)
+        find_row.addWidget(self.prev_button)
+        find_row.addWidget(self.next_button)
+        find_row.addWidget(close_button)
+        layout.addLayout(find_row)
+
+        options = QHBoxLayout()
+        self.field_checks = {}
+        for field in FIELDS:
+            check = QCheckBox(LANG[f"find_in_{field}"])
+            check.setChecked(field != 'romaji')
+            options.addWidget(check)
+            self.field_checks[field] = check
+        self.field_checks['romaji'].setEnabled(romaji_available)
+        self.case_check = QCheckBox(LANG["find_match_case"])
+        self.filter_check = QCheckBox(LANG["find_filter_rows"])
+        options.addWidget(self.case_check)
+        options.addWidget(self.filter_check)
+        options.addStretch()
+        layout.addLayout(options)
+
+        self.replace_widget = QWidget()
+        replace_row = QHBoxLayout(self.replace_widget)
+        replace_row.setContentsMargins(0, 0, 0, 0)
+        self.replace_edit = QLineEdit()
+        self.replace_edit.setPlaceholderText(LANG["replace_placeholder"])
+        self.replace_button = QPushButton(LANG["replace_one"])
+        self.replace_all_button = QPushButton(LANG["replace_all"])
+        replace_row.addWidget(self.replace_edit, 1)
+        replace_row.addWidget(self.replace_button)
+        replace_row.addWidget(self.replace_all_button)
+        layout.addWidget(self.replace_widget)
+
+        self.find_edit.textChanged.connect(self.update_matches)
+        self.find_edit.returnPressed.connect(self.find_next)
+        self.prev_button.clicked.connect(self.find_previous)
+        self.next_button.clicked.connect(self.find_next)
+        close_button.clicked.connect(self.close_panel)
+        for check in self.field_checks.values():
+            check.toggled.connect(self.update_matches)
+        self.field_checks['romaji'].toggled.connect(lambda checked: checked and self.romajiRequested.emit())
+        self.case_check.toggled.connect(self.update_matches)
+        self.filter_check.toggled.connect(lambda: self.matchesChanged.emit(self.matches))
+        self.replace_edit.returnPressed.connect(self.replace_current)
+        self.replace_button.clicked.connect(self.replace_current)
+        self.replace_all_button.clicked.connect(self.replace_all)
+
+    # ---- 状态 ----
+    def set_index(self, index):
+        """切换到另一个文档的索引（切换标签页时）"""
+        self.index = index
+        if not self.isHidden():
+            index.ensure_built()
+
+    def fields(self):
+        return tuple(field for field, check in self.field_checks.items() if check.isChecked())
+
+    def query(self):
+        return self.find_edit.text()
+
+    def match_case(self):
+        return self.case_check.isChecked()
+
+    def filtering(self):
+        """是否只显示匹配行（查询为空时不过滤）"""
+        return not self.isHidden() and self.filter_check.isChecked() and bool(self.query())
+
+    def wants_romaji(self):
+        return not self.isHidden() and self.field_checks['romaji'].isChecked()
+
+    def open_panel(self, replace=False):
+        self.replace_widget.setVisible(replace)
+        # 打开时就建好索引，输入第一个字时不必等待
+        self.index.ensure_built()
+        self.show()
+        self.find_edit.setFocus()
+        self.find_edit.selectAll()
+        if self.wants_romaji():
+            self.romajiRequested.emit()
+        self.update_matches()
+
+    def close_panel(self):
+        self.hide()
+        self.matches = []
+        self.matchesChanged.emit([])
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key.Key_Escape:
+            self.close_panel()
+            return
+        super().keyPressEvent(event)
+
+    # ---- 检索与跳转 ----
+    def update_matches(self, *args):
+        """重新检索（输入变化、选项变化或歌词被修改后调用）"""
+        if self.isHidden():
+            return
+        query = self.query()
+        self.matches = self.index.search(query, self.fields(), self.match_case()) if query else []
+        if query:
+            self.count_label.setText(LANG["find_count"].format(n=len(self.matches)))
+        else:
+            self.count_label.clear()
+        for button in (self.prev_button, self.next_button, self.replace_button, self.replace_all_button):
+            button.setEnabled(bool(self.matches))
+        self.matchesChanged.emit(self.matches)
+
+    def _step(self, forward):
+        if not self.matches:
+            return
+        if forward:
+            i = bisect_right(self.matches, self.current_row)
+            row = self.matches[i % len(self.matches)]
+        else:
+            i = bisect_left(self.matches, self.current_row) - 1
+            row = self.matches[i]
+        self.rowActivated.emit(row)
+
+    def find_next(self):
+        self._step(True)
+
+    def find_previous(self):
+        self._step(False)
+
+    def replace_current(self):
+        if self.current_row in self.matches:
+            self.replaceRequested.emit([self.current_row])
+        self.find_next()
+
+    def replace_all(self):
+        if self.matches:
+            self.replaceRequested.emit(list(self.matches))
@@ -8,10 +8,15 @@ LANG = {
     "menu_help": "帮助(&H)",
     "menu_settings": "设置(&T)",
     "menu_about": "关于(&A)",
+    "menu_new_tab": "新建标签页(&N)",
+    "menu_close_tab": "关闭标签页(&W)",
+    "tab_untitled": "未命名",
     "menu_open_audio": "打开音频(&A)",
     "menu_open_lyric": "打开歌词文本/LRC(&L)",
     "menu_save_lyric": "保存LRC文件(&S)",
     "menu_save_lyric_as": "另存为(&A)...",
+    "menu_open_project": "打开工程(&P)...",
+    "menu_save_project": "保存工程(&J)...",
     "menu_exit": "退出(&X)",
     "menu_undo": "撤销(&U)",
     "menu_redo": "重做(&R)",
@@ -71,6 +76,7 @@ LANG = {
     "status_ready": "就绪",
     "status_audio_loaded": "音频已加载: {file}",
     "status_lyric_loaded": "歌词已加载: {file}",
+    "status_invalid_word_timings": "（{n} 行的逐字时间早于行时间戳，已忽略）",
     "status_file_dropped": "已加载文件: {file}",
     "status_lyric_saved": "歌词已保存到: {file}",
     
@@ -104,5 +110,118 @@ LANG = {
     "menu_view": "视图(&V)",
     "view_show_translated": "显示译文列",
     "view_romaji_tooltips": "罗马音提示",
-    "romaji_tooltip_unavailable": "（罗马音功能不可用）"
+    "romaji_tooltip_unavailable": "（罗马音功能不可用）",
+    "view_waveform": "显示波形",
+    "waveform_unavailable": "（需要安装 numpy）",
+    "waveform_loading": "正在生成波形...",
+    "waveform_failed": "无法解码音频: {e}",
+
+    # 变换时间戳
+    "menu_transform_timings": "变换时间戳...",
+    "transform_title": "变换时间戳",
+    "transform_scope_selected": "选中的行 ({n})",
+    "transform_scope_all": "整份歌词",
+    "transform_tab_offset": "平移",
+    "transform_tab_scale": "伸缩",
+    "transform_tab_anchors": "两点对齐",
+    "transform_offset": "偏移量:",
+    "transform_scale": "比例:",
+    "transform_origin": "不动点:",
+    "transform_scale_hint": "用于采样率或播放速度不一致的歌词，例如按 48000/44100 制作的歌词填 1.088435。",
+    "transform_anchor": "锚点 {n}:",
+    "transform_no_ts": "（该行没有时间戳）",
+    "transform_bad_time": "时间格式应为 mm:ss.xx",
+    "transform_bad_anchors": "两个锚点的时间必须不同，且不能颠倒先后顺序。",
+    "transform_nothing": "范围内没有带时间戳的行。",
+    "transform_preview": "将修改 {n} 行：第 {first} 行 {a} → {b}，第 {last} 行 {c} → {d}",
+    "status_transformed": "已变换 {n} 行的时间戳",
+
+    "menu_find": "查找",
+    "menu_replace": "替换",
+    "find_placeholder": "查找歌词…",
+    "replace_placeholder": "替换为…",
+    "find_prev": "上一个",
+    "find_next": "下一个",
+    "find_in_original": "原文",
+    "find_in_translated": "译文",
+    "find_in_romaji": "罗马音",
+    "find_match_case": "区分大小写",
+    "find_filter_rows": "只显示匹配行",
+    "find_count": "{n} 行匹配",
+    "replace_one": "替换",
+    "replace_all": "全部替换",
+    "status_replaced": "已替换 {n} 处单元格",
+    "status_replaced_none": "原文和译文中没有可替换的内容",
+
+    "mark_word_action": "逐字打轴",
+    "mark_word_tooltip": "为播放行的下一个字标记时间 (F9)",
+    "menu_clear_word_timings": "清除逐字时间",
+    "status_word_marked": "第 {row} 行：已标记 {n}/{total} 个字",
+    "status_word_no_line": "当前播放位置没有可逐字打轴的行（需先标记行时间戳，或该行已全部标完）",
+
+    # 打轴建议
+    "menu_suggest_timestamps": "根据音频建议时间戳...",
+    "suggest_title": "建议时间戳",
+    "suggest_no_audio": "请先打开音频文件。",
+    "suggest_no_untimed": "所有歌词行都已有时间戳。",
+    "suggest_none": "没有为 {n} 个无时间戳的行找到可靠的乐句起点。\n可以先手动标记前后几行作为参照后再试。",
+    "suggest_confirm": "在音频中为 {total} 个无时间戳的行中的 {n} 行找到了乐句起点。\n是否应用这些时间戳？（可撤销）",
+    "status_analyzing": "正在分析音频... {p:.0%}",
+    "status_suggested": "已为 {n} 行填入建议时间戳",
+
+    # 打轴延迟校准
+    "calibration_action": "校准打轴延迟...",
+    "calibration_title": "校准打轴延迟",
+    "calibration_intro": "点击“开始”后会播放一段节拍音。请跟着节拍按空格键（或任意键），节奏稳定后坚持到结束。\n测得的偏差包含音频输出延迟和个人反应时间，之后每次打轴都会自动减去。",
+    "calibration_current": "当前补偿: {ms} ms",
+    "calibration_start": "开始",
+    "calibration_reset": "清零",
+    "calibration_save": "保存",
+    "calibration_cancel": "取消",
+    "calibration_running": "跟着节拍按键...",
+    "calibration_taps": "已记录 {n} 次按键",
+    "calibration_too_few": "有效按键太少，请重试。",
+    "calibration_result": "测得补偿: {ms} ms（离散 ±{spread:.0f} ms，{n} 次有效按键）",
+    "calibration_saved": "打轴延迟补偿已设置为 {ms} ms",
+
+    # 性能统计
+    "perf_action": "性能统计...",
+    "perf_dialog_title": "性能统计",
+    "perf_enable": "记录热点路径耗时（关闭时几乎没有开销）",
+    "perf_col_name": "计时点",
+    "perf_col_count": "调用次数",
+    "perf_col_mean": "平均 (ms)",
+    "perf_col_p50": "P50 (ms)",
+    "perf_col_p95": "P95 (ms)",
+    "perf_col_p99": "P99 (ms)",
+    "perf_col_max": "最大 (ms)",
+    "perf_reset": "清空",
+    "perf_export": "导出 JSON...",
+    "perf_close": "关闭",
+    "perf_export_title": "导出性能统计",
+    "perf_json_filter": "JSON 文件 (*.json)",
+    "perf_cpu_usage": "进程 CPU: {p:.1%}",
+
+    # 崩溃恢复
+    "recovery_title": "恢复未保存的编辑",
+    "recovery_text": "上次编辑 {file} 时程序意外退出（{time}），留下了未保存的修改。\n是否恢复这些修改？选择“否”将丢弃它们。",
+    "recovery_untitled": "未命名歌词",
+    "recovery_failed": "无法恢复未保存的编辑: {e}",
+    "status_recovered": "已恢复未保存的编辑，请检查后保存",
+
+    # 工程文件
+    "open_project_title": "打开工程文件",
+    "save_project_title": "保存工程文件",
+    "project_files_filter": "LRC 工程文件 (*.lrcproj)",
+    "status_project_loaded": "工程已打开: {file}",
+    "status_project_saved": "工程已保存到: {file}",
+    "status_project_audio_missing": "工程已打开，但找不到音频文件: {file}",
+    "status_project_history_dropped": "工程已打开，但撤销历史已损坏，未能恢复",
+
+    # 后台文件读写
+    "status_opening": "正在打开: {file}",
+    "status_saving": "正在保存: {file}",
+    "status_file_busy": "上一个文件操作尚未完成",
+    "status_file_cancelled": "已取消",
+    "file_cancel_tooltip": "取消"
 }
\ No newline at end of file
@@ -0,0 +1,378 @@
+# journal.py
+"""崩溃恢复日志：把歌词的每次修改追加写入日志文件，下次启动时在上次保存的 LRC 上重放"""
+import itertools
+import json
+import os
+import threading
+import time
+from array import array
+
+from PySide6.QtCore import QStandardPaths
+
+from lrc import Lrc, LyricLine, LyricList
+
+_VERSION = 1
+_PREFIX = "session-"
+_SUFFIX = ".jsonl"
+# 收到第一条记录后最多等这么久再一起写盘
+_FLUSH_INTERVAL = 1.0
+# 积攒到这么多条记录时立即写盘
+_FLUSH_BATCH = 512
+# 距上次快照的修改量（按行计）或日志大小超过上限时压缩：用一份快照替换之前的所有记录
+COMPACT_RECORDS = 20000
+COMPACT_BYTES = 4 << 20
+# 同一进程中每个打开的文档各有一份日志
+_serial = itertools.count(1)
+
+
+def default_journal_dir():
+    base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)
+    return os.path.join(base, "recovery") if base else None
+
+
+# ---- 记录编码 ----
+def _encode_rows(lyrics):
+    rows = []
+    for (ts, original, translated), words in zip(lyrics.rows(), lyrics.word_timings):
+        rows.append([ts, original, translated, list(words)] if words else [ts, original, translated])
+    return rows
+
+
+def _decode_rows(rows):
+    return LyricList(LyricLine(row[0], row[1], row[2], array('H', row[3]) if len(row) > 3 else None)
+                     for row in rows)
+
+
+def _encode(record):
+    """把界面线程捕获的记录转换为可写入 JSON 的列表（在写盘线程中执行）"""
+    op = record[0]
+    if op == 'snap':
+        return ['snap', record[1], _encode_rows(record[2])]
+    if op == 'ins':
+        return ['ins', record[1], _encode_rows(record[2])]
+    if op == 'ts':
+        return ['ts', [None if ts != ts else ts for ts in record[1]]]
+    if op == 'set' and record[2] == 'words' and record[3] is not None:
+        return ['set', record[1], 'words', list(record[3])]
+    return list(record)
+
+
+def _process_alive(pid):
+    if pid == os.getpid():
+        return True
+    if os.name == 'nt':
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        kernel32.CloseHandle(handle)
+        return code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class RecoveryJournal:
+    """当前会话的恢复日志。
+
+    监听 LyricList 的变更通知，在界面线程中只把变更捕获为小元组（文本不可变，
+    数组和行切片复制一份）放入队列；编码为 JSON 行、追加写入和 fsync 都在后台线程中
+    成批完成。日志以 'base' 记录开头，指明这些修改基于哪个已保存的文件（路径、修改时间
+    和大小），之后是逐条修改；修改量或文件大小超过上限时用一份快照重写日志，
+    使日志大小和重放时间都有上限。
+
+    打开或保存文件后调用 start() 开始新的一段日志；在有第一处修改之前不创建文件。
+    整份替换内容之前先调用 suspend()，避免为马上就要作废的内容写快照。
+    正常关闭时 close() 删除日志，只有崩溃后才会留下。
+    """
+
+    def __init__(self, directory, lrc):
+        self.directory = directory
+        self.path = (os.path.join(directory, f"{_PREFIX}{os.getpid()}-{next(_serial)}{_SUFFIX}")
+                     if directory else None)
+        self._lrc = lrc
+        self._cond = threading.Condition()
+        self._pending = []
+        self._closing = False
+        self._thread = None
+        self._header = None       # 尚未写入的 base 记录（第一处修改时才写）
+        self._snapshot_first = False
+        self._base = None
+        self._meta = None
+        self._weight = 0          # 距上次快照的修改量
+        self._written = 0         # 当前日志文件大小，由写盘线程更新
+        self._compacting = False
+        self.error = None
+        lrc.lyrics.add_listener(self._on_lyrics_changed)
+
+    @property
+    def active(self):
+        return self.path is not None and self.error is None and self._base is not None
+
+    # ---- 界面线程 ----
+    def start(self, base_path=None, snapshot=False, parsed=False):
+        """开始新的一段日志。base_path 为当前内容对应的已保存文件（没有则为 None）。
+
+        解析文件时会按时间排序、合并同一时间的行并丢弃空行，重新解析出的行号不一定与
+        编辑器中的一致；因此只有当前内容就是刚从 base_path 解析出来的（parsed=True）时，
+        修改才直接记在该文件之上，否则（如保存后）第一处修改时先写入一份快照。
+        当前内容与该文件不一致（如刚恢复的会话）时传入 snapshot=True 立即写入快照
+        """
+        if self.path is None:
+            return
+        mtime, size = None, None
+        if base_path:
+            try:
+                st = os.stat(base_path)
+                mtime, size = st.st_mtime_ns, st.st_size
+            except OSError:
+                base_path = None
+        self._base = ['base', _VERSION, base_path, mtime, size, os.getpid(), time.time()]
+        self._meta = dict(self._lrc.meta)
+        self._weight = 0
+        self._header = None
+        self._snapshot_first = base_path is not None and not parsed
+        if snapshot or base_path is None and len(self._lrc.lyrics):
+            self._restart()
+        else:
+            # 当前内容与文件一致：旧日志作废，等有修改时再写 base 记录
+            self._header = self._base
+            self._enqueue(('drop',))
+
+    def suspend(self):
+        """整份替换文档内容（打开文件、恢复会话）之前调用：替换过程中的修改不再记录，
+        也不为 'reset' 写快照，直到随后的 start() 以新内容开始新的一段日志
+        """
+        self._base = None
+        self._header = None
+
+    def note_meta(self, *args):
+        """歌曲信息被修改（撤销栈变化）后调用，有变化时记录下来"""
+        meta = self._lrc.meta
+        if self.active and meta != self._meta:
+            self._meta = dict(meta)
+            self._append(('meta', self._meta), 1)
+
+    def close(self, discard=True):
+        """结束写盘线程；discard 为真时删除日志（正常退出）"""
+        if self.path is None:
+            return
+        with self._cond:
+            self._closing = True
+            if discard:
+                self._pending.append(('drop',))
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+        elif discard:
+            self._write([('drop',)])
+        self._base = None
+
+    def _on_lyrics_changed(self, kind, row, count, field, old):
+        if not self.active:
+            return
+        lyrics = self._lrc.lyrics
+        if kind == 'update':
+            self._append(('set', row, field, lyrics.get(row, field)), 1)
+        elif kind == 'insert':
+            self._append(('ins', row, lyrics[row:row + count]), count)
+        elif kind == 'remove':
+            self._append(('del', row, count), 1)
+        elif field == 'ts':
+            self._append(('ts', array('d', lyrics.timestamps)), count)
+        else:
+            self._restart()
+
+    def _snapshot(self):
+        return ('snap', dict(self._lrc.meta), self._lrc.lyrics[:])
+
+    def _restart(self):
+        """用 base 记录和一份快照重写日志"""
+        self._header = None
+        self._weight = 0
+        self._compacting = True
+        self._enqueue(('restart', self._base, self._snapshot()))
+
+    def _append(self, record, weight):
+        if self._header is not None:
+            header, self._header = self._header, None
+            if self._snapshot_first:
+                # 修改已经生效，直接以修改后的内容为快照，重放时不再依赖重新解析文件
+                self._restart()
+                return
+            self._enqueue(('restart', header), record)
+        else:
+            self._enqueue(record)
+        self._weight += weight
+        if not self._compacting and (self._weight > COMPACT_RECORDS or self._written > COMPACT_BYTES):
+            self._restart()
+
+    def _enqueue(self, *records):
+        with self._cond:
+            if self._closing:
+                return
+            was_empty = not self._pending
+            self._pending.extend(records)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="recovery-journal", daemon=True)
+                self._thread.start()
+            if was_empty or len(self._pending) >= _FLUSH_BATCH:
+                self._cond.notify()
+
+    # ---- 写盘线程 ----
+    def _run(self):
+        file = None
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                # 等一小段时间，把连续的修改合成一批写入
+                self._cond.wait_for(lambda: self._closing or len(self._pending) >= _FLUSH_BATCH,
+                                    timeout=_FLUSH_INTERVAL)
+                batch, self._pending = self._pending, []
+                closing = self._closing
+            file = self._write(batch, file)
+            if closing:
+                if file is not None:
+                    file.close()
+                return
+
+    def _write(self, batch, file=None):
+        """写入一批记录，返回仍然打开的日志文件"""
+        # 只有最后一次重写或删除之后的记录才有意义
+        for i in range(len(batch) - 1, -1, -1):
+            if batch[i][0] in ('restart', 'drop'):
+                start = i
+                break
+        else:
+            start = 0
+        try:
+            for record in batch[start:]:
+                op = record[0]
+                if op in ('restart', 'drop'):
+                    if file is not None:
+                        file.close()
+                        file = None
+                    if op == 'drop':
+                        if os.path.exists(self.path):
+                            os.remove(self.path)
+                        self._written = 0
+                        continue
+                    file = self._rewrite([list(record[1])] + [_encode(r) for r in record[2:]])
+                    self._compacting = False
+                    continue
+                if file is None:
+                    if not os.path.exists(self.path):
+                        # 日志已被删除（尚无 base 记录），之后的修改无从重放
+                        continue
+                    file = open(self.path, 'a', encoding='utf-8')
+                line = json.dumps(_encode(record), ensure_ascii=False, separators=(',', ':')) + "\n"
+                file.write(line)
+                self._written += len(line)
+            if file is not None:
+                file.flush()
+                os.fsync(file.fileno())
+        except OSError as e:
+            # 日志只是保险，写不进去时停止记录，不影响编辑
+            self.error = e
+            if file is not None:
+                file.close()
+            return None
+        return file
+
+    def _rewrite(self, records):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._written = os.path.getsize(self.path)
+        return open(self.path, 'a', encoding='utf-8')
+
+
+# ---- 恢复 ----
+class RecoveredSession:
+    """崩溃后留下的一份日志"""
+
+    def __init__(self, path):
+        self.path = path
+        self.records = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 写到一半时崩溃：最后一行可能不完整
+                    break
+                self.records.append(record)
+        if not self.records or self.records[0][0] != 'base' or self.records[0][1] != _VERSION:
+            raise ValueError("not a recovery journal")
+        _, _, self.base_path, self.base_mtime, self.base_size, self.pid, self.time = self.records[0]
+
+    def replay(self):
+        """在上次保存的文件（或日志中的快照）上重放所有修改，返回恢复出的 Lrc"""
+        lrc = Lrc()
+        records = self.records[1:]
+        if self.base_path and not (records and records[0][0] == 'snap'):
+            st = os.stat(self.base_path)
+            if (st.st_mtime_ns, st.st_size) != (self.base_mtime, self.base_size):
+                raise ValueError(f"{self.base_path} has changed since the journal was written")
+            lrc.parse_from_file(self.base_path)
+        lyrics = lrc.lyrics
+        for record in records:
+            op = record[0]
+            if op == 'snap':
+                lrc.meta = record[1]
+                lyrics[:] = _decode_rows(record[2])
+            elif op == 'meta':
+                lrc.meta = record[1]
+            elif op == 'set':
+                _, row, field, value = record
+                lyrics.set(row, field, array('H', value) if field == 'words' and value is not None else value)
+            elif op == 'ins':
+                lyrics.insert_lines(record[1], _decode_rows(record[2]))
+            elif op == 'del':
+                del lyrics[record[1]:record[1] + record[2]]
+            elif op == 'ts':
+                lyrics.set_timestamps(range(len(record[1])), record[1])
+        return lrc
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def find_recoverable(directory):
+    """其他已退出的会话留下的、含有修改的日志，最新的在前"""
+    if not directory or not os.path.isdir(directory):
+        return []
+    sessions = []
+    for name in os.listdir(directory):
+        if not (name.startswith(_PREFIX) and name.endswith(_SUFFIX)):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            session = RecoveredSession(path)
+        except (OSError, ValueError, TypeError):
+            continue
+        if _process_alive(session.pid):
+            continue
+        if len(session.records) < 2:
+            # 只有 base 记录：没有需要恢复的修改
+            session.discard()
+            continue
+        sessions.append(session)
+    sessions.sort(key=lambda s: s.time, reverse=True)
+    return sessions
@@ -0,0 +1,77 @@
+# karaoke.py
+"""原文列的卡拉 OK 式逐字高亮：播放行已唱过的部分换色，当前字内按进度平滑推进"""
+from PySide6.QtCore import QPointF, QRectF
+from PySide6.QtGui import QColor, QPalette, QTextLayout, QTextOption
+from PySide6.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionViewItem
+
+from lyrics_model import KARAOKE_ROLE
+
+
+class KaraokeDelegate(QStyledItemDelegate):
+    """只接管带逐字时间的播放行，其余单元格按默认方式绘制。
+
+    文字用 QTextLayout 排版（与默认绘制一样自动换行），先整体画一遍普通颜色，
+    再把已唱部分裁剪出来用高亮色重画一遍。
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.sung_color = QColor("#f7c948")
+
+    def paint(self, painter, option, index):
+        sung = index.data(KARAOKE_ROLE)
+        if sung is None:
+            super().paint(painter, option, index)
+            return
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        text = opt.text
+        opt.text = ""
+        widget = opt.widget
+        style = widget.style() if widget is not None else QApplication.style()
+        # 背景、选中状态等照常绘制，只有文字自己画
+        style.drawControl(QStyle.ControlElement.CE_ItemViewItem, opt, painter, widget)
+        rect = style.subElementRect(QStyle.SubElement.SE_ItemViewItemText, opt, widget)
+        margin = style.pixelMetric(QStyle.PixelMetric.PM_FocusFrameHMargin, None, widget) + 1
+        rect = QRectF(rect.adjusted(margin, 0, -margin, 0))
+
+        layout = QTextLayout(text, opt.font)
+        text_option = QTextOption(opt.displayAlignment)
+        text_option.setWrapMode(QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere)
+        layout.setTextOption(text_option)
+        height = 0.0
+        layout.beginLayout()
+        while True:
+            line = layout.createLine()
+            if not line.isValid():
+                break
+            line.setLineWidth(rect.width())
+            line.setPosition(QPointF(0, height))
+            height += line.height()
+        layout.endLayout()
+        origin = QPointF(rect.left(), rect.top() + max(0.0, (rect.height() - height) / 2))
+
+        selected = opt.state & QStyle.StateFlag.State_Selected
+        role = QPalette.ColorRole.HighlightedText if selected else QPalette.ColorRole.Text
+        painter.save()
+        painter.setPen(opt.palette.color(role))
+        layout.draw(painter, origin)
+
+        painter.setPen(self.sung_color)
+        whole = int(sung)
+        fraction = sung - whole
+        for i in range(layout.lineCount()):
+            line = layout.lineAt(i)
+            start = line.textStart()
+            end = start + line.textLength()
+            if whole < start:
+                break
+            if whole >= end:
+                width = line.width()
+            else:
+                x0 = line.cursorToX(whole)[0]
+                x1 = line.cursorToX(whole + 1)[0]
+                width = x0 + (x1 - x0) * fraction - line.x()
+            clip = QRectF(origin.x() + line.x(), origin.y() + line.y(), width, line.height())
+            painter.setClipRect(clip)
+            line.draw(painter, origin)
+        painter.restore()
@@ -1,31 +1,752 @@
 # lrc.py
 import re
 import copy
-from collections import defaultdict
+import os
+import codecs
+import mmap
+import tempfile
+import threading
+import importlib.util
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+# 只检查 pykakasi 是否安装，真正的导入和词典加载推迟到第一次转换时
+PYKAKASI_AVAILABLE = importlib.util.find_spec("pykakasi") is not None
+
+# 预编译的标签模式，解析时每行只扫描一次
+_TIME_TAG_RE = re.compile(r'\[(\d{2,}):(\d{2,})\.(\d{2,3})\]')
+_ID_TAG_RE = re.compile(r'\[([A-Za-z#][\w#-]*):(.*?)\]', re.ASCII)
+# 这些标签所在行的其余内容会被忽略；其他标识标签后若跟有文本仍按歌词处理
+_CORE_META_KEYS = frozenset(("ti", "ar", "al"))
+
+
+def _tag_to_seconds(m, s, fraction):
+    """将时间标签的三个数字字段转换为秒数，精度为0.01秒"""
+    # 如果是3位（毫秒），则取前两位作为厘秒（除以10取整），因为LRC精度为0.01秒
+    if len(fraction) == 3:
+        centiseconds = int(fraction) // 10
+    else:
+        centiseconds = int(fraction)
+    return int(m) * 60 + int(s) + centiseconds / 100.0
+
+
+def _split_bilingual(text):
+    """尝试用'/'或'|'将单行文本拆分为 (原文, 译文)"""
+    # 等价于 re.split(r'\s*[/|]\s*', text, maxsplit=1)，但避免了正则调用
+    cut = text.find('/')
+    bar = text.find('|')
+    if cut < 0 or 0 <= bar < cut:
+        cut = bar
+    if cut < 0:
+        return text, ""
+    return text[:cut].rstrip(), text[cut + 1:].lstrip()
+
+
+# ---- 逐字时间（增强型 LRC 的 <mm:ss.xx> 标签） ----
+# 每行的逐字时间是一个 array('H')，每个字占两个 16 位整数：
+#   (相对行时间戳的厘秒偏移, 该字在原文中的起始字符位置)
+# 一个字从它的起始位置延续到下一个字的起始位置；起始位置等于原文长度的项
+# 表示整句唱完的时刻。每个字只占 4 字节，没有逐字时间的行为 None。
+_WORD_TAG_RE = re.compile(r'<(\d{2,}):(\d{2,})\.(\d{2,3})>')
+_WORD_LIMIT = 0xFFFF
+# 不以空格分词的文字（汉字、假名、全角符号）每个字符单独算一个字
+_WORD_RE = re.compile(r'[\u2e80-\u9fff\uf900-\ufaff\uff00-\uffef]|[^\s\u2e80-\u9fff\uf900-\ufaff\uff00-\uffef]+')
+
+
+def split_word_tags(text):
+    """去掉文本中的逐字时间标签，返回 (纯文本, [(秒数, 字符位置), ...])；没有标签时第二项为 None"""
+    if '<' not in text:
+        return text, None
+    parts = _WORD_TAG_RE.split(text)
+    if len(parts) == 1:
+        return text, None
+    chunks = [parts[0]]
+    pos = len(parts[0])
+    marks = []
+    for i in range(1, len(parts), 4):
+        marks.append((_tag_to_seconds(parts[i], parts[i + 1], parts[i + 2]), pos))
+        chunks.append(parts[i + 3])
+        pos += len(parts[i + 3])
+    plain = "".join(chunks)
+    stripped = plain.strip()
+    if len(stripped) != len(plain):
+        # 去掉首尾空白后字符位置随之前移
+        lead = len(plain) - len(plain.lstrip())
+        marks = [(seconds, min(max(0, p - lead), len(stripped))) for seconds, p in marks]
+    return stripped, marks
+
+
+def pack_word_timings(line_ts, marks):
+    """把 [(秒数, 字符位置), ...] 压缩为相对 line_ts 的 array('H')。
+
+    偏移无法表示（早于行时间戳或超出上限）时抛出 ValueError，不静默截断。
+    """
+    words = array('H')
+    for seconds, pos in marks:
+        offset = round((seconds - line_ts) * 100)
+        if not 0 <= offset <= _WORD_LIMIT:
+            raise ValueError(f"word timing {seconds:.2f}s is out of range for a line at {line_ts:.2f}s")
+        words.append(offset)
+        words.append(min(pos, _WORD_LIMIT))
+    return words
+
+
+def join_word_tags(text, words, line_ts):
+    """把逐字时间重新写成 <mm:ss.xx> 标签插回文本"""
+    out = []
+    last = 0
+    base = round(line_ts * 100)
+    # 字符位置按文本顺序记录，单调不减；直接按整数厘秒格式化，避免逐字做浮点换算
+    for i in range(0, len(words), 2):
+        pos = words[i + 1]
+        out.append(text[last:pos])
+        cs = base + words[i]
+        out.append(f"<{cs // 6000:02d}:{cs // 100 % 60:02d}.{cs % 100:02d}>")
+        last = pos
+    out.append(text[last:])
+    return "".join(out)
+
+
+def scale_word_timings(words, factor):
+    """按 factor 伸缩逐字时间的偏移（行时间戳被按比例伸缩时使用），返回新数组"""
+    scaled = array('H', words)
+    for i in range(0, len(scaled), 2):
+        scaled[i] = min(round(scaled[i] * factor), _WORD_LIMIT)
+    return scaled
+
+
+def word_boundaries(text):
+    """逐字打轴时每个字的起始字符位置：拉丁文字按空格分词，汉字和假名逐字"""
+    return [m.start() for m in _WORD_RE.finditer(text)]
+
+
+def sung_length(words, text_len, elapsed):
+    """行开始 elapsed 秒后已唱过的字符数（浮点数，当前字内按时间线性插值）"""
+    offsets = words[0::2]
+    i = bisect_right(offsets, elapsed * 100.0) - 1
+    if i < 0:
+        return 0.0
+    start = words[2 * i + 1]
+    if i + 1 >= len(offsets):
+        # 最后一个字没有结束标记时整字点亮
+        return float(text_len)
+    end = words[2 * i + 3]
+    span = offsets[i + 1] - offsets[i]
+    fraction = (elapsed * 100.0 - offsets[i]) / span if span > 0 else 1.0
+    return min(start + (end - start) * min(fraction, 1.0), float(text_len))
+
+
+# 编码探测：BOM 优先，其次在样本上试解码并按字符分布打分
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+# 无 BOM 且不是 UTF-8 时依次尝试的东亚编码（同分时靠前者优先）
+_LEGACY_ENCODINGS = ("gb18030", "cp932", "cp950")
+_SNIFF_SIZE = 64 * 1024
+_READ_CHUNK = 1024 * 1024
+# 写入时每批拼接的行数
+_WRITE_BATCH = 4096
+
+
+def _cjk_score(text):
+    """粗略评估解码结果的可信度：常用汉字/假名/全角标点加分，罕见字符减分"""
+    score = 0
+    for ch in text:
+        o = ord(ch)
+        if o < 0x80:
+            continue
+        if 0x3040 <= o <= 0x30FF:
+            # 平假名与片假名几乎只会出现在正确解码的日文中
+            score += 2
+        elif 0x4E00 <= o <= 0x9FFF or 0x3000 <= o <= 0x303F or 0xFF01 <= o <= 0xFF5E:
+            score += 1
+        else:
+            score -= 2
+    return score
+
+
+def detect_encoding(sample: bytes) -> str:
+    """根据BOM和字节样本推断文本编码，支持 UTF-8/16/32、GBK、Shift-JIS 和 Big5"""
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    # 无 BOM 的 UTF-16：ASCII 字符的高字节为 0，集中出现在奇数或偶数位置
+    if len(sample) >= 4:
+        half = len(sample) // 2
+        even_zeros = sample[0::2].count(0)
+        odd_zeros = sample[1::2].count(0)
+        if odd_zeros > half * 0.3 and even_zeros < half * 0.05:
+            return "utf-16-le"
+        if even_zeros > half * 0.3 and odd_zeros < half * 0.05:
+            return "utf-16-be"
+
+    try:
+        # final=False：样本末尾被截断的多字节字符不算错误
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+
+    best, best_score = None, None
+    for encoding in _LEGACY_ENCODINGS:
+        try:
+            text = codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+        except UnicodeDecodeError:
+            continue
+        score = _cjk_score(text)
+        if best_score is None or score > best_score:
+            best, best_score = encoding, score
+    return best or "utf-8"
+
+
+def iter_decoded_lines(data, encoding: str, progress=None):
+    """按块增量解码字节缓冲区（bytes 或 mmap），逐行产出文本，不生成整份副本。
+
+    progress(fraction) 在每块读入后调用，可以抛出异常以中止读取。
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    view = memoryview(data)
+    pending = ""
+    try:
+        for start in range(0, len(view), _READ_CHUNK):
+            chunk = pending + decoder.decode(view[start:start + _READ_CHUNK])
+            if progress is not None:
+                progress(min(start + _READ_CHUNK, len(view)) / len(view))
+            lines = chunk.split('\n')
+            pending = lines.pop()
+            yield from lines
+        pending += decoder.decode(b"", final=True)
+    finally:
+        view.release()
+    yield pending
+
+
+# 罗马音结果缓存（按文本索引的有界LRU），副歌等重复歌词只转换一次
+_ROMAJI_CACHE_SIZE = 8192
+_romaji_cache = OrderedDict()
+_romaji_cache_lock = threading.Lock()
+# pykakasi 转换器不保证线程安全，创建和转换都串行化
+_kks_lock = threading.Lock()
+_kks = None
+_kks_loaded = False
+
+
+def _get_kakasi_locked():
+    global _kks, _kks_loaded
+    if not _kks_loaded:
+        _kks_loaded = True
+        if PYKAKASI_AVAILABLE:
+            try:
+                import pykakasi
+                _kks = pykakasi.kakasi()
+            except Exception:
+                _kks = None
+    return _kks
+
+
+def get_kakasi():
+    """返回进程内共享的 pykakasi 转换器，首次调用时才加载词典；不可用时返回 None"""
+    with _kks_lock:
+        return _get_kakasi_locked()
+
+
+def warm_up_kakasi():
+    """在后台线程中提前加载 pykakasi 词典，避免第一次显示罗马音时卡顿"""
+    if PYKAKASI_AVAILABLE and not _kks_loaded:
+        threading.Thread(target=get_kakasi, name="kakasi-warmup", daemon=True).start()
+
+
+def cached_romaji(text):
+    """只查缓存，不做转换；未命中时返回 None"""
+    with _romaji_cache_lock:
+        romaji = _romaji_cache.get(text)
+        if romaji is not None:
+            _romaji_cache.move_to_end(text)
+        return romaji
+
+
+def seed_romaji_cache(pairs):
+    """预先填入 [(原文, 罗马音), ...]（如从工程文件恢复），之后可直接命中缓存"""
+    with _romaji_cache_lock:
+        for text, romaji in pairs:
+            _romaji_cache[text] = romaji
+        while len(_romaji_cache) > _ROMAJI_CACHE_SIZE:
+            _romaji_cache.popitem(last=False)
+
+
+def _store_romaji(text, romaji):
+    with _romaji_cache_lock:
+        _romaji_cache[text] = romaji
+        _romaji_cache.move_to_end(text)
+        if len(_romaji_cache) > _ROMAJI_CACHE_SIZE:
+            _romaji_cache.popitem(last=False)
+
+
+def _current_umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+def _fsync_directory(directory):
+    """刷新目录项，确保重命名本身落盘（Windows 不支持打开目录，直接跳过）"""
+    if os.name != 'posix':
+        return
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+_NO_TS = float('nan')
+_FIELDS = ('ts', 'original', 'translated', 'words')
+# 批量修改时间戳超过这么多行时，不再逐行通知，而是发出一次 'reset' 让监听器整体重建
+_BULK_NOTIFY_LIMIT = 32
+
+
+class LyricLine:
+    """单行歌词（轻量值对象）"""
+    __slots__ = _FIELDS
+
+    def __init__(self, ts=None, original="", translated="", words=None):
+        self.ts = ts
+        self.original = original
+        self.translated = translated
+        self.words = words
+
+    def __eq__(self, other):
+        if not isinstance(other, LyricLine):
+            return NotImplemented
+        return ((self.ts, self.original, self.translated, self.words)
+                == (other.ts, other.original, other.translated, other.words))
+
+    def __repr__(self):
+        words = f", {self.words!r}" if self.words is not None else ""
+        return f"LyricLine({self.ts!r}, {self.original!r}, {self.translated!r}{words})"
+
+
+class LyricList:
+    """列式存储的歌词序列。
+
+    时间戳保存在 array('d') 中（NaN 表示无时间戳），原文和译文各占一个字符串列，
+    逐字时间单独一列（array('H') 或 None，见 pack_word_timings）。每行只占几个指针的
+    空间，复制整份文档也只是复制几个扁平容器。
+
+    修改后会通知已注册的监听器，回调签名为
+    listener(kind, row, count, field=None, old=None)，kind 取值：
+      - 'insert'：在 row 处插入了 count 行
+      - 'remove'：删除了从 row 开始的 count 行
+      - 'update'：第 row 行的 field 字段被修改，old 为旧值
+      - 'reset'： 内容被整体替换；一次批量修改了很多行的时间戳时也发出 'reset'，此时 field 为 'ts'
+    """
+    __slots__ = ('_ts', '_original', '_translated', '_words', '_listeners')
+
+    def __init__(self, lines=()):
+        self._ts = array('d')
+        self._original = []
+        self._translated = []
+        self._words = []
+        self._listeners = []
+        self.extend(lines)
+
+    @classmethod
+    def from_columns(cls, ts, original, translated, words=None):
+        """直接由各列构造（接管传入的容器，不复制）；words 为 None 表示都没有逐字时间"""
+        if words is None:
+            words = [None] * len(ts)
+        if not len(ts) == len(original) == len(translated) == len(words):
+            raise ValueError("column lengths differ")
+        new = cls()
+        new._ts, new._original, new._translated, new._words = ts, original, translated, words
+        return new
+
+    # ---- 变更通知 ----
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def _notify(self, kind, row, count=1, field=None, old=None):
+        for listener in self._listeners:
+            listener(kind, row, count, field, old)
+
+    def _normalize_row(self, row):
+        if row < 0:
+            row += len(self._ts)
+        if not 0 <= row < len(self._ts):
+            raise IndexError("LyricList index out of range")
+        return row
+
+    # ---- 序列协议 ----
+    def __len__(self):
+        return len(self._ts)
+
+    def __iter__(self):
+        for (ts, original, translated), words in zip(self.rows(), self._words):
+            yield LyricLine(ts, original, translated, words)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            new = LyricList()
+            new._ts = self._ts[index]
+            new._original = self._original[index]
+            new._translated = self._translated[index]
+            new._words = self._words[index]
+            return new
+        ts = self._ts[index]
+        return LyricLine(None if ts != ts else ts, self._original[index], self._translated[index],
+                         self._words[index])
+
+    def __setitem__(self, index, line):
+        if isinstance(index, slice):
+            lines = line if isinstance(line, LyricList) else LyricList(line)
+            self._ts[index] = lines._ts
+            self._original[index] = lines._original
+            self._translated[index] = lines._translated
+            self._words[index] = lines._words
+            self._notify('reset', 0, len(self._ts))
+            return
+        row = self._normalize_row(index)
+        for field in _FIELDS:
+            old = self.get(row, field)
+            value = getattr(line, field)
+            if old != value:
+                self.set(row, field, value)
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self._ts))
+            del self._ts[index]
+            del self._original[index]
+            del self._translated[index]
+            del self._words[index]
+            if step == 1:
+                if stop > start:
+                    self._notify('remove', start, stop - start)
+            else:
+                self._notify('reset', 0, len(self._ts))
+            return
+        row = self._normalize_row(index)
+        del self._ts[row]
+        del self._original[row]
+        del self._translated[row]
+        del self._words[row]
+        self._notify('remove', row, 1)
+
+    def __eq__(self, other):
+        if isinstance(other, LyricList):
+            return (len(self) == len(other)
+                    and list(self.rows()) == list(other.rows())
+                    and self._words == other._words)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"LyricList({list(self)!r})"
+
+    def __copy__(self):
+        return self[:]
+
+    def __deepcopy__(self, memo):
+        # 字符串不可变，复制各列容器即可（监听器不随之复制）；逐字时间数组修改时整体替换，可以共享
+        return self[:]
+
+    def insert(self, index, line):
+        size = len(self._ts)
+        if index < 0:
+            index = max(0, index + size)
+        index = min(index, size)
+        self._ts.insert(index, _NO_TS if line.ts is None else line.ts)
+        self._original.insert(index, line.original)
+        self._translated.insert(index, line.translated)
+        self._words.insert(index, line.words)
+        self._notify('insert', index, 1)
+
+    def insert_lines(self, index, lines):
+        """在 index 处连续插入多行，只发出一次 'insert' 通知"""
+        lines = lines if isinstance(lines, LyricList) else LyricList(lines)
+        size = len(self._ts)
+        if index < 0:
+            index = max(0, index + size)
+        index = min(index, size)
+        self._ts[index:index] = lines._ts
+        self._original[index:index] = lines._original
+        self._translated[index:index] = lines._translated
+        self._words[index:index] = lines._words
+        if len(lines):
+            self._notify('insert', index, len(lines))
+
+    def append(self, line):
+        self.append_row(line.ts, line.original, line.translated, line.words)
+
+    def append_row(self, ts, original="", translated="", words=None):
+        """直接按字段追加一行，不创建 LyricLine 对象"""
+        self._ts.append(_NO_TS if ts is None else ts)
+        self._original.append(original)
+        self._translated.append(translated)
+        self._words.append(words)
+        if self._listeners:
+            self._notify('insert', len(self._ts) - 1, 1)
+
+    def extend(self, lines):
+        start = len(self._ts)
+        for line in lines:
+            self._ts.append(_NO_TS if line.ts is None else line.ts)
+            self._original.append(line.original)
+            self._translated.append(line.translated)
+            self._words.append(line.words)
+        if len(self._ts) > start:
+            self._notify('insert', start, len(self._ts) - start)
+
+    def pop(self, index=-1):
+        line = self[index]
+        del self[index]
+        return line
+
+    def clear(self):
+        del self[:]
+
+    # ---- 按字段访问 ----
+    def get(self, row, field):
+        """读取某行的一个字段：'ts'、'original'、'translated' 或 'words'"""
+        if field == 'ts':
+            ts = self._ts[row]
+            return None if ts != ts else ts
+        if field == 'words':
+            return self._words[row]
+        return self._original[row] if field == 'original' else self._translated[row]
+
+    def set(self, row, field, value):
+        """修改某行的一个字段"""
+        row = self._normalize_row(row)
+        old = self.get(row, field) if field in _FIELDS else None
+        if field == 'ts':
+            self._ts[row] = _NO_TS if value is None else value
+        elif field == 'original':
+            self._original[row] = value
+        elif field == 'translated':
+            self._translated[row] = value
+        elif field == 'words':
+            self._words[row] = value
+        else:
+            raise KeyError(field)
+        self._notify('update', row, 1, field, old)
+
+    def set_timestamps(self, rows, values):
+        """批量修改多行的时间戳（None 表示清除），只在全部写入后通知一次或逐行通知"""
+        ts = self._ts
+        rows = [self._normalize_row(row) for row in rows]
+        olds = [ts[row] for row in rows]
+        for row, value in zip(rows, values):
+            ts[row] = _NO_TS if value is None else value
+        if len(rows) > _BULK_NOTIFY_LIMIT:
+            self._notify('reset', 0, len(ts), 'ts')
+            return
+        for row, old in zip(rows, olds):
+            self._notify('update', row, 1, 'ts', None if old != old else old)
+
+    def rows(self):
+        """逐行产出 (ts, original, translated) 元组，无时间戳时 ts 为 None"""
+        for ts, original, translated in zip(self._ts, self._original, self._translated):
+            yield (None if ts != ts else ts), original, translated
+
+    @property
+    def timestamps(self):
+        """时间戳列（array('d')，NaN 表示无时间戳），只读使用"""
+        return self._ts
+
+    @property
+    def word_timings(self):
+        """逐字时间列（每行一个 array('H') 或 None），只读使用"""
+        return self._words
+
+    def columns(self):
+        """(时间戳, 原文, 译文, 逐字时间) 四列，只读使用"""
+        return self._ts, self._original, self._translated, self._words
+
+
+def contiguous_runs(rows):
+    """把升序行号拆分为连续区间 [(起始行, 行数), ...]"""
+    runs = []
+    for row in rows:
+        if runs and runs[-1][0] + runs[-1][1] == row:
+            runs[-1][1] += 1
+        else:
+            runs.append([row, 1])
+    return [tuple(run) for run in runs]
+
+
+class TimingTransform:
+    """时间戳的线性变换 t' = scale * t + offset（秒），结果小于 0 时取 0。
+
+    平移、按比例伸缩（采样率或播放速度不一致）和两点重新对齐都是这种形式。
+    """
+    def __init__(self, scale=1.0, offset=0.0):
+        self.scale = scale
+        self.offset = offset
+
+    @classmethod
+    def shift(cls, seconds):
+        return cls(1.0, seconds)
+
+    @classmethod
+    def stretch(cls, factor, origin=0.0):
+        """以 origin 为不动点按 factor 伸缩"""
+        return cls(factor, origin * (1.0 - factor))
+
+    @classmethod
+    def from_anchors(cls, src1, dst1, src2, dst2):
+        """把 src1 映射到 dst1、src2 映射到 dst2"""
+        if src1 == src2:
+            raise ValueError("anchor timestamps must differ")
+        scale = (dst2 - dst1) / (src2 - src1)
+        if scale <= 0:
+            raise ValueError("anchors would reverse the timeline")
+        return cls(scale, dst1 - scale * src1)
+
+    def apply(self, values):
+        """变换一列时间戳（None 或 NaN 保持不变），结果保留到毫秒"""
+        scale, offset = self.scale, self.offset
+        return [None if v is None or v != v else round(max(0.0, scale * v + offset), 3) for v in values]
+
+
+def iter_disordered_rows(timestamps):
+    """产出时间戳早于前面最近一个有时间戳的行的行号（NaN 表示无时间戳，跳过）"""
+    last_ts = float('-inf')
+    for row, ts in enumerate(timestamps):
+        if ts != ts:
+            continue
+        if ts < last_ts:
+            yield row
+        last_ts = ts
+
+
+def line_timestamp(line):
+    """行首第一个时间标签的秒数，没有时间标签时返回 NaN。
+
+    parse_lines 会按时间重新排序，检查文件本身的时间顺序时用它逐行检查原始行。
+    """
+    m = _TIME_TAG_RE.match(line.strip())
+    return _tag_to_seconds(*m.groups()) if m else float('nan')
+
+
+class TimelineIndex:
+    """时间轴索引：按 (时间戳, 行号) 排序的有序列，支持二分查找。
+
+    通过 LyricList 的变更通知增量维护：修改时间戳只做一次删除和一次插入，
+    插入/删除行只需平移行号，不再重新排序。乱序的行同样能得到正确结果。
+    """
+
+    def __init__(self, lyrics):
+        self._lyrics = lyrics
+        self._times = array('d')
+        self._rows = array('q')
+        lyrics.add_listener(self._on_lyrics_changed)
+        self.rebuild()
+
+    def detach(self):
+        """停止跟踪歌词变更"""
+        self._lyrics.remove_listener(self._on_lyrics_changed)
+
+    def rebuild(self):
+        pairs = sorted((ts, row) for row, ts in enumerate(self._lyrics.timestamps) if ts == ts)
+        self._times = array('d', (ts for ts, _ in pairs))
+        self._rows = array('q', (row for _, row in pairs))
+
+    def __len__(self):
+        return len(self._times)
+
+    def _locate(self, ts, row):
+        """返回 (ts, row) 在有序列中的位置"""
+        i = bisect_left(self._times, ts)
+        hi = bisect_right(self._times, ts, i)
+        # 同一时间戳的行按行号有序
+        return i + bisect_left(self._rows[i:hi], row)
+
+    def _insert_pair(self, ts, row):
+        i = self._locate(ts, row)
+        self._times.insert(i, ts)
+        self._rows.insert(i, row)
+
+    def _remove_pair(self, ts, row):
+        i = self._locate(ts, row)
+        del self._times[i]
+        del self._rows[i]
+
+    def _on_lyrics_changed(self, kind, row, count, field, old):
+        if kind == 'update':
+            if field != 'ts':
+                return
+            new = self._lyrics.get(row, 'ts')
+            if old is not None:
+                self._remove_pair(old, row)
+            if new is not None:
+                self._insert_pair(new, row)
+        elif kind == 'insert':
+            self._rows = array('q', (r + count if r >= row else r for r in self._rows))
+            timestamps = self._lyrics.timestamps
+            for r in range(row, row + count):
+                ts = timestamps[r]
+                if ts == ts:
+                    self._insert_pair(ts, r)
+        elif kind == 'remove':
+            end = row + count
+            keep = [i for i, r in enumerate(self._rows) if not row <= r < end]
+            self._times = array('d', (self._times[i] for i in keep))
+            self._rows = array('q', (r - count if r >= end else r
+                                     for r in (self._rows[i] for i in keep)))
+        else:
+            self.rebuild()
+
+    # ---- 查询 ----
+    def active_row(self, seconds):
+        """返回在 seconds 时刻应高亮的行：时间戳不大于该时刻的最晚一行，没有则返回 -1"""
+        i = bisect_right(self._times, seconds)
+        return self._rows[i - 1] if i else -1
+
+    def next_boundary(self, seconds):
+        """返回 seconds 之后的第一个时间戳（高亮行会在此刻变化），没有则返回 None"""
+        i = bisect_right(self._times, seconds)
+        return self._times[i] if i < len(self._times) else None
+
+    def rows_between(self, start, end):
+        """按时间顺序返回时间戳位于 [start, end) 区间内的所有行号"""
+        lo = bisect_left(self._times, start)
+        hi = bisect_left(self._times, end, lo)
+        return list(self._rows[lo:hi])
+
+    def items_between(self, start, end):
+        """同 rows_between，但返回 (时间戳, 行号) 对"""
+        lo = bisect_left(self._times, start)
+        hi = bisect_left(self._times, end, lo)
+        return list(zip(self._times[lo:hi], self._rows[lo:hi]))
 
-try:
-    import pykakasi
-    PYKAKASI_AVAILABLE = True
-except ImportError:
-    PYKAKASI_AVAILABLE = False
 
 class Lrc:
     """负责LRC歌词的解析、编辑和生成，支持双语"""
     def __init__(self):
         self.meta = {"ti": "", "ar": "", "al": ""}
-        # 数据结构: [{'ts': float, 'original': "...", 'translated': "..."}, ...]
-        self.lyrics = []
-        # 罗马音转换器
-        self.kks = None
-        if PYKAKASI_AVAILABLE:
-            try:
-                self.kks = pykakasi.kakasi()
-            except Exception:
-                self.kks = None
+        # 数据结构: LyricList，按行保存 ts / original / translated
+        self.lyrics = LyricList()
+        # 时间轴索引，首次使用时创建
+        self._timeline = None
+        # 最近一次解析时因逐字时间无法表示（早于行时间戳等）而丢弃逐字时间的行数
+        self.invalid_word_timings = 0
 
     def __deepcopy__(self, memo):
-        """自定义深拷贝行为，防止复制 pykakasi 对象导致报错"""
-        # 创建一个新实例（绕过 __init__ 以避免重复初始化 pykakasi，提高性能）
+        """自定义深拷贝行为：只复制数据，索引在副本上按需重建"""
         cls = self.__class__
         new_obj = cls.__new__(cls)
         memo[id(self)] = new_obj
@@ -33,98 +754,178 @@ class Lrc:
         # 深度复制数据属性
         new_obj.meta = copy.deepcopy(self.meta, memo)
         new_obj.lyrics = copy.deepcopy(self.lyrics, memo)
-        
-        # 对于 kks 工具对象，直接共享引用（浅拷贝），不要深拷贝
-        # 这样既避免了 '_thread.lock' 错误，又避免了重复加载字典
-        new_obj.kks = self.kks 
-        
+        new_obj._timeline = None
+        new_obj.invalid_word_timings = self.invalid_word_timings
         return new_obj
 
+    @property
+    def kks(self):
+        """罗马音转换器（所有 Lrc 实例共享同一个，首次访问时加载）"""
+        return get_kakasi()
+
+    @property
+    def timeline(self) -> TimelineIndex:
+        """与歌词同步维护的时间轴索引"""
+        if self._timeline is None:
+            self._timeline = TimelineIndex(self.lyrics)
+        return self._timeline
+
     def parse_from_text(self, text: str):
         """从字符串解析LRC内容，智能处理单行和分行双语格式"""
-        self.lyrics.clear()
+        self.parse_lines(text.split('\n'))
+
+    def parse_from_file(self, path: str, progress=None, tap=None) -> str:
+        """读取并解析歌词文件，返回探测到的编码。
+
+        文件只读取一次（内存映射），解码后的行直接流式交给解析器。
+        progress 见 iter_decoded_lines。tap(lines) 可以包装解码后的行迭代器（须原样产出
+        每一行），在同一遍读取中顺带检查原始行；编码回退重新解析时会再调用一次。
+        """
+        with open(path, 'rb') as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # 空文件无法映射
+                data = b""
+            try:
+                encoding = detect_encoding(data[:_SNIFF_SIZE])
+                try:
+                    self._parse_buffer(data, encoding, progress, tap)
+                except UnicodeDecodeError:
+                    # 样本之后才出现非法字节：换用 GB18030 重新解析（数据仍在内存映射中，无需再读盘）
+                    if encoding == "gb18030":
+                        raise
+                    encoding = "gb18030"
+                    self._parse_buffer(data, encoding, progress, tap)
+            finally:
+                if isinstance(data, mmap.mmap):
+                    data.close()
+        return encoding
+
+    def _parse_buffer(self, data, encoding, progress=None, tap=None):
+        lines = iter_decoded_lines(data, encoding, progress)
+        try:
+            self.parse_lines(tap(lines) if tap is not None else lines)
+        finally:
+            # 及时释放对内存映射的引用，否则无法关闭映射
+            lines.close()
+
+    def parse_lines(self, lines):
+        """逐行解析LRC内容（单遍扫描），lines 可以是任意可迭代的行序列"""
         self.meta = {"ti": "", "ar": "", "al": ""}
-        lines = text.split('\n')
 
-        time_map = defaultdict(list)
+        time_map = {}
         unstimed_lyrics = []
+        meta = self.meta
+        time_tag_at = _TIME_TAG_RE.match
+        id_tag_at = _ID_TAG_RE.match
 
         for line in lines:
             line = line.strip()
             if not line:
                 continue
 
-            meta_match = re.match(r'\[(ti|ar|al):(.*?)\]', line)
-            if meta_match:
-                key, value = meta_match.groups()
-                self.meta[key.strip()] = value.strip()
-                continue
-            
-            # 使用正则表达式捕获时间戳，格式为：[mm:ss.xx] 或 [mm:ss.xxx]
-            time_tags_matches = re.findall(r'\[(\d{2,}):(\d{2,})\.(\d{2,3})\]', line)
-            # 获取歌词文本：最后一个时间标签之后的内容
-            lyric_text = line[line.rfind(']') + 1:].strip() if ']' in line else line
-
-            if time_tags_matches:
-                # 处理每个时间标签
-                for m, s, fraction in time_tags_matches:
-                    # 分钟转换为整数
-                    minutes = int(m)
-                    # 秒转换为整数
-                    seconds = int(s)
-                    # 处理小数部分（厘秒）：可能为2位或3位（百分秒或毫秒）
-                    # 如果是3位（毫秒），则取前两位作为厘秒（除以10取整），因为LRC精度为0.01秒
-                    if len(fraction) == 3:
-                        centiseconds = int(fraction) // 10
+            pos = 0
+            stamps = None
+            if line[0] == '[':
+                # 行首的连续时间标签，格式为：[mm:ss.xx] 或 [mm:ss.xxx]
+                m = time_tag_at(line)
+                if m is None:
+                    # 标识标签：[ti:], [ar:], [al:], [offset:], [length:], [by:] 以及未知标签
+                    id_match = id_tag_at(line)
+                    if id_match:
+                        key, value = id_match.groups()
+                        meta[key] = value.strip()
+                        if key in _CORE_META_KEYS:
+                            continue
+                else:
+                    stamps = []
+                    while m is not None:
+                        stamps.append(_tag_to_seconds(*m.groups()))
+                        pos = m.end()
+                        m = time_tag_at(line, pos)
+
+            rest = line[pos:]
+            if '[' in rest or ']' in rest:
+                # 非常规行（标签夹在文本中间等），回退到通用规则：
+                # 收集整行所有时间标签，歌词取最后一个 ']' 之后的内容
+                stamps = [_tag_to_seconds(*g) for g in _TIME_TAG_RE.findall(line)]
+                lyric_text = line[line.rfind(']') + 1:].strip()
+            else:
+                lyric_text = rest.strip()
+
+            if stamps:
+                for ts in stamps:
+                    bucket = time_map.get(ts)
+                    if bucket is None:
+                        time_map[ts] = [lyric_text]
                     else:
-                        centiseconds = int(fraction)
-                    # 计算总时间（秒）：分钟*60 + 秒 + 厘秒/100
-                    ts = minutes * 60 + seconds + centiseconds / 100.0
-                    time_map[ts].append(lyric_text)
+                        bucket.append(lyric_text)
             elif lyric_text:
                 # 没有时间戳的行
                 unstimed_lyrics.append(lyric_text)
-        
+
         # 按时间戳对解析出的歌词行进行排序
-        sorted_timestamps = sorted(time_map.keys())
-        for ts in sorted_timestamps:
+        parsed = LyricList()
+        append_row = parsed.append_row
+        invalid_words = 0
+        for ts in sorted(time_map):
             lyrics_at_ts = time_map[ts]
-            original = ""
-            translated = ""
-
             # 如果同一时间戳有多行歌词，通常第一行是原文，第二行是译文
             if len(lyrics_at_ts) >= 2:
-                original = lyrics_at_ts[0]
-                translated = lyrics_at_ts[1]
-            elif len(lyrics_at_ts) == 1:
+                original, translated = lyrics_at_ts[0], lyrics_at_ts[1]
+            else:
                 # 如果只有一行，尝试用'/'或'|'分割原文和译文
-                parts = re.split(r'\s*[/|]\s*', lyrics_at_ts[0], maxsplit=1)
-                original = parts[0]
-                if len(parts) > 1:
-                    translated = parts[1]
+                original, translated = _split_bilingual(lyrics_at_ts[0])
+            if '<' in original or '<' in translated:
+                # 增强型 LRC：原文的逐字时间标签转为紧凑数组，译文中的标签直接去掉
+                original, marks = split_word_tags(original)
+                translated = split_word_tags(translated)[0]
+                try:
+                    words = pack_word_timings(ts, marks) if marks else None
+                except ValueError:
+                    # 逐字时间早于行时间戳，无法表示：不截断成错误的时间，只保留文本并计数
+                    words = None
+                    invalid_words += 1
+                append_row(ts, original, translated, words)
+            else:
+                append_row(ts, original, translated)
 
-            self.lyrics.append({'ts': ts, 'original': original, 'translated': translated})
-        
-        # 无时间戳的歌词放在最后
+        # 无时间戳的歌词放在最后（没有行时间戳，逐字时间无从换算，只保留文本）
         for text in unstimed_lyrics:
-            parts = re.split(r'\s*[/|]\s*', text, maxsplit=1)
-            original = parts[0]
-            translated = parts[1] if len(parts) > 1 else ""
-            self.lyrics.append({'ts': None, 'original': original, 'translated': translated})
-        
+            original, translated = _split_bilingual(text)
+            if '<' in text:
+                original, translated = split_word_tags(original)[0], split_word_tags(translated)[0]
+                if not original and not translated:
+                    # 只有逐字时间标签的行
+                    continue
+            append_row(None, original, translated)
+
+        # 一次性替换内容，监听器只收到一次 'reset' 通知
+        self.lyrics[:] = parsed
+        self.invalid_word_timings = invalid_words
+
         # 初次加载后不再自动排序
         # self.sort_lyrics()
 
-
     def convert_to_romaji(self, text: str) -> str:
-        """将日文文本转换为罗马音"""
-        if not text or not self.kks:
+        """将日文文本转换为罗马音（结果带缓存，可在工作线程中调用）"""
+        if not text or not PYKAKASI_AVAILABLE:
             return ""
+        romaji = cached_romaji(text)
+        if romaji is not None:
+            return romaji
         try:
-            result = self.kks.convert(text)
-            return " ".join(item["hepburn"] for item in result)
+            with _kks_lock:
+                kks = _get_kakasi_locked()
+                if kks is None:
+                    return ""
+                result = kks.convert(text)
+            romaji = " ".join(item["hepburn"] for item in result)
         except Exception:
             return ""
+        _store_romaji(text, romaji)
+        return romaji
 
     @staticmethod
     def format_timestamp(ts: float) -> str:
@@ -139,41 +940,96 @@ class Lrc:
             centiseconds = 0
         return f"[{minutes:02d}:{seconds:02d}.{centiseconds:02d}]"
 
-    def to_lrc_string(self, save_as_bilingual_separated=True) -> str:
-        """生成LRC格式的字符串，精度为0.01s"""
-        lrc_parts = []
+    def iter_lrc_lines(self, save_as_bilingual_separated=True):
+        """逐行生成LRC文本（不含换行符），精度为0.01s"""
         for key, value in self.meta.items():
             if value:
-                lrc_parts.append(f"[{key}:{value}]")
+                yield f"[{key}:{value}]"
         
         # 保存时不再强制排序，按当前表格顺序生成
-        # sorted_lyrics = sorted(self.lyrics, key=lambda x: x['ts'] if x['ts'] is not None else float('inf'))
-
-        for line_data in self.lyrics: # 直接使用当前顺序
-            ts = line_data['ts']
-            original = line_data.get('original', '')
-            translated = line_data.get('translated', '')
-
-            if ts is not None:
-                time_str = self.format_timestamp(ts)
-            else:
-                time_str = ""
+        # sorted_lyrics = sorted(self.lyrics, key=lambda x: x.ts if x.ts is not None else float('inf'))
 
+        format_timestamp = self.format_timestamp
+        for (ts, original, translated), words in zip(self.lyrics.rows(), self.lyrics.word_timings): # 直接使用当前顺序
             if not original and not translated:
                 continue
 
+            time_str = format_timestamp(ts) if ts is not None else ""
+            if words and ts is not None:
+                original = join_word_tags(original, words, ts)
+
             if translated:
                 if save_as_bilingual_separated:
-                    lrc_parts.append(f"{time_str}{original}")
-                    lrc_parts.append(f"{time_str}{translated}")
+                    yield f"{time_str}{original}"
+                    yield f"{time_str}{translated}"
                 else:
-                    lrc_parts.append(f"{time_str}{original} / {translated}")
+                    yield f"{time_str}{original} / {translated}"
             else:
-                lrc_parts.append(f"{time_str}{original}")
-                
-        return "\n".join(lrc_parts)
+                yield f"{time_str}{original}"
+
+    def to_lrc_string(self, save_as_bilingual_separated=True) -> str:
+        """生成LRC格式的字符串，精度为0.01s"""
+        return "\n".join(self.iter_lrc_lines(save_as_bilingual_separated))
+
+    def write_to(self, fp, save_as_bilingual_separated=True, progress=None):
+        """将LRC内容按批写入文本流，不在内存中拼出整份字符串。
+
+        progress(fraction) 在每批写入后调用（按行数估算），可以抛出异常以中止写入。
+        """
+        batch = []
+        separator = ""
+        written = total = 0
+        if progress is not None:
+            total = len(self.lyrics)
+            if save_as_bilingual_separated:
+                # 分行格式中每条译文单独占一行
+                total += sum(map(bool, self.lyrics.columns()[2]))
+        for line in self.iter_lrc_lines(save_as_bilingual_separated):
+            batch.append(line)
+            if len(batch) >= _WRITE_BATCH:
+                fp.write(separator + "\n".join(batch))
+                written += len(batch)
+                batch.clear()
+                separator = "\n"
+                if progress is not None:
+                    progress(min(1.0, written / max(1, total)))
+        if batch:
+            fp.write(separator + "\n".join(batch))
+
+    def save_to_file(self, path: str, save_as_bilingual_separated=True, encoding='utf-8', progress=None):
+        """原子地保存到文件：先写同目录下的临时文件并 fsync，再重命名覆盖目标。
+
+        写入途中崩溃、出错或被 progress 抛出的异常中止时，原文件保持不变。
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".lrc-", suffix=".tmp", dir=directory)
+        try:
+            with open(fd, 'w', encoding=encoding) as f:
+                self.write_to(f, save_as_bilingual_separated, progress)
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                # 沿用原文件的权限（mkstemp 创建的文件默认仅自己可读写）
+                os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+            except FileNotFoundError:
+                os.chmod(tmp_path, 0o666 & ~_current_umask())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        _fsync_directory(directory)
+
+    def shift_timestamps(self, seconds: float):
+        """把所有时间戳平移 seconds 秒，结果小于 0 时取 0"""
+        timestamps = self.lyrics.timestamps
+        rows = [row for row, ts in enumerate(timestamps) if ts == ts]
+        values = TimingTransform.shift(seconds).apply(timestamps[row] for row in rows)
+        self.lyrics.set_timestamps(rows, values)
 
     def sort_lyrics(self):
         """根据时间戳排序歌词列表 (此功能已根据用户要求停用)"""
-        # self.lyrics.sort(key=lambda x: x['ts'] if x['ts'] is not None else float('inf'))
+        # self.lyrics[:] = sorted(self.lyrics, key=lambda x: x.ts if x.ts is not None else float('inf'))
         pass
\ No newline at end of file
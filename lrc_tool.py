@@ -0,0 +1,194 @@
+# lrc_tool.py
+"""无界面的批量歌词处理工具，不依赖 Qt，可在服务器或流水线中运行。
+
+用法:
+    python -m lrc_tool convert  DIR [...] [-o OUT] [--encoding utf-8] [--single-line]
+    python -m lrc_tool offset   DIR [...] --ms 250 [-o OUT]
+    python -m lrc_tool validate DIR [...]
+
+文件分发到进程池中并行处理，结果按完成顺序逐个输出，最后汇总吞吐量。
+"""
+import argparse
+import codecs
+import fnmatch
+import os
+import sys
+import time
+from array import array
+from multiprocessing import Pool
+
+from lrc import Lrc, iter_disordered_rows, line_timestamp
+
+# 每次分发给工作进程的文件数：文件通常很小，成批分发以减少进程间通信
+_CHUNK_SIZE = 8
+
+
+def iter_lrc_files(paths, pattern, recursive):
+    """展开命令行中的文件和目录，产出 (文件路径, 相对路径)"""
+    for path in paths:
+        if os.path.isfile(path):
+            yield path, os.path.basename(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if fnmatch.fnmatch(name.lower(), pattern):
+                    full = os.path.join(root, name)
+                    yield full, os.path.relpath(full, path)
+            if not recursive:
+                break
+
+
+def _output_path(path, rel_path, output_dir):
+    if not output_dir:
+        return path
+    out = os.path.join(output_dir, rel_path)
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    return out
+
+
+def _convert(lrc, path, out_path, options):
+    encoding = lrc.parse_from_file(path)
+    target = options.encoding or encoding
+    lrc.save_to_file(out_path, not options.single_line, target)
+    return f"{encoding} -> {target}", True
+
+
+def _offset(lrc, path, out_path, options):
+    encoding = lrc.parse_from_file(path)
+    lrc.shift_timestamps(options.ms / 1000.0)
+    lrc.save_to_file(out_path, not options.single_line, options.encoding or encoding)
+    return f"{options.ms:+d} ms", True
+
+
+def _validate(lrc, path, out_path, options):
+    # 解析后的歌词已按时间排序，乱序要按文件中的行序检查：在解析的同一遍读取中记下每行的时间标签
+    raw_timestamps = array('d')
+
+    def tap(lines):
+        del raw_timestamps[:]
+        for line in lines:
+            raw_timestamps.append(line_timestamp(line))
+            yield line
+
+    encoding = lrc.parse_from_file(path, tap=tap)
+    lyrics = lrc.lyrics
+    problems = []
+    if not len(lyrics):
+        problems.append("no lyrics")
+    disordered = list(iter_disordered_rows(raw_timestamps))
+    if disordered:
+        problems.append(f"{len(disordered)} disordered timestamp(s), first at line {disordered[0] + 1}")
+    untimed = sum(1 for ts in lyrics.timestamps if ts != ts)
+    if untimed:
+        problems.append(f"{untimed} untimed line(s)")
+    if lrc.invalid_word_timings:
+        problems.append(f"{lrc.invalid_word_timings} line(s) with word timings before the line timestamp")
+    if problems:
+        return f"{encoding}: " + "; ".join(problems), False
+    return encoding, True
+
+
+_COMMANDS = {"convert": _convert, "offset": _offset, "validate": _validate}
+
+
+def process_file(task):
+    """在工作进程中处理单个文件，返回 (路径, 是否通过, 说明, 行数, 字节数)；异常不会抛出"""
+    command, path, out_path, options = task
+    try:
+        size = os.path.getsize(path)
+        lrc = Lrc()
+        message, ok = _COMMANDS[command](lrc, path, out_path, options)
+        return path, ok, message, len(lrc.lyrics), size
+    except (OSError, UnicodeError, LookupError, ValueError) as e:
+        return path, False, f"error: {e}", 0, 0
+
+
+def _encoding_arg(value):
+    """--encoding 的参数类型：在分发任务前检查编码名是否有效"""
+    try:
+        codecs.lookup(value)
+    except LookupError:
+        raise argparse.ArgumentTypeError(f"unknown encoding: {value}")
+    return value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="lrc_tool", description="Batch process LRC files without the GUI.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def common(p):
+        p.add_argument("paths", nargs="+", help="LRC files or directories")
+        p.add_argument("-r", "--recursive", action="store_true", help="descend into subdirectories")
+        p.add_argument("--pattern", default="*.lrc", help="file name pattern inside directories (default: *.lrc)")
+        p.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+        p.add_argument("-q", "--quiet", action="store_true", help="only print failures and the summary")
+
+    def writer(p, default_encoding):
+        p.add_argument("-o", "--output", help="write results under this directory instead of in place")
+        p.add_argument("--encoding", default=default_encoding, type=_encoding_arg,
+                       help="output encoding" + (" (default: %(default)s)" if default_encoding else " (default: keep source)"))
+        p.add_argument("--single-line", action="store_true",
+                       help="write bilingual lines as 'original / translated' instead of separate lines")
+
+    p = sub.add_parser("convert", help="re-encode and normalise to the separated bilingual format")
+    common(p)
+    writer(p, "utf-8")
+
+    p = sub.add_parser("offset", help="shift every timestamp")
+    common(p)
+    writer(p, None)
+    p.add_argument("--ms", type=int, required=True, help="offset in milliseconds (may be negative)")
+
+    p = sub.add_parser("validate", help="report disordered, untimed or empty files")
+    common(p)
+    return parser
+
+
+def run(options, out=sys.stdout):
+    """执行命令并输出结果，返回退出码"""
+    files = list(iter_lrc_files(options.paths, options.pattern.lower(), options.recursive))
+    output_dir = getattr(options, "output", None)
+    # 工作进程只需要命令参数，不需要整个 Namespace 中的路径列表
+    worker_options = argparse.Namespace(**{k: v for k, v in vars(options).items() if k != "paths"})
+    tasks = [(options.command, path, _output_path(path, rel, output_dir), worker_options)
+             for path, rel in files]
+
+    start = time.perf_counter()
+    failed = lines = size = 0
+    if options.jobs > 1 and len(tasks) > 1:
+        pool = Pool(min(options.jobs, len(tasks)))
+        results = pool.imap_unordered(process_file, tasks, chunksize=_CHUNK_SIZE)
+    else:
+        pool = None
+        results = map(process_file, tasks)
+    try:
+        for path, ok, message, n_lines, n_bytes in results:
+            lines += n_lines
+            size += n_bytes
+            if not ok:
+                failed += 1
+            if not ok or not options.quiet:
+                print(f"{'OK  ' if ok else 'FAIL'} {path}: {message}", file=out, flush=True)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(f"{len(tasks)} file(s), {failed} failed, {lines} line(s) in {elapsed:.2f}s "
+          f"({len(tasks) / elapsed:.1f} files/s, {size / elapsed / 1e6:.2f} MB/s)", file=out)
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    options = parser.parse_args(argv)
+    for path in options.paths:
+        if not os.path.exists(path):
+            parser.error(f"no such file or directory: {path}")
+    return run(options)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,336 @@
+# lyrics_model.py
+"""直接以 Lrc 为数据源的歌词表格模型，视图只在需要绘制时读取数据"""
+import re
+from contextlib import contextmanager
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal
+from PySide6.QtGui import QColor
+
+from lrc import cached_romaji, contiguous_runs, iter_disordered_rows, sung_length
+from i18n import LANG
+
+# 表格列与歌词字段的对应关系
+COLUMN_FIELDS = ('ts', 'original', 'translated')
+# 原文列的自定义角色：播放行已唱过的字符数（逐字高亮），其他单元格为 None
+KARAOKE_ROLE = Qt.ItemDataRole.UserRole + 1
+
+_TIME_RE = re.compile(r'(\d+):(\d{2,2})\.(\d{2,2})')
+
+
+def format_time(ms):
+    """将毫秒数格式化为 mm:ss.xx"""
+    if ms < 0: ms = 0
+    total_seconds = ms / 1000.0
+    minutes = int(total_seconds / 60)
+    seconds = int(total_seconds % 60)
+    centiseconds = int(round((total_seconds - int(total_seconds)) * 100))
+    # 确保厘秒在0-99范围内
+    if centiseconds >= 100:
+        centiseconds = 99
+    elif centiseconds < 0:
+        centiseconds = 0
+    return f"{minutes:02d}:{seconds:02d}.{centiseconds:02d}"
+
+
+def parse_time(ts_str):
+    """将表格中的 mm:ss.xx 文本解析为秒数，无法解析时返回 None"""
+    match = _TIME_RE.match(ts_str)
+    if match:
+        m, s, cs = map(int, match.groups())
+        return m * 60 + s + cs / 100.0
+    return None
+
+
+# set_timestamps 修改超过这么多行时整体重算乱序标记
+_BULK_DISORDER_ROWS = 256
+# 零散的行超过这么多个连续区间时，合并为一次覆盖首尾的 dataChanged
+_MAX_CHANGED_RUNS = 32
+
+
+class LyricsTableModel(QAbstractTableModel):
+    """歌词表格模型。
+
+    数据直接读写 lrc.lyrics，不再复制到表格项中。所有修改都通过本类的
+    set_value / set_timestamps / insert_lines / remove_rows 进行，以便发出精确的行插入、删除和
+    dataChanged 通知。用户在视图中编辑单元格时只发出 editRequested，由主窗口
+    生成撤销命令后再回调 set_value。
+    """
+    editRequested = Signal(int, str, object)  # row, field, value
+    romajiNeeded = Signal(int, str)           # row, text：提示悬停时缓存未命中
+
+    def __init__(self, lrc, parent=None):
+        super().__init__(parent)
+        self.lrc = lrc
+        self.romaji_enabled = False
+        self.play_row = -1
+        # 播放行的逐字高亮进度（已唱字符数），该行没有逐字时间时为 None
+        self.karaoke_chars = None
+        # 查找栏的匹配行，原文和译文单元格以浅色背景标出
+        self.search_matches = frozenset()
+        # 乱序标记位图：每行一个字节，1 表示该行时间戳早于前一个有时间戳的行
+        self._disorder = bytearray()
+        # 每行一个字节，1 表示该行有时间戳；用 bytearray.find 在 C 层查找相邻的有时间戳行
+        self._timed = bytearray()
+        self._rebuild_disorder()
+
+        # 颜色定义
+        self.play_highlight_color = QColor("#3d59a1") # 播放高亮
+        self.disordered_ts_color = QColor("#D16969") # 红色错误提示
+        self.search_match_color = QColor("#fff3b0") # 查找匹配
+
+    @property
+    def lyrics(self):
+        return self.lrc.lyrics
+
+    # ---- Qt 模型接口 ----
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.lrc.lyrics)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMN_FIELDS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return (LANG["lyrics_table_header_time"], LANG["lyrics_table_header_original"],
+                    LANG["lyrics_table_header_translated"])[section]
+        return str(section + 1)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsEditable
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            value = self.lrc.lyrics.get(row, COLUMN_FIELDS[column])
+            if column == 0:
+                return format_time(value * 1000) if value is not None else ""
+            return value
+        if role == Qt.ItemDataRole.BackgroundRole:
+            if column == 0 and self._disorder[row]:
+                return self.disordered_ts_color
+            if row == self.play_row:
+                return self.play_highlight_color
+            if column and row in self.search_matches:
+                return self.search_match_color
+            return None
+        if role == Qt.ItemDataRole.ToolTipRole and column == 1 and self.romaji_enabled:
+            text = self.lrc.lyrics.get(row, 'original')
+            if not text:
+                return None
+            romaji = cached_romaji(text)
+            if romaji is None:
+                self.romajiNeeded.emit(row, text)
+            return romaji
+        if role == KARAOKE_ROLE:
+            return self.karaoke_chars if column == 1 and row == self.play_row else None
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        row = index.row()
+        field = COLUMN_FIELDS[index.column()]
+        if field == 'ts':
+            value = parse_time(value)
+        if value == self.lrc.lyrics.get(row, field):
+            return False
+        self.editRequested.emit(row, field, value)
+        return True
+
+    # ---- 编辑接口（供撤销命令调用） ----
+
+    def set_value(self, row, field, value):
+        self.lrc.lyrics.set(row, field, value)
+        if field == 'words':
+            # 逐字时间只影响原文列的高亮，不需要重新测量行高
+            index = self.index(row, 1)
+            self.dataChanged.emit(index, index, [KARAOKE_ROLE])
+            return
+        column = COLUMN_FIELDS.index(field)
+        index = self.index(row, column)
+        self.dataChanged.emit(index, index)
+        if field == 'ts':
+            self._timed[row] = value is not None
+            changed = []
+            self._update_disorder(row, changed)
+            self._update_disorder(self._next_timed(row + 1), changed)
+            self._emit_disorder_changed(changed)
+
+    def set_timestamps(self, rows, values):
+        """批量修改时间戳：数据一次写入，只重绘时间戳列中实际变化的连续区间"""
+        if not rows:
+            return
+        self.lrc.lyrics.set_timestamps(rows, values)
+        rows = sorted(set(rows))
+        if len(rows) > _BULK_DISORDER_ROWS:
+            # 大批量修改时整体重算乱序标记，再找出标记变化的行，比逐行检查快
+            old = self._disorder
+            self._rebuild_disorder()
+            changed = [row for row, (a, b) in enumerate(zip(old, self._disorder)) if a != b]
+        else:
+            timestamps = self.lrc.lyrics.timestamps
+            for row in rows:
+                self._timed[row] = timestamps[row] == timestamps[row]
+            # 乱序标记只可能在被修改的行及其后最近的有时间戳行上变化
+            changed = []
+            for row in rows:
+                self._update_disorder(row, changed)
+                self._update_disorder(self._next_timed(row + 1), changed)
+        for first, count in contiguous_runs(sorted(set(rows).union(changed))):
+            self.emit_rows_changed(first, first + count - 1, columns=(0, 0))
+
+    def set_values(self, changes):
+        """批量修改文本单元格 [(行, 字段, 值), ...]（如全部替换），按列合并为连续区间通知视图"""
+        lyrics = self.lrc.lyrics
+        changed = {}
+        for row, field, value in changes:
+            lyrics.set(row, field, value)
+            if field != 'words':
+                changed.setdefault(COLUMN_FIELDS.index(field), set()).add(row)
+        for column, rows in changed.items():
+            self.emit_scattered_rows_changed(sorted(rows), columns=(column, column))
+
+    def insert_lines(self, row, lines):
+        count = len(lines)
+        if not count:
+            return
+        self.beginInsertRows(QModelIndex(), row, row + count - 1)
+        self.lrc.lyrics.insert_lines(row, lines)
+        self._disorder[row:row] = bytes(count)
+        ts = self.lrc.lyrics.timestamps
+        self._timed[row:row] = bytes(ts[r] == ts[r] for r in range(row, row + count))
+        self.endInsertRows()
+        changed = []
+        for r in range(row, row + count):
+            self._update_disorder(r, changed)
+        self._update_disorder(self._next_timed(row + count), changed)
+        self._emit_disorder_changed(changed)
+
+    def remove_rows(self, row, count):
+        if count <= 0:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row + count - 1)
+        del self.lrc.lyrics[row:row + count]
+        del self._disorder[row:row + count]
+        del self._timed[row:row + count]
+        self.endRemoveRows()
+        changed = []
+        self._update_disorder(self._next_timed(row), changed)
+        self._emit_disorder_changed(changed)
+
+    @contextmanager
+    def resetting(self):
+        """整体替换歌词（如打开文件）时使用，保证视图在修改前后收到重置通知"""
+        self.beginResetModel()
+        try:
+            yield
+        finally:
+            self.play_row = -1
+            self.karaoke_chars = None
+            self.search_matches = frozenset()
+            self._rebuild_disorder()
+            self.endResetModel()
+
+    # ---- 高亮状态 ----
+
+    def emit_rows_changed(self, first, last, roles=None, columns=None):
+        """通知视图第 first..last 行需要重绘"""
+        if first > last:
+            return
+        left, right = columns if columns else (0, len(COLUMN_FIELDS) - 1)
+        top_left, bottom_right = self.index(first, left), self.index(last, right)
+        if roles is None:
+            self.dataChanged.emit(top_left, bottom_right)
+        else:
+            self.dataChanged.emit(top_left, bottom_right, roles)
+
+    def emit_scattered_rows_changed(self, rows, roles=None, columns=None):
+        """通知视图若干（升序、可能不连续的）行需要重绘。区间太多时合并为一次通知，
+        视图只重绘可见部分，比逐个区间通知快得多"""
+        runs = contiguous_runs(rows)
+        if len(runs) > _MAX_CHANGED_RUNS:
+            runs = [(rows[0], rows[-1] - rows[0] + 1)]
+        for first, count in runs:
+            self.emit_rows_changed(first, first + count - 1, roles, columns)
+
+    def set_play_row(self, row):
+        """切换播放高亮行，只重绘新旧两行"""
+        old_row, self.play_row = self.play_row, row
+        self.karaoke_chars = None
+        for r in (old_row, row):
+            if 0 <= r < self.rowCount():
+                self.emit_rows_changed(r, r, [Qt.ItemDataRole.BackgroundRole])
+
+    def set_search_matches(self, rows):
+        """更新查找匹配行的背景，只重绘匹配状态变化的行"""
+        rows = frozenset(rows)
+        size = self.rowCount()
+        changed = sorted(row for row in rows.symmetric_difference(self.search_matches) if row < size)
+        self.search_matches = rows
+        self.emit_scattered_rows_changed(changed, [Qt.ItemDataRole.BackgroundRole], (1, 2))
+
+    def set_karaoke_position(self, seconds):
+        """按播放时间更新播放行的逐字高亮进度，进度有变化时只重绘该行原文单元格并返回 True"""
+        row = self.play_row
+        chars = None
+        if 0 <= row < self.rowCount():
+            lyrics = self.lrc.lyrics
+            words = lyrics.get(row, 'words')
+            ts = lyrics.get(row, 'ts')
+            if words and ts is not None:
+                # 精确到 1/8 个字符，足够平滑，也避免每一帧都重绘
+                chars = round(sung_length(words, len(lyrics.get(row, 'original')), seconds - ts) * 8) / 8
+        if chars == self.karaoke_chars:
+            return False
+        self.karaoke_chars = chars
+        self.emit_rows_changed(row, row, [KARAOKE_ROLE], columns=(1, 1))
+        return True
+
+    # ---- 时间戳乱序标记 ----
+    # 一行乱序当且仅当它的时间戳早于它前面最近一个有时间戳的行。修改一行只会
+    # 影响它自己和它后面最近一个有时间戳的行，因此每次修改只需检查这两行。
+
+    def is_disordered(self, row):
+        return bool(self._disorder[row])
+
+    def _rebuild_disorder(self):
+        """整体重新计算乱序标记（仅在整份歌词替换时调用）"""
+        timestamps = self.lrc.lyrics.timestamps
+        disorder = bytearray(len(timestamps))
+        for row in iter_disordered_rows(timestamps):
+            disorder[row] = 1
+        self._disorder = disorder
+        self._timed = bytearray(ts == ts for ts in timestamps)
+
+    def _next_timed(self, row):
+        """row 及其后第一个有时间戳的行，没有则返回 -1"""
+        return self._timed.find(1, row)
+
+    def _prev_timed(self, row):
+        """row 之前最近一个有时间戳的行，没有则返回 -1"""
+        return self._timed.rfind(1, 0, row)
+
+    def _update_disorder(self, row, changed):
+        """重新判断单行的乱序标记，标记发生变化的行记入 changed"""
+        if row < 0:
+            return
+        ts = self.lrc.lyrics.timestamps
+        value = ts[row]
+        flag = 0
+        if value == value:
+            prev = self._prev_timed(row)
+            flag = 1 if prev >= 0 and value < ts[prev] else 0
+        if self._disorder[row] != flag:
+            self._disorder[row] = flag
+            changed.append(row)
+
+    def _emit_disorder_changed(self, rows):
+        for row in rows:
+            self.emit_rows_changed(row, row, [Qt.ItemDataRole.BackgroundRole], (0, 0))
@@ -6,6 +6,9 @@ from main_window import MainWindow, resource_path
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
+    # QSettings 按组织名和应用名保存设置（如打轴延迟补偿）
+    app.setOrganizationName("SkyDream01")
+    app.setApplicationName("LRC Timeline Editor")
     
     # 加载QSS样式表
     try:
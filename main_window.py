@@ -1,28 +1,64 @@
 # main_window.py
+import copy
+import functools
 import os
 import sys
-import re
-import copy
+import time
+from array import array
+from collections import OrderedDict
+from bisect import bisect_right
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QGroupBox, QHBoxLayout, QPushButton,
-    QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView,
+    QAbstractItemView,
     QMenuBar, QFileDialog, QLineEdit, QFormLayout, QSlider, QLabel,
     QStatusBar, QMessageBox, QComboBox, QSizePolicy, QToolBar, QApplication,
-    QTextEdit, QAbstractSpinBox
+    QTextEdit, QAbstractSpinBox, QDialog, QProgressBar, QToolButton, QTabBar, QStackedWidget
 )
 from PySide6.QtGui import (
-    QAction, QKeySequence, QColor, QIcon, QShortcut, QActionGroup,
-    QUndoStack, QUndoCommand, QPalette
+    QAction, QKeySequence, QIcon, QShortcut, QActionGroup,
+    QUndoGroup, QPalette
 )
-from PySide6.QtCore import Qt, QUrl, QTimer, QSize
+from PySide6.QtCore import Qt, QUrl, QSize, QSettings, QTimer
 from PySide6.QtMultimedia import QMediaPlayer
 
 import qtawesome as qta
 
-from lrc import Lrc
+from lrc import (
+    Lrc, LyricLine, cached_romaji, seed_romaji_cache, warm_up_kakasi, PYKAKASI_AVAILABLE,
+    pack_word_timings, scale_word_timings, word_boundaries
+)
+from romaji_loader import RomajiTooltipLoader
+from lyrics_model import format_time, parse_time
+from search_index import REPLACEABLE_FIELDS, replace_text
+from find_panel import FindReplacePanel
+from journal import default_journal_dir, find_recoverable
+from document import Document
+from file_jobs import FileJob
+from project import Project, PROJECT_SUFFIX, read_project, write_project, audio_reference, audio_unchanged
+from commands import (
+    SetCellCommand, SetTimestampsCommand, SetWordTimingsCommand, ReplaceTextCommand, InsertRowsCommand,
+    DeleteRowsCommand, MergeRowsCommand, SplitRowCommand, MetaCommand, CompositeCommand,
+    command_state, restore_history
+)
 from player import Player
+from perf import timed, measure
+from perf_dialog import PerformanceDialog
+from calibration import CalibrationDialog
+from refresh_scheduler import RefreshScheduler
+from timing_dialog import TransformTimingsDialog
 from i18n import LANG
 
+try:
+    from audio_decode import DecodeJob
+    from waveform import WaveformView, PeakAccumulator, PeakPyramid, default_cache_dir, peak_cache_path
+    from onsets import OnsetAccumulator, suggest_timestamps
+    AUDIO_ANALYSIS_AVAILABLE = True
+except ImportError:  # 缺少 numpy 时不显示波形条，也不提供打轴建议
+    AUDIO_ANALYSIS_AVAILABLE = False
+
+# 内存中保留的波形峰值金字塔个数（按音频共享给所有标签页）
+_PYRAMID_CACHE_SIZE = 16
+
 def resource_path(relative_path):
     """ 获取资源的绝对路径，适用于开发环境和 PyInstaller 打包环境 """
     try:
@@ -32,90 +68,144 @@ def resource_path(relative_path):
         base_path = os.path.dirname(os.path.abspath(__file__))
     return os.path.join(base_path, relative_path)
 
-class EditCommand(QUndoCommand):
-    def __init__(self, main_window, old_lrc, description):
-        super().__init__(description)
-        self.main_window = main_window
-        self.old_lrc = copy.deepcopy(old_lrc)
-        self.new_lrc = copy.deepcopy(main_window.lrc)
-
-    def undo(self):
-        self.main_window.lrc = self.old_lrc
-        self.main_window.update_ui_from_lrc()
-        self.main_window.is_dirty = True
+@functools.cache
+def icon(name):
+    """qtawesome 图标：每种只渲染一次，所有标签页和按钮共用"""
+    return qta.icon(name)
 
-    def redo(self):
-        self.main_window.lrc = self.new_lrc
-        self.main_window.update_ui_from_lrc()
-        self.main_window.is_dirty = True
+def _document_attribute(name):
+    """转发到当前标签页文档的属性"""
+    return property(lambda self: getattr(self.document, name),
+                    lambda self, value: setattr(self.document, name, value))
 
 class MainWindow(QMainWindow):
+    # 编辑、打轴、查找和撤销命令都通过这些属性作用于当前标签页的文档
+    lrc = _document_attribute('lrc')
+    lyrics_model = _document_attribute('lyrics_model')
+    undo_stack = _document_attribute('undo_stack')
+    search_index = _document_attribute('search_index')
+    journal = _document_attribute('journal')
+    current_lrc_file = _document_attribute('current_lrc_file')
+    current_project_file = _document_attribute('current_project_file')
+    current_audio_file = _document_attribute('current_audio_file')
+    is_dirty = _document_attribute('is_dirty')
+    edit_generation = _document_attribute('edit_generation')
+    user_selected_row = _document_attribute('user_selected_row')
+    lyrics_table = _document_attribute('view')
+    row_sizer = _document_attribute('row_sizer')
+    _row_filter_active = _document_attribute('row_filter_active')
+
     def __init__(self):
         super().__init__()
-        self.lrc = Lrc()
         self.player = Player()
-        self.current_audio_file = ""
-        self.current_lrc_file = None
         self.save_as_separated_default = True
         
         # 记录上一行高亮行号，用于增量更新优化
         self.last_highlighted_row = -1
-        self.user_selected_row = []
-        self.is_dirty = False
-
-        # 颜色定义
-        self.play_highlight_color = QColor("#3d59a1") # 播放高亮
-        self.selection_highlight_color = QColor("#3d59a1") # 选中高亮
-        self.disordered_ts_color = QColor("#D16969") # 红色错误提示
-
-        self.undo_stack = QUndoStack(self)
-        self.undo_stack.setUndoLimit(10)
-
-        self.ui_update_timer = QTimer(self)
-        self.ui_update_timer.setInterval(100) # 100ms刷新一次UI
+        # 后台文件读写（同一时间只有一个）；打开文件期间锁定编辑
+        self.file_job = None
+        self.editing_locked = False
+        self._edit_triggers = None
+        self._locked_document = None
+
+        # 打轴延迟补偿（毫秒）：由 设置 > 校准打轴延迟 测得，每次标记时间戳时减去
+        self.settings = QSettings()
+        self.mark_offset_ms = self.settings.value("marking/offset_ms", 0, type=int)
+        # 非当前标签页的表格视图和查找索引最多占用这么多内存，超出时从最久未查看的开始卸载
+        self.view_memory_budget = self.settings.value("tabs/view_memory_budget_mb", 64, type=int) << 20
+
+        # 每个标签页一个文档（歌词、模型、撤销栈、查找索引、恢复日志），撤销栈由 QUndoGroup 统一管理；
+        # 播放器、罗马音转换、音频解码和波形缓存由所有标签页共用
+        self.undo_group = QUndoGroup(self)
+        self.journal_dir = default_journal_dir()
+        self.documents = []
+        self._activations = 0
+        self.document = self.create_document()
+
+        # 罗马音提示在后台线程中计算（pykakasi 词典和罗马音缓存都是进程内共享的，与标签页无关）
+        self.romaji_loader = RomajiTooltipLoader(lambda text: self.lrc.convert_to_romaji(text), self)
+
+        # 波形峰值和打轴建议都在后台线程中边解码边计算；波形缓存到磁盘
+        self.waveform_loader = None
+        self.onset_analyzer = None
+        # 按音频路径缓存的波形峰值和乐句起点：同一音频在各标签页间切换时不必重新解码
+        self.pyramids = OrderedDict()
+        self.phrase_starts = {}
+        # 播放器当前加载的音频
+        self.loaded_audio = ""
+        self.peak_cache_dir = None
+        if AUDIO_ANALYSIS_AVAILABLE:
+            cache_dir = self.peak_cache_dir = default_cache_dir()
+            self.waveform_loader = DecodeJob(lambda: PeakAccumulator(cache_dir), self)
+            self.onset_analyzer = DecodeJob(OnsetAccumulator, self)
+
+        # 播放时的界面刷新：可见且激活时按显示器刷新率，失去焦点时降频，最小化时暂停
+        self.refresh_scheduler = RefreshScheduler(self, self.update_ui_on_timer)
+        self._last_ui_state = None  # 上次刷新时的 (时间标签文本, 滑块像素位置)
 
         self.setAcceptDrops(True)
         
         self.init_actions()
         self.init_ui()
         self.connect_signals()
-        
-        self.update_lyrics_table()
-        self.update_edit_buttons_state()
+
+        self.tab_bar.addTab(self.document.title())
+        self.activate_document(self.document)
+        self.journal.start()
+        # 窗口显示后再检查上次是否有崩溃留下的日志
+        QTimer.singleShot(0, self.offer_recovery)
 
     def init_actions(self):
         """初始化所有QAction"""
         # 文件操作
-        self.open_audio_action = QAction(qta.icon('fa5s.music'), LANG["menu_open_audio"], self)
-        self.open_lyric_action = QAction(qta.icon('fa5s.file-alt'), LANG["menu_open_lyric"], self)
-        self.save_action = QAction(qta.icon('fa5s.save'), LANG["menu_save_lyric"], self)
+        self.new_tab_action = QAction(icon('fa5s.plus'), LANG["menu_new_tab"], self)
+        self.new_tab_action.setShortcut(QKeySequence.StandardKey.New)  # Ctrl+T 已用于变换时间戳
+        self.close_tab_action = QAction(LANG["menu_close_tab"], self)
+        self.close_tab_action.setShortcut(QKeySequence.StandardKey.Close)
+        self.open_audio_action = QAction(icon('fa5s.music'), LANG["menu_open_audio"], self)
+        self.open_lyric_action = QAction(icon('fa5s.file-alt'), LANG["menu_open_lyric"], self)
+        self.open_project_action = QAction(LANG["menu_open_project"], self)
+        self.save_project_action = QAction(LANG["menu_save_project"], self)
+        self.save_action = QAction(icon('fa5s.save'), LANG["menu_save_lyric"], self)
         self.save_action.setShortcut(QKeySequence.StandardKey.Save)
         self.save_as_action = QAction(LANG["menu_save_lyric_as"], self)
         self.exit_action = QAction(LANG["menu_exit"], self)
 
         # 编辑操作 (Undo/Redo)
-        self.undo_action = self.undo_stack.createUndoAction(self, LANG["menu_undo"])
-        self.redo_action = self.undo_stack.createRedoAction(self, LANG["menu_redo"])
-        self.undo_action.setIcon(qta.icon('fa5s.undo'))
-        self.redo_action.setIcon(qta.icon('fa5s.redo'))
+        # 撤销/重做作用于当前标签页的撤销栈
+        self.undo_action = self.undo_group.createUndoAction(self, LANG["menu_undo"])
+        self.redo_action = self.undo_group.createRedoAction(self, LANG["menu_redo"])
+        self.undo_action.setIcon(icon('fa5s.undo'))
+        self.redo_action.setIcon(icon('fa5s.redo'))
         self.undo_action.setShortcut(QKeySequence.StandardKey.Undo)
         self.redo_action.setShortcut(QKeySequence.StandardKey.Redo)
 
         # 播放控制
-        self.play_pause_action = QAction(qta.icon('fa5s.play-circle'), LANG['play_button'], self)
+        self.play_pause_action = QAction(icon('fa5s.play-circle'), LANG['play_button'], self)
         self.play_pause_action.setToolTip(f"{LANG['play_button']} (Space)")
         
-        self.stop_action = QAction(qta.icon('fa5s.stop-circle'), LANG['stop_button'], self)
-        self.rewind_action = QAction(qta.icon('fa5s.backward'), LANG['rewind_button'], self)
-        self.forward_action = QAction(qta.icon('fa5s.forward'), LANG['forward_button'], self)
+        self.stop_action = QAction(icon('fa5s.stop-circle'), LANG['stop_button'], self)
+        self.rewind_action = QAction(icon('fa5s.backward'), LANG['rewind_button'], self)
+        self.forward_action = QAction(icon('fa5s.forward'), LANG['forward_button'], self)
 
         # 打轴与定位
         self.mark_time_action = QAction(LANG['mark_time_button'], self)
         self.mark_time_action.setShortcut(QKeySequence("F8")) # 快捷键 F8
         self.addAction(self.mark_time_action) # 添加到主窗口以便全局响应
+
+        self.mark_word_action = QAction(LANG["mark_word_action"], self)
+        self.mark_word_action.setShortcut(QKeySequence("F9"))
+        self.mark_word_action.setToolTip(LANG["mark_word_tooltip"])
+        self.addAction(self.mark_word_action)
+        self.clear_word_timings_action = QAction(LANG["menu_clear_word_timings"], self)
+
+        self.find_action = QAction(icon('fa5s.search'), LANG["menu_find"], self)
+        self.find_action.setShortcut(QKeySequence.StandardKey.Find)
+        self.replace_action = QAction(LANG["menu_replace"], self)
+        self.replace_action.setShortcut(QKeySequence("Ctrl+H"))
         
         self.replay_line_action = QAction(LANG["replay_line_action"], self)
-        self.replay_line_action.setIcon(qta.icon('fa5s.sync-alt'))
+        self.replay_line_action.setIcon(icon('fa5s.sync-alt'))
         self.replay_line_action.setShortcut(QKeySequence("F5"))
         self.replay_line_action.setToolTip(LANG["replay_line_tooltip"])
         self.addAction(self.replay_line_action)
@@ -139,12 +229,8 @@ class MainWindow(QMainWindow):
         self.show_translated_action = QAction(LANG["view_show_translated"], self, checkable=True)
         self.show_translated_action.setChecked(True)  # 默认显示译文列
         
-        # 检查pykakasi是否可用
-        try:
-            import pykakasi
-            pykakasi_available = True
-        except ImportError:
-            pykakasi_available = False
+        # 检查pykakasi是否可用（不在启动时导入）
+        pykakasi_available = PYKAKASI_AVAILABLE
         
         romaji_text = LANG["view_romaji_tooltips"]
         if not pykakasi_available:
@@ -154,6 +240,22 @@ class MainWindow(QMainWindow):
         self.romaji_tooltips_action.setChecked(pykakasi_available)  # 默认启用罗马音提示（如果可用）
         self.romaji_tooltips_action.setEnabled(pykakasi_available)
 
+        waveform_text = LANG["view_waveform"]
+        if not AUDIO_ANALYSIS_AVAILABLE:
+            waveform_text += " " + LANG["waveform_unavailable"]
+        self.show_waveform_action = QAction(waveform_text, self, checkable=True)
+        self.show_waveform_action.setChecked(AUDIO_ANALYSIS_AVAILABLE)
+        self.show_waveform_action.setEnabled(AUDIO_ANALYSIS_AVAILABLE)
+
+        self.transform_timings_action = QAction(icon('fa5s.arrows-alt-h'), LANG["menu_transform_timings"], self)
+        self.transform_timings_action.setShortcut(QKeySequence("Ctrl+T"))
+
+        suggest_text = LANG["menu_suggest_timestamps"]
+        if not AUDIO_ANALYSIS_AVAILABLE:
+            suggest_text += " " + LANG["waveform_unavailable"]
+        self.suggest_timestamps_action = QAction(icon('fa5s.magic'), suggest_text, self)
+        self.suggest_timestamps_action.setEnabled(AUDIO_ANALYSIS_AVAILABLE)
+
     def init_ui(self):
         """初始化整体UI布局"""
         self.setWindowTitle(LANG["app_title"])
@@ -165,7 +267,18 @@ class MainWindow(QMainWindow):
 
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
-        main_layout = QHBoxLayout(central_widget)
+        central_layout = QVBoxLayout(central_widget)
+
+        # 每个标签页一个歌词文档
+        self.tab_bar = QTabBar()
+        self.tab_bar.setDocumentMode(True)
+        self.tab_bar.setTabsClosable(True)
+        self.tab_bar.setMovable(True)
+        self.tab_bar.setExpanding(False)
+        central_layout.addWidget(self.tab_bar)
+
+        main_layout = QHBoxLayout()
+        central_layout.addLayout(main_layout)
 
         left_panel = self.create_left_panel()
         right_panel = self.create_right_panel()
@@ -176,17 +289,35 @@ class MainWindow(QMainWindow):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage(LANG["status_ready"])
+        # 后台打开/保存文件时的进度条和取消按钮
+        self.file_progress = QProgressBar()
+        self.file_progress.setMaximumWidth(160)
+        self.file_progress.setTextVisible(False)
+        self.file_cancel_button = QToolButton()
+        self.file_cancel_button.setIcon(icon('fa5s.times'))
+        self.file_cancel_button.setToolTip(LANG["file_cancel_tooltip"])
+        self.file_cancel_button.setAutoRaise(True)
+        self.file_cancel_button.clicked.connect(self.cancel_file_job)
+        self.status_bar.addPermanentWidget(self.file_progress)
+        self.status_bar.addPermanentWidget(self.file_cancel_button)
+        self.file_progress.hide()
+        self.file_cancel_button.hide()
 
     def create_menu(self):
         """创建菜单栏"""
         menu_bar = self.menuBar()
         
         file_menu = menu_bar.addMenu(LANG["menu_file"])
+        file_menu.addAction(self.new_tab_action)
+        file_menu.addAction(self.close_tab_action)
+        file_menu.addSeparator()
         file_menu.addAction(self.open_audio_action)
         file_menu.addAction(self.open_lyric_action)
+        file_menu.addAction(self.open_project_action)
         file_menu.addSeparator()
         file_menu.addAction(self.save_action)
         file_menu.addAction(self.save_as_action)
+        file_menu.addAction(self.save_project_action)
         file_menu.addSeparator()
         file_menu.addAction(self.exit_action)
 
@@ -194,10 +325,17 @@ class MainWindow(QMainWindow):
         edit_menu.addAction(self.undo_action)
         edit_menu.addAction(self.redo_action)
         edit_menu.addSeparator()
+        edit_menu.addAction(self.find_action)
+        edit_menu.addAction(self.replace_action)
+        edit_menu.addSeparator()
         edit_menu.addAction(self.act_add_row)
         edit_menu.addAction(self.act_remove_row)
         edit_menu.addAction(self.act_merge_rows)
         edit_menu.addAction(self.act_split_row)
+        edit_menu.addSeparator()
+        edit_menu.addAction(self.transform_timings_action)
+        edit_menu.addAction(self.suggest_timestamps_action)
+        edit_menu.addAction(self.clear_word_timings_action)
 
         settings_menu = menu_bar.addMenu(LANG["menu_settings"])
         save_format_group = QActionGroup(self)
@@ -216,16 +354,26 @@ class MainWindow(QMainWindow):
         save_format_group.addAction(self.save_separated_action)
         save_format_group.addAction(self.save_single_line_action)
 
+        settings_menu.addSeparator()
+        calibrate_action = QAction(LANG["calibration_action"], self)
+        calibrate_action.triggered.connect(self.show_calibration_dialog)
+        settings_menu.addAction(calibrate_action)
+
         # 视图菜单
         view_menu = menu_bar.addMenu(LANG["menu_view"])
         view_menu.addAction(self.show_translated_action)
         view_menu.addAction(self.romaji_tooltips_action)
+        view_menu.addAction(self.show_waveform_action)
 
         help_menu = menu_bar.addMenu(LANG["menu_help"])
         
         shortcuts_action = QAction(LANG["shortcuts_action"], self)
         shortcuts_action.triggered.connect(self.show_shortcuts_dialog)
         help_menu.addAction(shortcuts_action)
+
+        perf_action = QAction(LANG["perf_action"], self)
+        perf_action.triggered.connect(self.show_performance_dialog)
+        help_menu.addAction(perf_action)
         
         about_action = QAction(LANG["menu_about"], self)
         about_action.triggered.connect(self.show_about_dialog)
@@ -287,10 +435,19 @@ class MainWindow(QMainWindow):
         lyrics_group = QGroupBox(LANG["tab_editor"])
         lyrics_layout = QVBoxLayout()
         lyrics_layout.setContentsMargins(5, 10, 5, 5)
+
+        self.find_panel = FindReplacePanel(self.search_index, PYKAKASI_AVAILABLE)
+        self.find_panel.hide()
+        lyrics_layout.addWidget(self.find_panel)
         
-        self.lyrics_table = QTableWidget()
-        self.setup_lyrics_table()
-        lyrics_layout.addWidget(self.lyrics_table)
+        self.waveform_view = None
+        if AUDIO_ANALYSIS_AVAILABLE:
+            self.waveform_view = WaveformView(self.lrc)
+            lyrics_layout.addWidget(self.waveform_view)
+
+        # 各标签页的表格视图；被卸载的视图切换回来时重建
+        self.view_stack = QStackedWidget()
+        lyrics_layout.addWidget(self.view_stack)
         lyrics_group.setLayout(lyrics_layout)
         return lyrics_group
 
@@ -329,7 +486,7 @@ class MainWindow(QMainWindow):
         layout.setContentsMargins(0, 5, 0, 0)
         
         self.mark_time_button = QPushButton(f"{LANG['mark_time_button']} (F8)")
-        self.mark_time_button.setIcon(qta.icon('fa5s.map-marker-alt'))
+        self.mark_time_button.setIcon(icon('fa5s.map-marker-alt'))
         self.mark_time_button.setMinimumHeight(35)
         self.mark_time_button.setToolTip("快捷键: F8")
         layout.addWidget(self.mark_time_button)
@@ -356,11 +513,18 @@ class MainWindow(QMainWindow):
         return group
 
     def connect_signals(self):
-        """连接所有信号和槽"""
+        """连接所有信号和槽（各文档的模型和表格视图在 create_document / activate_document 中连接）"""
+        self.new_tab_action.triggered.connect(self.new_document)
+        self.close_tab_action.triggered.connect(lambda: self.close_document(self.document))
+        self.tab_bar.currentChanged.connect(self.on_tab_changed)
+        self.tab_bar.tabCloseRequested.connect(lambda index: self.close_document(self.documents[index]))
+        self.tab_bar.tabMoved.connect(self.on_tab_moved)
         self.open_audio_action.triggered.connect(self.open_audio_file)
         self.open_lyric_action.triggered.connect(self.open_lyric_file)
         self.save_action.triggered.connect(self.save_lrc_file)
         self.save_as_action.triggered.connect(self.save_lrc_file_as)
+        self.open_project_action.triggered.connect(self.open_project_file)
+        self.save_project_action.triggered.connect(self.save_project_file)
         self.exit_action.triggered.connect(self.close)
         
         self.play_pause_action.triggered.connect(self.toggle_play_pause)
@@ -369,11 +533,24 @@ class MainWindow(QMainWindow):
         self.forward_action.triggered.connect(lambda: self.player.set_pos(self.player.get_pos() + 2000))
         
         self.mark_time_action.triggered.connect(self.mark_timestamp)
+        self.mark_word_action.triggered.connect(self.mark_word)
+        self.clear_word_timings_action.triggered.connect(self.clear_word_timings)
+        self.find_action.triggered.connect(lambda: self.open_find_panel(False))
+        self.replace_action.triggered.connect(lambda: self.open_find_panel(True))
+        self.find_panel.matchesChanged.connect(self.on_find_matches_changed)
+        self.find_panel.rowActivated.connect(self.select_and_show_row)
+        self.find_panel.replaceRequested.connect(self.replace_in_rows)
+        self.find_panel.romajiRequested.connect(self.schedule_search_romaji)
+        # 歌词被修改（含撤销/重做）后重新检索
+        self.undo_group.indexChanged.connect(self.find_panel.update_matches)
         self.replay_line_action.triggered.connect(self.replay_current_line)
 
         # 视图菜单连接
         self.show_translated_action.triggered.connect(self.toggle_translated_column)
         self.romaji_tooltips_action.triggered.connect(self.toggle_romaji_tooltips)
+        self.show_waveform_action.triggered.connect(self.toggle_waveform)
+        self.transform_timings_action.triggered.connect(self.transform_timings)
+        self.suggest_timestamps_action.triggered.connect(self.suggest_timestamps_from_audio)
 
         # 按钮连接
         self.add_row_button.clicked.connect(self.add_row)
@@ -392,20 +569,32 @@ class MainWindow(QMainWindow):
         self.volume_slider.valueChanged.connect(self.on_volume_changed)
         self.speed_combo.currentTextChanged.connect(self.on_speed_changed)
         
-        self.lyrics_table.itemDoubleClicked.connect(self.play_from_selection)
-        self.lyrics_table.itemChanged.connect(self.sync_table_to_lrc)
-        self.lyrics_table.itemSelectionChanged.connect(self.on_user_selection_changed)
-
-        self.title_edit.editingFinished.connect(lambda: self.create_command("编辑标题"))
-        self.artist_edit.editingFinished.connect(lambda: self.create_command("编辑歌手"))
-        self.album_edit.editingFinished.connect(lambda: self.create_command("编辑专辑"))
-        self.title_edit.textChanged.connect(lambda t: self.lrc.meta.update({'ti': t}))
-        self.artist_edit.textChanged.connect(lambda t: self.lrc.meta.update({'ar': t}))
-        self.album_edit.textChanged.connect(lambda t: self.lrc.meta.update({'al': t}))
+        self.romaji_loader.resultsReady.connect(self.apply_romaji_results)
+
+        if self.waveform_view is not None:
+            self.waveform_view.seekRequested.connect(self.seek_to)
+            self.waveform_loader.loaded.connect(self.on_waveform_loaded)
+            self.waveform_loader.progress.connect(self.waveform_view.set_loading)
+            self.waveform_loader.failed.connect(self.on_waveform_failed)
+            self.player.positionChanged.connect(self.waveform_view.set_position)
+            self.onset_analyzer.loaded.connect(self.on_phrase_starts_ready)
+            self.onset_analyzer.progress.connect(
+                lambda fraction: self.status_bar.showMessage(LANG["status_analyzing"].format(p=fraction)))
+            self.onset_analyzer.failed.connect(
+                lambda path, message: QMessageBox.warning(self, LANG["suggest_title"], LANG["waveform_failed"].format(e=message)))
+
+        self.title_edit.editingFinished.connect(lambda: self.commit_meta_edit('ti', "编辑标题"))
+        self.artist_edit.editingFinished.connect(lambda: self.commit_meta_edit('ar', "编辑歌手"))
+        self.album_edit.editingFinished.connect(lambda: self.commit_meta_edit('al', "编辑专辑"))
 
         self.player.durationChanged.connect(self.update_duration)
         self.player.playbackStateChanged.connect(self.handle_player_state_change)
-        self.ui_update_timer.timeout.connect(self.update_ui_on_timer)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # 窗口显示后再在后台加载罗马音词典，不拖慢启动
+        if self.romaji_tooltips_action.isChecked():
+            warm_up_kakasi()
 
     def keyPressEvent(self, event):
         """重写按键事件：智能处理空格键"""
@@ -421,27 +610,225 @@ class MainWindow(QMainWindow):
         else:
             super().keyPressEvent(event)
 
-    def create_command(self, description: str):
-        command = EditCommand(self, self.lrc, description)
+    # ---- 标签页 ----
+    def create_document(self):
+        """创建一个文档并加入撤销组（不显示，也不创建表格视图）"""
+        document = Document(self.journal_dir, self)
+        model = document.lyrics_model
+        model.editRequested.connect(self.sync_table_to_lrc)
+        model.romajiNeeded.connect(
+            lambda row, text: document is self.document and self.romaji_loader.schedule({row: text}, self.visible_rows()))
+        model.modelReset.connect(lambda: document is self.document and self.find_panel.update_matches())
+        if AUDIO_ANALYSIS_AVAILABLE:
+            # 时间戳标记随歌词修改重绘
+            for signal in (model.dataChanged, model.rowsInserted, model.rowsRemoved, model.modelReset):
+                signal.connect(lambda *args: document is self.document and self.waveform_view.update())
+        document.titleChanged.connect(self.update_tab_titles)
+        self.undo_group.addStack(document.undo_stack)
+        self.documents.append(document)
+        return document
+
+    def new_document(self):
+        """新建一个空白标签页并切换过去"""
+        document = self.create_document()
+        self.tab_bar.addTab(document.title())
+        document.journal.start()
+        self.show_document(document)
+        return document
+
+    def document_for_open(self):
+        """打开文件的目标：当前标签页是空白文档时直接使用，否则新建标签页"""
+        return self.document if self.document.is_pristine() else self.new_document()
+
+    def find_document(self, lrc_path=None, project_path=None):
+        for document in self.documents:
+            if (lrc_path and document.current_lrc_file == lrc_path
+                    or project_path and document.current_project_file == project_path):
+                return document
+        return None
+
+    def show_document(self, document):
+        index = self.documents.index(document)
+        if self.tab_bar.currentIndex() != index:
+            self.tab_bar.setCurrentIndex(index)  # 经 on_tab_changed 切换
+        else:
+            self.activate_document(document)
+
+    def on_tab_changed(self, index):
+        if 0 <= index < len(self.documents):
+            self.activate_document(self.documents[index])
+
+    def on_tab_moved(self, old_index, new_index):
+        self.documents.insert(new_index, self.documents.pop(old_index))
+
+    def update_tab_titles(self):
+        for index, document in enumerate(self.documents):
+            self.tab_bar.setTabText(index, document.title())
+            self.tab_bar.setTabToolTip(index, document.current_lrc_file or document.current_project_file or "")
+
+    @timed("switch_tab")
+    def activate_document(self, document):
+        """把 document 设为当前文档：显示（必要时重建）它的表格视图，切换撤销栈、查找索引和音频"""
+        previous = self.document
+        if previous is not document and previous.view is not None:
+            # 先提交仍在输入框中编辑的歌曲信息，它属于之前的文档
+            self.sync_table_to_lrc_before_save()
+            previous.audio_position = self.player.get_pos()
+            previous.lyrics_model.set_play_row(-1)
+        self.document = document
+        self._activations += 1
+        document.last_shown = self._activations
+
+        if document.view is None:
+            table = document.create_view()
+            table.doubleClicked.connect(self.play_from_selection)
+            table.selectionModel().selectionChanged.connect(self.on_user_selection_changed)
+            table.verticalScrollBar().valueChanged.connect(
+                lambda: self.romaji_loader.prioritize(self.visible_rows()))
+            self.view_stack.addWidget(table)
+            self.toggle_translated_column(self.show_translated_action.isChecked())
+        self.view_stack.setCurrentWidget(document.view)
+        self.undo_group.setActiveStack(document.undo_stack)
+        self.find_panel.set_index(document.search_index)
+        self.find_panel.current_row = min(document.user_selected_row, default=-1)
+        if self.waveform_view is not None:
+            self.waveform_view.set_lrc(document.lrc)
+        self.last_highlighted_row = -1
+        if document.current_audio_file != self.loaded_audio:
+            self.load_audio(document.current_audio_file, position=document.audio_position)
+        # 视图和数据都没有变化，只需刷新与当前文档相关的状态，不必重新计算列宽
+        self.update_meta_fields()
+        self.refresh_lyrics_state()
+        self.find_panel.update_matches()
+        self.unload_inactive_views()
+
+    def unload_inactive_views(self):
+        """非当前标签页的表格视图和查找索引超出内存预算时，从最久未查看的开始卸载"""
+        inactive = sorted((d for d in self.documents if d is not self.document and d.view is not None),
+                          key=lambda d: d.last_shown, reverse=True)
+        used = 0
+        for document in inactive:
+            used += document.view_memory()
+            if used > self.view_memory_budget:
+                self.view_stack.removeWidget(document.view)
+                document.unload_view()
+
+    def close_document(self, document):
+        """关闭一个标签页，有未保存的修改时先询问。返回是否已关闭"""
+        if self.file_job is not None:
+            # 后台保存的可能正是这个文档：等它完成
+            if self.editing_locked:
+                return False
+            self.file_job.wait()
+        if document.is_dirty:
+            self.show_document(document)
+            reply = QMessageBox.question(self, LANG["unsaved_changes_title"],
+                                         LANG["unsaved_changes_text"],
+                                         QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel)
+            if reply == QMessageBox.StandardButton.Cancel:
+                return False
+            if reply == QMessageBox.StandardButton.Save and not self.save_lrc_file(wait=True):
+                return False
+        index = self.documents.index(document)
+        if len(self.documents) == 1:
+            # 关闭最后一个标签页时先留下一个空白文档
+            self.new_document()
+        self.undo_group.removeStack(document.undo_stack)
+        self.documents.remove(document)
+        if document.view is not None:
+            self.view_stack.removeWidget(document.view)
+        document.close()
+        document.deleteLater()
+        self.tab_bar.removeTab(index)  # 当前标签页随之切换
+        return True
+
+    @timed("push_command")
+    def push_command(self, command):
+        """压入撤销命令（QUndoStack 会立即执行一次 redo）；打开文件期间丢弃"""
+        if self.editing_locked:
+            return
         self.undo_stack.push(command)
-        self.is_dirty = True
+
+    def meta_edits(self):
+        return {'ti': self.title_edit, 'ar': self.artist_edit, 'al': self.album_edit}
+
+    def commit_meta_edit(self, key, description):
+        """输入框编辑完成后，如内容有变化则生成一条撤销命令"""
+        text = self.meta_edits()[key].text()
+        if text != self.lrc.meta.get(key, ""):
+            self.push_command(MetaCommand(self, key, text, description))
+
+    def update_meta_fields(self):
+        for key, edit in self.meta_edits().items():
+            value = self.lrc.meta.get(key, "")
+            if edit.text() != value:
+                edit.setText(value)
         
     def closeEvent(self, event):
-        if self.is_dirty:
+        if self.file_job is not None:
+            # 正在打开的文件直接放弃，正在进行的保存等它完成
+            if self.editing_locked:
+                self.file_job.cancel()
+            self.file_job.wait()
+        # 逐个询问有未保存修改的标签页，任何一个选择取消都不退出
+        for document in list(self.documents):
+            if not document.is_dirty:
+                continue
+            self.show_document(document)
             reply = QMessageBox.question(self, LANG["unsaved_changes_title"],
                                          LANG["unsaved_changes_text"],
                                          QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel)
-            if reply == QMessageBox.StandardButton.Save:
-                if self.save_lrc_file(): event.accept()
-                else: event.ignore()
-            elif reply == QMessageBox.StandardButton.Discard: event.accept()
-            else: event.ignore()
-        else: event.accept()
+            if reply == QMessageBox.StandardButton.Cancel or (
+                    reply == QMessageBox.StandardButton.Save and not self.save_lrc_file(wait=True)):
+                event.ignore()
+                return
+        event.accept()
+        for document in self.documents:
+            document.journal.close()
+        self.romaji_loader.shutdown()
+        if self.waveform_loader is not None:
+            self.waveform_loader.wait()
+            self.onset_analyzer.wait()
         
+    def offer_recovery(self):
+        """上次崩溃留下了恢复日志时，逐个询问是否在上次保存的歌词上重放这些修改（每个恢复到一个标签页）"""
+        for session in find_recoverable(self.journal_dir):
+            self.recover_session(session)
+
+    def recover_session(self, session):
+        name = os.path.basename(session.base_path) if session.base_path else LANG["recovery_untitled"]
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(session.time))
+        reply = QMessageBox.question(self, LANG["recovery_title"],
+                                     LANG["recovery_text"].format(file=name, time=when))
+        if reply != QMessageBox.StandardButton.Yes:
+            session.discard()
+            return
+        try:
+            recovered = session.replay()
+        except (OSError, ValueError, TypeError, IndexError) as e:
+            QMessageBox.critical(self, LANG["error_title"], LANG["recovery_failed"].format(e=e))
+            session.discard()
+            return
+        self.document_for_open()
+        # 交接过程中的修改由随后的 journal.start() 以新内容重新记录
+        self.journal.suspend()
+        with self.lyrics_model.resetting():
+            self.lrc.meta = recovered.meta
+            self.lrc.lyrics[:] = recovered.lyrics
+        self.update_ui_from_lrc()
+        self.current_lrc_file = session.base_path
+        self.undo_stack.clear()
+        self.is_dirty = True
+        self.document.notify_title()
+        # 恢复出的内容尚未保存：新日志以快照开头，再次崩溃也不会丢失
+        self.journal.start(session.base_path, snapshot=True)
+        session.discard()
+        self.status_bar.showMessage(LANG["status_recovered"])
+
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
             urls = event.mimeData().urls()
-            if any(url.toLocalFile().lower().endswith(ext) for url in urls for ext in ['.mp3', '.wav', '.flac', '.m4a', '.ogg', '.lrc', '.txt']):
+            if any(url.toLocalFile().lower().endswith(ext) for url in urls for ext in ['.mp3', '.wav', '.flac', '.m4a', '.ogg', '.lrc', '.txt', PROJECT_SUFFIX]):
                 event.acceptProposedAction()
                 return
         event.ignore()
@@ -455,15 +842,17 @@ class MainWindow(QMainWindow):
                 self.open_audio_file(file_path)
             elif any(file_path.lower().endswith(ext) for ext in ['.lrc', '.txt']):
                 self.open_lyric_file(file_path)
+            elif file_path.lower().endswith(PROJECT_SUFFIX):
+                self.open_project_file(file_path)
 
     def handle_player_state_change(self, state):
         if state == QMediaPlayer.PlaybackState.PlayingState:
-            self.ui_update_timer.start()
-            self.play_pause_action.setIcon(qta.icon('fa5s.pause-circle'))
+            self.refresh_scheduler.start()
+            self.play_pause_action.setIcon(icon('fa5s.pause-circle'))
             self.play_pause_action.setText(LANG['pause_button'])
         else:
-            self.ui_update_timer.stop()
-            self.play_pause_action.setIcon(qta.icon('fa5s.play-circle'))
+            self.refresh_scheduler.stop()
+            self.play_pause_action.setIcon(icon('fa5s.play-circle'))
             self.play_pause_action.setText(LANG['play_button'])
             if state == QMediaPlayer.PlaybackState.StoppedState:
                 self.timeline_slider.setValue(0)
@@ -480,15 +869,12 @@ class MainWindow(QMainWindow):
 
     def add_row(self):
         selected_rows = self.get_selected_rows()
-        insert_pos = selected_rows[-1] + 1 if selected_rows else self.lyrics_table.rowCount()
+        insert_pos = selected_rows[-1] + 1 if selected_rows else self.lyrics_model.rowCount()
         
-        self.create_command("添加行")
-        self.lrc.lyrics.insert(insert_pos, {'ts': None, 'original': '', 'translated': ''})
-        
-        self.update_lyrics_table()
+        self.push_command(InsertRowsCommand(self, insert_pos, [LyricLine()]))
         self.lyrics_table.selectRow(insert_pos)
         # 自动聚焦到新行的原文输入框，方便直接打字
-        self.lyrics_table.editItem(self.lyrics_table.item(insert_pos, 1))
+        self.lyrics_table.edit(self.lyrics_model.index(insert_pos, 1))
 
     def remove_selected_rows(self):
         rows = self.get_selected_rows()
@@ -498,86 +884,178 @@ class MainWindow(QMainWindow):
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.No: return
         
-        self.create_command("删除行")
-        for row in sorted(rows, reverse=True):
-            del self.lrc.lyrics[row]
-
+        self.push_command(DeleteRowsCommand(self, rows))
         self.user_selected_row = []
-        self.update_lyrics_table()
 
     def merge_selected_rows(self):
         rows = self.get_selected_rows()
         if len(rows) < 2: return
 
-        self.create_command("合并行")
-        base_row_idx = rows[0]
-        base_lyric = self.lrc.lyrics[base_row_idx]
-        
-        for row_idx in sorted(rows[1:], reverse=True):
-            lyric_to_merge = self.lrc.lyrics.pop(row_idx)
-            base_lyric['original'] += " " + lyric_to_merge.get('original', '')
-            base_lyric['translated'] += " " + lyric_to_merge.get('translated', '')
-        
-        base_lyric['original'] = base_lyric['original'].strip()
-        base_lyric['translated'] = base_lyric['translated'].strip()
-        
-        self.update_lyrics_table()
-        self.lyrics_table.selectRow(base_row_idx)
+        self.push_command(MergeRowsCommand(self, rows))
+        self.lyrics_table.selectRow(rows[0])
 
     def split_selected_row(self):
         rows = self.get_selected_rows()
         if len(rows) != 1: return
 
         row = rows[0]
-        original_text = self.lrc.lyrics[row].get('original', '')
+        original_text = self.lrc.lyrics.get(row, 'original')
         parts = original_text.split()
         if len(parts) < 2: return
 
-        self.create_command("拆分行")
-        self.lrc.lyrics[row]['original'] = parts[0]
-        for i, part in enumerate(parts[1:]):
-            self.lrc.lyrics.insert(row + i + 1, {'ts': None, 'original': part, 'translated': ''})
-            
-        self.update_lyrics_table()
+        self.push_command(SplitRowCommand(self, row, parts))
 
+    @timed("mark_timestamp")
     def mark_timestamp(self):
         """标记时间戳，并自动跳转到下一行 (打轴核心优化)"""
         rows = self.get_selected_rows()
         if not rows:
-            if self.lyrics_table.rowCount() > 0:
+            if self.lyrics_model.rowCount() > 0:
                 self.lyrics_table.selectRow(0)
                 rows = [0]
             else:
                 return
         
-        self.create_command("标记时间戳")
-        current_pos_ms = self.player.get_pos()
-        current_ts = current_pos_ms / 1000.0
-        
-        self.lyrics_table.blockSignals(True)
-        for row in rows:
-            self.lrc.lyrics[row]['ts'] = current_ts
-            time_str = self.format_time(current_ts * 1000)
-            self.lyrics_table.item(row, 0).setText(time_str)
-        self.lyrics_table.blockSignals(False)
-        
-        self.update_highlight_styles()
+        # 插值播放位置减去校准得到的输出延迟与反应时间
+        current_pos_ms = self.player.get_precise_pos() - self.mark_offset_ms
+        current_ts = round(max(0.0, current_pos_ms) / 1000.0, 3)
+        self.push_command(SetTimestampsCommand(self, rows, current_ts))
 
         # 核心优化：自动跳转到下一行
         if len(rows) == 1:
             next_row = rows[0] + 1
-            if next_row < self.lyrics_table.rowCount():
+            if next_row < self.lyrics_model.rowCount():
                 self.lyrics_table.selectRow(next_row)
-                self.lyrics_table.scrollToItem(self.lyrics_table.item(next_row, 0), QAbstractItemView.ScrollHint.PositionAtCenter)
+                self.lyrics_table.scrollTo(self.lyrics_model.index(next_row, 0), QAbstractItemView.ScrollHint.PositionAtCenter)
+
+    def mark_word(self):
+        """逐字打轴：为当前播放行的下一个字记录时间，所有字标完后再按一次记录整句结束"""
+        seconds = max(0.0, self.player.get_precise_pos() - self.mark_offset_ms) / 1000.0
+        timeline = self.lrc.timeline
+        row = timeline.active_row(seconds)
+        if row < 0 or self._word_marks_complete(row):
+            # 按键略早于下一行的行时间戳时，视为标记下一行的第一个字
+            next_ts = timeline.next_boundary(seconds)
+            next_row = timeline.active_row(next_ts) if next_ts is not None and next_ts - seconds <= 0.3 else -1
+            if next_row < 0 or self.lrc.lyrics.get(next_row, 'words'):
+                self.status_bar.showMessage(LANG["status_word_no_line"])
+                return
+            row = next_row
+        lyrics = self.lrc.lyrics
+        text = lyrics.get(row, 'original')
+        boundaries = word_boundaries(text)
+        words = lyrics.get(row, 'words') or array('H')
+        if not boundaries:
+            self.status_bar.showMessage(LANG["status_word_no_line"])
+            return
+        # 下一个字从上一次标记位置之后的第一个分词点开始，没有则记录整句结束
+        i = bisect_right(boundaries, words[-1]) if words else 0
+        char = boundaries[i] if i < len(boundaries) else len(text)
+        line_ts = lyrics.get(row, 'ts')
+        try:
+            # 略早于行时间戳的按键（见上）记为该行开头
+            mark = pack_word_timings(line_ts, [(max(seconds, line_ts), char)])
+        except ValueError:
+            self.status_bar.showMessage(LANG["status_word_no_line"])
+            return
+        if words and mark[0] < words[-2]:
+            mark[0] = words[-2]  # 按键抖动时保持偏移单调
+        self.push_command(SetWordTimingsCommand(self, [row], [words + mark]))
+        self.status_bar.showMessage(LANG["status_word_marked"].format(
+            row=row + 1, n=min(i + 1, len(boundaries)), total=len(boundaries)))
+
+    def _word_marks_complete(self, row):
+        """该行已记录整句结束（或原文为空），不能再逐字打轴"""
+        words = self.lrc.lyrics.get(row, 'words')
+        text = self.lrc.lyrics.get(row, 'original')
+        return not text.strip() or (bool(words) and words[-1] >= len(text))
+
+    def clear_word_timings(self):
+        """清除选中行（未选中时为全部行）的逐字时间"""
+        word_timings = self.lrc.lyrics.word_timings
+        rows = self.get_selected_rows() or range(len(word_timings))
+        rows = [row for row in rows if word_timings[row] is not None]
+        if rows:
+            self.push_command(SetWordTimingsCommand(self, rows, [None] * len(rows), "清除逐字时间"))
+
+    def transform_timings(self):
+        """平移、伸缩或两点对齐多行时间戳，整体作为一次撤销操作"""
+        if not len(self.lrc.lyrics):
+            return
+        dialog = TransformTimingsDialog(self.lrc.lyrics, self.get_selected_rows(), self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        rows = dialog.rows()
+        timestamps = self.lrc.lyrics.timestamps
+        transform = dialog.transform()
+        values = transform.apply(timestamps[row] for row in rows)
+        # 只提交实际变化的行，撤销记录和重绘范围都随之缩小
+        changed = [(row, value) for row, value in zip(rows, values) if value != timestamps[row]]
+        if not changed:
+            return
+        command = CompositeCommand(self, "变换时间戳")
+        command.add_step(SetTimestampsCommand(self, [row for row, _ in changed], [value for _, value in changed]))
+        if transform.scale != 1.0:
+            # 逐字时间相对行时间戳保存，平移时不变，伸缩时按同样比例缩放
+            word_timings = self.lrc.lyrics.word_timings
+            scaled = [row for row, _ in changed if word_timings[row]]
+            if scaled:
+                command.add_step(SetWordTimingsCommand(
+                    self, scaled, [scale_word_timings(word_timings[row], transform.scale) for row in scaled]))
+        self.push_command(command)
+        self.status_bar.showMessage(LANG["status_transformed"].format(n=len(changed)))
+
+    def suggest_timestamps_from_audio(self):
+        """分析音频中的乐句起点，为无时间戳的行给出建议（后台分析，结果作为一次撤销操作应用）"""
+        if not self.current_audio_file:
+            QMessageBox.information(self, LANG["suggest_title"], LANG["suggest_no_audio"])
+            return
+        if not any(ts != ts for ts in self.lrc.lyrics.timestamps):
+            QMessageBox.information(self, LANG["suggest_title"], LANG["suggest_no_untimed"])
+            return
+        starts = self.phrase_starts.get(self.current_audio_file)
+        if starts is not None:
+            self.apply_phrase_starts(starts)
+        elif not self.onset_analyzer.is_running():
+            self.status_bar.showMessage(LANG["status_analyzing"].format(p=0.0))
+            self.onset_analyzer.load(self.current_audio_file)
+
+    def on_phrase_starts_ready(self, path, starts):
+        self.phrase_starts[path] = starts
+        if path == self.current_audio_file:
+            self.status_bar.clearMessage()
+            self.apply_phrase_starts(starts)
+
+    def apply_phrase_starts(self, starts):
+        suggestions = suggest_timestamps(self.lrc.lyrics.timestamps, starts)
+        untimed = sum(1 for ts in self.lrc.lyrics.timestamps if ts != ts)
+        if not suggestions:
+            QMessageBox.information(self, LANG["suggest_title"], LANG["suggest_none"].format(n=untimed))
+            return
+        reply = QMessageBox.question(self, LANG["suggest_title"],
+                                     LANG["suggest_confirm"].format(n=len(suggestions), total=untimed))
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        rows = sorted(suggestions)
+        self.push_command(SetTimestampsCommand(self, rows, [suggestions[row] for row in rows], "建议时间戳"))
+        self.status_bar.showMessage(LANG["status_suggested"].format(n=len(rows)))
+
+    def show_calibration_dialog(self):
+        dialog = CalibrationDialog(self.mark_offset_ms, self)
+        if self.player.is_playing():
+            self.player.pause()
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.mark_offset_ms = dialog.offset
+            self.settings.setValue("marking/offset_ms", self.mark_offset_ms)
+            self.status_bar.showMessage(LANG["calibration_saved"].format(ms=self.mark_offset_ms))
 
     def replay_current_line(self):
         """重听当前选中的行 (F5)"""
         rows = self.get_selected_rows()
         if rows:
-            row = rows[0]
-            lyric = self.lrc.lyrics[row]
-            if lyric and lyric.get('ts') is not None:
-                self.player.set_pos(int(lyric['ts'] * 1000))
+            ts = self.lrc.lyrics.get(rows[0], 'ts')
+            if ts is not None:
+                self.player.set_pos(int(ts * 1000))
                 if not self.player.is_playing():
                     self.player.play()
         else:
@@ -590,6 +1068,11 @@ class MainWindow(QMainWindow):
         else:
             self.lyrics_table.hideColumn(2)
 
+    def toggle_waveform(self, checked):
+        """切换波形条显示"""
+        if self.waveform_view is not None:
+            self.waveform_view.setVisible(checked)
+
     def toggle_romaji_tooltips(self, checked):
         """切换罗马音提示"""
         # 重新应用工具提示
@@ -597,31 +1080,100 @@ class MainWindow(QMainWindow):
 
     def update_romaji_tooltips(self):
         """更新所有原文单元格的罗马音工具提示"""
-        if not self.romaji_tooltips_action.isChecked():
-            # 清除所有工具提示
-            for row in range(self.lyrics_table.rowCount()):
-                item = self.lyrics_table.item(row, 1)
-                if item:
-                    item.setToolTip("")
+        enabled = self.romaji_tooltips_action.isChecked()
+        self.lyrics_model.romaji_enabled = enabled
+        if not enabled:
+            if not self.find_panel.wants_romaji():
+                self.romaji_loader.cancel()
             return
         
-        # 应用罗马音工具提示
-        for row in range(self.lyrics_table.rowCount()):
-            item = self.lyrics_table.item(row, 1)
-            if item:
-                original = item.text()
-                if original:
-                    romaji = self.lrc.convert_to_romaji(original)
-                    if romaji:
-                        item.setToolTip(romaji)
-                    else:
-                        item.setToolTip("")
-                else:
-                    item.setToolTip("")
+        self.schedule_romaji_tooltips(range(self.lyrics_model.rowCount()))
+
+    def schedule_romaji_tooltips(self, rows):
+        """把尚未缓存罗马音的行交给后台线程预先转换（可见行优先）；
+        模型在悬停时直接从缓存读取提示"""
+        if not self.romaji_tooltips_action.isChecked():
+            return
+        lyrics = self.lrc.lyrics
+        pending = {}
+        for row in rows:
+            text = lyrics.get(row, 'original')
+            if text and cached_romaji(text) is None:
+                pending[row] = text
+        self.romaji_loader.schedule(pending, self.visible_rows())
+
+    def apply_romaji_results(self, generation, results):
+        """接收后台线程的罗马音结果（已写入缓存）；行内容已变化的结果直接丢弃"""
+        if generation != self.romaji_loader.generation:
+            return
+        lyrics = self.lrc.lyrics
+        rows = [row for row, text, romaji in results if row < len(lyrics) and lyrics.get(row, 'original') == text]
+        if self.find_panel.wants_romaji():
+            self.search_index.refresh_romaji(rows)
+            self.find_panel.update_matches()
+        if self.romaji_tooltips_action.isChecked():
+            for row in rows:
+                self.lyrics_model.emit_rows_changed(row, row, [Qt.ItemDataRole.ToolTipRole], (1, 1))
+
+    # ---- 查找/替换 ----
+    def open_find_panel(self, replace):
+        """打开查找栏，replace 为 True 时同时显示替换行"""
+        self.find_panel.open_panel(replace)
+
+    def schedule_search_romaji(self):
+        """查找范围包含罗马音时，在后台补全尚未转换的行"""
+        if self.find_panel.wants_romaji():
+            self.romaji_loader.schedule(self.search_index.missing_romaji(), self.visible_rows())
+
+    def on_find_matches_changed(self, rows):
+        self.lyrics_model.set_search_matches(rows)
+        self.apply_row_filter(rows if self.find_panel.filtering() else None)
+
+    def apply_row_filter(self, rows):
+        """只显示 rows 中的行；rows 为 None 时取消过滤。只切换显示状态发生变化的行"""
+        if rows is None and not self._row_filter_active:
+            return
+        self._row_filter_active = rows is not None
+        keep = set(rows) if rows is not None else None
+        table = self.lyrics_table
+        for row in range(self.lyrics_model.rowCount()):
+            hidden = keep is not None and row not in keep
+            if table.isRowHidden(row) != hidden:
+                table.setRowHidden(row, hidden)
+
+    def select_and_show_row(self, row):
+        self.lyrics_table.selectRow(row)
+        self.lyrics_table.scrollTo(self.lyrics_model.index(row, 0), QAbstractItemView.ScrollHint.PositionAtCenter)
+
+    def replace_in_rows(self, rows):
+        """在 rows 的原文和译文中替换查找文本，所有修改合并为一次撤销操作"""
+        panel = self.find_panel
+        query, replacement, match_case = panel.query(), panel.replace_edit.text(), panel.match_case()
+        fields = [field for field in panel.fields() if field in REPLACEABLE_FIELDS]
+        lyrics = self.lrc.lyrics
+        changes = []
+        for row in rows:
+            for field in fields:
+                text = lyrics.get(row, field)
+                new_text = replace_text(text, query, replacement, match_case)
+                if new_text != text:
+                    changes.append((row, field, new_text))
+        if not changes:
+            self.status_bar.showMessage(LANG["status_replaced_none"])
+            return
+        self.push_command(ReplaceTextCommand(self, changes, "全部替换" if len(rows) > 1 else "替换"))
+        self.status_bar.showMessage(LANG["status_replaced"].format(n=len(changes)))
+
+    def visible_rows(self):
+        """当前视口中可见的行范围"""
+        return self.row_sizer.visible_rows()
 
     def show_about_dialog(self): 
         QMessageBox.about(self, LANG["about_dialog_title"], LANG["about_dialog_text"])
         
+    def show_performance_dialog(self):
+        PerformanceDialog(self).exec()
+
     def show_shortcuts_dialog(self):
         """显示快捷键列表"""
         text = """
@@ -630,14 +1182,19 @@ class MainWindow(QMainWindow):
         F5: 重听当前行<br><br>
         
         <b>打轴操作:</b><br>
-        F8: 标记时间戳并跳转下一行<br><br>
+        F8: 标记时间戳并跳转下一行<br>
+        F9: 为播放行的下一个字标记时间（逐字打轴）<br><br>
         
         <b>编辑操作:</b><br>
         Ctrl+Enter: 插入新行<br>
         Ctrl+Del: 删除选中行<br>
         Ctrl+J: 合并选中行<br>
         Ctrl+K: 拆分选中行<br>
+        Ctrl+F: 查找<br>
+        Ctrl+H: 查找替换<br>
         Ctrl+S: 保存文件<br>
+        Ctrl+N: 新建标签页<br>
+        Ctrl+W: 关闭标签页<br>
         Ctrl+Z: 撤销<br>
         Ctrl+Y: 重做
         """
@@ -646,18 +1203,6 @@ class MainWindow(QMainWindow):
     def update_save_format_setting(self, is_separated): 
         self.save_as_separated_default = is_separated
 
-    def setup_lyrics_table(self):
-        self.lyrics_table.setColumnCount(3)
-        self.lyrics_table.setHorizontalHeaderLabels([LANG["lyrics_table_header_time"], LANG["lyrics_table_header_original"], LANG["lyrics_table_header_translated"]])
-        self.lyrics_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.lyrics_table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
-        self.lyrics_table.setShowGrid(False)
-
-        header = self.lyrics_table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
-        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
-
     def on_volume_changed(self, value):
         self.player.set_volume(value / 100.0)
 
@@ -666,8 +1211,8 @@ class MainWindow(QMainWindow):
         self.player.set_playback_rate(rate)
 
     def on_user_selection_changed(self):
-        self.user_selected_row = [index.row() for index in self.lyrics_table.selectedIndexes()]
-        self.update_highlight_styles()
+        self.user_selected_row = [index.row() for index in self.lyrics_table.selectionModel().selectedRows()]
+        self.find_panel.current_row = min(self.user_selected_row, default=-1)
         self.update_edit_buttons_state()
 
     def update_duration(self, duration):
@@ -675,191 +1220,281 @@ class MainWindow(QMainWindow):
         self.update_time_label(self.player.get_pos(), duration)
 
     def format_time(self, ms):
-        if ms < 0: ms = 0
-        total_seconds = ms / 1000.0
-        minutes = int(total_seconds / 60)
-        seconds = int(total_seconds % 60)
-        centiseconds = int(round((total_seconds - int(total_seconds)) * 100))
-        # 确保厘秒在0-99范围内
-        if centiseconds >= 100:
-            centiseconds = 99
-        elif centiseconds < 0:
-            centiseconds = 0
-        return f"{minutes:02d}:{seconds:02d}.{centiseconds:02d}"
+        return format_time(ms)
+
+    def parse_time(self, ts_str):
+        return parse_time(ts_str)
 
     def update_time_label(self, pos, dur):
         self.time_label.setText(f"{self.format_time(pos)} / {self.format_time(dur)}")
     
     def find_current_play_row(self, current_sec):
-        target_idx = -1
-        for i, lyric in enumerate(self.lrc.lyrics):
-            ts = lyric.get('ts')
-            if ts is not None and current_sec >= ts: 
-                target_idx = i
-            elif ts is not None and current_sec < ts:
-                break
-        return target_idx
+        # 二分查找时间轴索引，行乱序时同样正确
+        return self.lrc.timeline.active_row(current_sec)
 
+    @timed("update_ui_on_timer")
     def update_ui_on_timer(self):
-        """定时器更新UI，使用增量更新提高性能"""
-        if self.player.is_playing() and not self.timeline_slider.isSliderDown():
-            pos = self.player.get_pos()
+        """播放时的周期刷新，只更新真正变化的部分。没有任何变化时返回 False"""
+        if not self.player.is_playing() or self.timeline_slider.isSliderDown():
+            return False
+        pos = self.player.get_pos()
+        changed = False
+        if self.waveform_view is not None and self.waveform_view.isVisible():
+            changed = self.waveform_view.set_position(pos)
+
+        # 时间标签只精确到 10 毫秒，滑块只在移动至少一个像素时才需要重绘
+        duration = self.player.get_duration()
+        slider_px = pos * self.timeline_slider.width() // duration if duration > 0 else 0
+        state = (pos // 10, slider_px)
+        if state != self._last_ui_state:
+            self._last_ui_state = state
             self.timeline_slider.setValue(pos)
-            self.update_time_label(pos, self.player.get_duration())
-            
-            new_play_row = self.find_current_play_row(pos / 1000.0)
-            
-            # 仅在行发生变化时更新样式 (Delta Update)
-            if self.last_highlighted_row != new_play_row:
-                self.update_active_row_style(new_play_row)
-                
-                # 自动滚动逻辑
-                if new_play_row != -1:
-                    item = self.lyrics_table.item(new_play_row, 0)
-                    if item:
-                        self.lyrics_table.scrollToItem(item, QAbstractItemView.ScrollHint.PositionAtCenter)
+            self.update_time_label(pos, duration)
+            changed = True
+
+        new_play_row = self.find_current_play_row(pos / 1000.0)
+        # 仅在行发生变化时更新样式 (Delta Update)
+        if self.last_highlighted_row != new_play_row:
+            self.update_active_row_style(new_play_row)
+            changed = True
+            # 自动滚动逻辑
+            if new_play_row != -1:
+                self.lyrics_table.scrollTo(self.lyrics_model.index(new_play_row, 0), QAbstractItemView.ScrollHint.PositionAtCenter)
+        # 逐字高亮：进度没有变化（或该行没有逐字时间）时不重绘
+        if self.lyrics_model.set_karaoke_position(pos / 1000.0):
+            changed = True
+        return changed
 
     def update_active_row_style(self, new_row):
-        """增量更新高亮行"""
-        self.lyrics_table.blockSignals(True)
-        # 1. 清除旧行样式
-        if self.last_highlighted_row != -1 and self.last_highlighted_row < self.lyrics_table.rowCount():
-            if self.last_highlighted_row not in self.user_selected_row:
-                self.set_row_color(self.last_highlighted_row, QColor("transparent"))
-                # 恢复可能的时间戳错误标记
-                if self.check_timestamp_disordered(self.last_highlighted_row):
-                     self.lyrics_table.item(self.last_highlighted_row, 0).setBackground(self.disordered_ts_color)
-        
-        # 2. 设置新行样式
-        if new_row != -1 and new_row < self.lyrics_table.rowCount():
-            if new_row not in self.user_selected_row:
-                self.set_row_color(new_row, self.play_highlight_color)
-        
+        """增量更新高亮行：模型只通知新旧两行重绘"""
+        self.lyrics_model.set_play_row(new_row)
         self.last_highlighted_row = new_row
-        self.lyrics_table.blockSignals(False)
-
-    def set_row_color(self, row, color):
-        for c in range(self.lyrics_table.columnCount()):
-            item = self.lyrics_table.item(row, c)
-            if item:
-                item.setBackground(color)
 
     def check_timestamp_disordered(self, row):
-        """简易检查某一行时间戳是否乱序"""
-        return False 
+        """检查某一行时间戳是否乱序（由模型增量维护）"""
+        return self.lyrics_model.is_disordered(row)
 
     def update_highlight_styles(self):
-        """全量更新高亮样式"""
-        self.lyrics_table.blockSignals(True)
-        
-        last_ts = -1.0
-        for r in range(self.lyrics_table.rowCount()):
-            # 基础颜色
-            color = QColor("transparent")
-            if r == self.last_highlighted_row:
-                color = self.play_highlight_color
-            
-            # 应用基础颜色 (仅对非选中行)
-            if r not in self.user_selected_row:
-                self.set_row_color(r, color)
-            
-            # 检查时间戳乱序
-            ts_item = self.lyrics_table.item(r, 0)
-            if ts_item:
-                is_disordered = False
-                ts_text = ts_item.text()
-                current_ts = -1.0
-                if ts_text:
-                    match = re.match(r'(\d+):(\d{2,2})\.(\d{2,2})', ts_text)
-                    if match:
-                        m, s, cs = map(int, match.groups())
-                        current_ts = m * 60 + s + cs / 100.0
-                        if last_ts != -1 and current_ts < last_ts:
-                            is_disordered = True
-                        last_ts = current_ts
-                
-                if is_disordered:
-                    ts_item.setBackground(self.disordered_ts_color)
-
-        self.lyrics_table.blockSignals(False)
+        """同步播放高亮行；乱序标记由模型在每次修改时增量更新，不需要全量扫描"""
+        self.lyrics_model.set_play_row(self.last_highlighted_row)
     
-    # *** 之前遗漏的方法，现在已补上 ***
+    @timed("update_lyrics_table")
     def update_lyrics_table(self):
-        self.lyrics_table.blockSignals(True)
-        self.lyrics_table.setRowCount(len(self.lrc.lyrics))
-        for i, line in enumerate(self.lrc.lyrics):
-            ts_str = self.format_time(line['ts'] * 1000) if line.get('ts') is not None else ""
-            self.lyrics_table.setItem(i, 0, QTableWidgetItem(ts_str))
-            original_item = QTableWidgetItem(line.get('original', ''))
-            translated_item = QTableWidgetItem(line.get('translated', ''))
-            
-            # 设置罗马音工具提示
-            if self.romaji_tooltips_action.isChecked():
-                original_text = line.get('original', '')
-                if original_text:
-                    romaji = self.lrc.convert_to_romaji(original_text)
-                    if romaji:
-                        original_item.setToolTip(romaji)
-            
-            self.lyrics_table.setItem(i, 1, original_item)
-            self.lyrics_table.setItem(i, 2, translated_item)
-        
-        self.lyrics_table.resizeRowsToContents()
-        self.lyrics_table.blockSignals(False)
+        """整份歌词替换后（须在 lyrics_model.resetting() 中修改数据）刷新表格相关状态"""
+        self.lyrics_table.resizeColumnToContents(0)
+        self.refresh_lyrics_state()
+
+    def refresh_lyrics_state(self):
+        """换成另一份歌词（整体替换或切换标签页）后刷新罗马音提示、播放高亮和按钮状态"""
+        # 行号已整体变化，之前排队的罗马音任务作废
+        self.romaji_loader.cancel()
+        self.update_romaji_tooltips()
+        self.schedule_search_romaji()
         
         self.update_highlight_styles()
         self.update_edit_buttons_state()
 
-    def open_audio_file(self, file_path=None):
+    def refresh_lyric_rows(self, rows):
+        """撤销命令修改单元格后调用：模型已发出 dataChanged（行高随之重新测量），这里只处理提示"""
+        self.schedule_romaji_tooltips(rows)
+
+    def on_lyrics_rows_inserted(self, row, count):
+        self.schedule_romaji_tooltips(range(row, row + count))
+        self.update_edit_buttons_state()
+
+    def on_lyrics_rows_removed(self, row, count):
+        self.update_edit_buttons_state()
+
+    def open_audio_file(self, file_path=None, peak_key=None):
+        """为当前标签页打开音频。peak_key 为已知的波形缓存键（来自工程文件）时直接映射缓存，不再哈希整个文件"""
         if not file_path: 
             file_path, _ = QFileDialog.getOpenFileName(self, LANG["open_audio_title"], "", LANG["audio_files_filter"])
         if file_path: 
             self.current_audio_file = file_path
-            self.player.load(file_path)
+            self.load_audio(file_path, peak_key)
             self.status_bar.showMessage(LANG["status_audio_loaded"].format(file=os.path.basename(file_path)))
 
+    def load_audio(self, file_path, peak_key=None, position=0):
+        """把音频加载到共用的播放器（切换标签页时换成该标签页的音频），波形优先取内存或磁盘缓存"""
+        if self.player.is_playing():
+            self.player.pause()
+        self.loaded_audio = file_path
+        self.player.load(file_path)
+        if position:
+            self.player.set_pos(position)
+        self.update_time_label(position, self.player.get_duration())
+        if self.waveform_view is None:
+            return
+        self.onset_analyzer.cancel()
+        if not file_path:
+            self.waveform_loader.cancel()
+            self.waveform_view.set_message("")
+            return
+        pyramid = self.pyramids.get(file_path)
+        if pyramid is None and peak_key and self.peak_cache_dir:
+            pyramid = PeakPyramid.load(peak_cache_path(self.peak_cache_dir, peak_key))
+        if pyramid is not None:
+            self.waveform_loader.cancel()
+            self.cache_pyramid(file_path, pyramid)
+            self.waveform_view.set_pyramid(pyramid)
+            self.waveform_view.set_position(position)
+        else:
+            self.waveform_view.set_loading()
+            self.waveform_loader.load(file_path)
+
+    def cache_pyramid(self, path, pyramid):
+        self.pyramids[path] = pyramid
+        self.pyramids.move_to_end(path)
+        if len(self.pyramids) > _PYRAMID_CACHE_SIZE:
+            self.pyramids.popitem(last=False)
+
+    def on_waveform_loaded(self, path, pyramid):
+        self.cache_pyramid(path, pyramid)
+        if path == self.loaded_audio:
+            self.waveform_view.set_pyramid(pyramid)
+            self.waveform_view.set_position(self.player.get_pos())
+
+    def on_waveform_failed(self, path, message):
+        if path == self.loaded_audio:
+            self.waveform_view.set_message(LANG["waveform_failed"].format(e=message))
+
+    def seek_to(self, ms):
+        self.player.set_pos(ms)
+        self.timeline_slider.setValue(ms)
+        self.update_time_label(ms, self.player.get_duration())
+
+    # ---- 后台文件读写 ----
+    def start_file_job(self, work, message, lock=False):
+        """在后台线程执行 work(progress)，状态栏显示进度和取消按钮，返回 FileJob。
+
+        lock 为真时（打开文件）在结果交接完成前锁定编辑：新文档会整体替换当前文档，
+        这期间的修改没有意义，也不能与交接交错。同一时间只运行一个任务，忙时返回 None。
+        """
+        if self.file_job is not None:
+            self.status_bar.showMessage(LANG["status_file_busy"])
+            return None
+        job = FileJob(work, self)
+        job.progress.connect(self.on_file_job_progress)
+        job.done.connect(self.on_file_job_done)
+        job.cancelled.connect(lambda: self.status_bar.showMessage(LANG["status_file_cancelled"]))
+        self.file_job = job
+        if lock:
+            self.set_editing_locked(True)
+        # 收到第一次进度之前显示为忙碌
+        self.file_progress.setRange(0, 0)
+        self.file_progress.show()
+        self.file_cancel_button.show()
+        self.status_bar.showMessage(message)
+        job.start()
+        return job
+
+    def on_file_job_progress(self, fraction):
+        self.file_progress.setRange(0, 1000)
+        self.file_progress.setValue(int(fraction * 1000))
+
+    def on_file_job_done(self):
+        self.file_job = None
+        self.file_progress.hide()
+        self.file_cancel_button.hide()
+        if self.editing_locked:
+            self.set_editing_locked(False)
+
+    def cancel_file_job(self):
+        if self.file_job is not None:
+            self.file_job.cancel()
+
+    def editing_actions(self):
+        """会修改歌词或启动另一次文件读写的操作"""
+        return [self.undo_action, self.redo_action, self.mark_time_action, self.mark_word_action,
+                self.clear_word_timings_action, self.replace_action, self.transform_timings_action,
+                self.suggest_timestamps_action, self.act_add_row, self.act_remove_row, self.act_merge_rows,
+                self.act_split_row, self.open_lyric_action, self.open_project_action, self.save_action,
+                self.save_as_action, self.save_project_action]
+
+    def set_editing_locked(self, locked):
+        """锁定或解锁所有修改歌词的入口"""
+        self.editing_locked = locked
+        if locked:
+            self._locked_document = self.document
+            self._edit_triggers = self.lyrics_table.editTriggers()
+            self.lyrics_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        else:
+            # 打开的文件可能放进了新标签页，解锁的是加锁时那个文档的表格
+            document, self._locked_document = self._locked_document, None
+            if document is not None and document.view is not None:
+                document.view.setEditTriggers(self._edit_triggers)
+        for edit in self.meta_edits().values():
+            edit.setReadOnly(locked)
+        for action in self.editing_actions():
+            action.setEnabled(not locked)
+        # 交接的目标是当前标签页，打开期间不能切换或关闭标签页
+        self.tab_bar.setEnabled(not locked)
+        self.new_tab_action.setEnabled(not locked)
+        self.close_tab_action.setEnabled(not locked)
+        for button in (self.add_row_button, self.remove_row_button, self.merge_rows_button,
+                       self.split_row_button, self.mark_time_button):
+            button.setEnabled(not locked)
+        self.find_panel.replace_widget.setEnabled(not locked)
+        if not locked:
+            self.undo_action.setEnabled(self.undo_group.canUndo())
+            self.redo_action.setEnabled(self.undo_group.canRedo())
+            self.update_edit_buttons_state()
+
     def open_lyric_file(self, file_path=None):
+        """在后台读取并解析歌词文件，完成后交接给当前文档"""
         if not file_path: 
             file_path, _ = QFileDialog.getOpenFileName(self, LANG["open_lyric_title"], "", LANG["lyric_files_filter"])
-        if file_path:
-            try:
-                try: 
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        f_content = f.read()
-                except UnicodeDecodeError: 
-                    with open(file_path, 'r', encoding='gbk') as f:
-                        f_content = f.read()
-                self.lrc.parse_from_text(f_content)
-                self.update_ui_from_lrc()
-                self.current_lrc_file = file_path
-                self.status_bar.showMessage(LANG["status_lyric_loaded"].format(file=os.path.basename(file_path)))
-                self.undo_stack.clear()
-                self.is_dirty = False
-            except (OSError, ValueError) as e: 
-                QMessageBox.critical(self, LANG["error_title"], LANG["error_open_file"].format(e=e))
-            except Exception as e:
-                QMessageBox.critical(self, LANG["error_title"], LANG["error_unknown"].format(e=e))
-
-    def save_lrc_file(self):
+        if not file_path:
+            return
+        document = self.find_document(lrc_path=file_path)
+        if document is not None:
+            # 已在某个标签页中打开
+            self.show_document(document)
+            return
+
+        def work(progress):
+            # 解析到新的 Lrc 对象，不触碰界面线程的数据
+            lrc = Lrc()
+            lrc.parse_from_file(file_path, progress)
+            return lrc
+
+        job = self.start_file_job(work, LANG["status_opening"].format(file=os.path.basename(file_path)), lock=True)
+        if job is not None:
+            job.finished.connect(lambda lrc: self.on_lyric_file_loaded(file_path, lrc))
+            job.failed.connect(lambda message: QMessageBox.critical(
+                self, LANG["error_title"], LANG["error_open_file"].format(e=message)))
+
+    def on_lyric_file_loaded(self, file_path, lrc):
+        """交接解析结果（编辑仍处于锁定状态）：放入空白的当前标签页或新标签页"""
+        self.document_for_open()
+        self.journal.suspend()
+        with measure("file_open"):
+            with self.lyrics_model.resetting():
+                self.lrc.meta = lrc.meta
+                self.lrc.lyrics[:] = lrc.lyrics
+            self.update_ui_from_lrc()
+        self.current_lrc_file = file_path
+        self.current_project_file = None
+        message = LANG["status_lyric_loaded"].format(file=os.path.basename(file_path))
+        if lrc.invalid_word_timings:
+            message += LANG["status_invalid_word_timings"].format(n=lrc.invalid_word_timings)
+        self.status_bar.showMessage(message)
+        self.undo_stack.clear()
+        self.is_dirty = False
+        self.document.notify_title()
+        # 当前内容就是该文件的解析结果，修改可以直接记在文件之上
+        self.journal.start(file_path, parsed=True)
+
+    def save_lrc_file(self, wait=False):
+        """保存到当前文件（没有时另存为）。wait 为真时等待保存完成并返回是否成功"""
         path = self.current_lrc_file
         if path and os.path.exists(os.path.dirname(path)):
             self.sync_table_to_lrc_before_save()
-            try:
-                with open(path, 'w', encoding='utf-8') as f: 
-                    f.write(self.lrc.to_lrc_string(self.save_as_separated_default))
-                self.status_bar.showMessage(LANG["status_lyric_saved"].format(file=path))
-                self.is_dirty = False
-                return True
-            except OSError as e: 
-                QMessageBox.critical(self, LANG["error_title"], LANG["error_save_system"].format(e=e))
-                return False
-            except Exception as e:
-                QMessageBox.critical(self, LANG["error_title"], LANG["error_save_unknown"].format(e=e))
-                return False
+            return self.start_save(path, self.save_as_separated_default, wait)
         else: 
-            return self.save_lrc_file_as()
+            return self.save_lrc_file_as(wait)
 
-    def save_lrc_file_as(self):
+    def save_lrc_file_as(self, wait=False):
         self.sync_table_to_lrc_before_save()
         path, _ = QFileDialog.getSaveFileName(self, LANG["save_lyric_title"], os.path.dirname(self.current_lrc_file or ""), LANG["lrc_file_filter"])
         if path:
@@ -868,78 +1503,150 @@ class MainWindow(QMainWindow):
             if reply == QMessageBox.StandardButton.Cancel:
                 return False
             use_separated = (reply == QMessageBox.StandardButton.Yes)
-            try:
-                with open(path, 'w', encoding='utf-8') as f: 
-                    f.write(self.lrc.to_lrc_string(use_separated))
-                self.current_lrc_file = path
-                self.status_bar.showMessage(LANG["status_lyric_saved"].format(file=path))
-                self.is_dirty = False
-                return True
-            except OSError as e: 
-                QMessageBox.critical(self, LANG["error_title"], LANG["error_save_system"].format(e=e))
-                return False
-            except Exception as e:
-                QMessageBox.critical(self, LANG["error_title"], LANG["error_save_unknown"].format(e=e))
-                return False
+            return self.start_save(path, use_separated, wait)
         return False
-    
+
+    def start_save(self, path, use_separated, wait=False):
+        """在后台写出当前歌词的快照，保存期间可以继续编辑"""
+        # 列式存储的复制只是复制几个扁平容器
+        with measure("file_save"):
+            snapshot = copy.deepcopy(self.lrc)
+        document = self.document
+        generation = document.edit_generation
+        job = self.start_file_job(
+            lambda progress: snapshot.save_to_file(path, use_separated, progress=progress),
+            LANG["status_saving"].format(file=os.path.basename(path)))
+        if job is None:
+            return False
+        job.finished.connect(lambda result: self.on_lyric_file_saved(document, path, generation))
+        job.failed.connect(lambda message: QMessageBox.critical(
+            self, LANG["error_title"], LANG["error_save_system"].format(e=message)))
+        return job.wait() if wait else True
+
+    def on_lyric_file_saved(self, document, path, generation):
+        """保存完成（此时当前标签页可能已经换了）"""
+        document.current_lrc_file = path
+        self.status_bar.showMessage(LANG["status_lyric_saved"].format(file=path))
+        if generation == document.edit_generation:
+            document.is_dirty = False
+            # 重新解析保存的文件会改变行的顺序和数量，日志在第一处修改时以快照为起点
+            document.journal.start(path)
+        else:
+            # 保存期间又有修改：文档仍未保存，恢复日志改以快照为起点（文件已被覆盖）
+            document.journal.start(path, snapshot=True)
+        document.notify_title()
+
+    def open_project_file(self, file_path=None):
+        """打开工程文件：恢复歌词、撤销历史和罗马音缓存，并重新打开其中引用的音频"""
+        if not file_path:
+            file_path, _ = QFileDialog.getOpenFileName(self, LANG["open_project_title"], "", LANG["project_files_filter"])
+        if not file_path:
+            return
+        document = self.find_document(project_path=file_path)
+        if document is not None:
+            self.show_document(document)
+            return
+        job = self.start_file_job(lambda progress: read_project(file_path),
+                                  LANG["status_opening"].format(file=os.path.basename(file_path)), lock=True)
+        if job is not None:
+            job.finished.connect(lambda project: self.on_project_loaded(file_path, project))
+            job.failed.connect(lambda message: QMessageBox.critical(
+                self, LANG["error_title"], LANG["error_open_file"].format(e=message)))
+
+    def on_project_loaded(self, file_path, project):
+        """交接读取好的工程（编辑仍处于锁定状态）：放入空白的当前标签页或新标签页"""
+        self.document_for_open()
+        self.journal.suspend()
+        with measure("project_open"):
+            seed_romaji_cache(project.romaji)
+            history_restored = True
+            with self.lyrics_model.resetting():
+                self.lrc.meta = dict(project.lrc.meta)
+                self.lrc.lyrics[:] = project.lrc.lyrics
+                try:
+                    restore_history(self, self.undo_stack, project.history, project.history_index)
+                except (KeyError, IndexError, TypeError, ValueError, AttributeError):
+                    # 历史与歌词对不上（文件损坏）：保留歌词，丢弃撤销历史
+                    history_restored = False
+                    self.undo_stack.clear()
+                    self.lrc.meta = dict(project.lrc.meta)
+                    self.lrc.lyrics[:] = project.lrc.lyrics
+            self.update_ui_from_lrc()
+        self.current_project_file = file_path
+        self.current_lrc_file = project.lrc_path
+        self.is_dirty = project.dirty
+        self.document.notify_title()
+        self.journal.start(project.lrc_path, snapshot=project.dirty)
+
+        audio = project.audio
+        message = LANG["status_project_loaded"].format(file=os.path.basename(file_path))
+        if audio and os.path.exists(audio["path"]):
+            self.open_audio_file(audio["path"], audio["key"] if audio_unchanged(audio) else None)
+        elif audio:
+            message = LANG["status_project_audio_missing"].format(file=audio["path"])
+        if not history_restored:
+            message = LANG["status_project_history_dropped"]
+        self.status_bar.showMessage(message)
+
+    def save_project_file(self):
+        """把歌词、撤销历史、罗马音缓存和音频引用保存为工程文件（在后台写出快照）"""
+        self.sync_table_to_lrc_before_save()
+        default = self.current_project_file
+        if not default and self.current_lrc_file:
+            default = os.path.splitext(self.current_lrc_file)[0] + PROJECT_SUFFIX
+        path, _ = QFileDialog.getSaveFileName(self, LANG["save_project_title"], default or "", LANG["project_files_filter"])
+        if not path:
+            return False
+        stack = self.undo_stack
+        # 命令只保存创建后不再修改的增量，导出的字段可以直接交给工作线程
+        history = [command_state(stack.command(i)) for i in range(stack.count())]
+        project = Project(copy.deepcopy(self.lrc), self.current_lrc_file, None, history, stack.index(), self.is_dirty)
+        audio_path = self.current_audio_file
+
+        def work(progress):
+            # 音频哈希要读完整个文件，也放在工作线程中
+            if audio_path:
+                project.audio = audio_reference(audio_path)
+            write_project(path, project)
+
+        job = self.start_file_job(work, LANG["status_saving"].format(file=os.path.basename(path)))
+        if job is None:
+            return False
+        document = self.document
+        job.finished.connect(lambda result: self.on_project_saved(document, path))
+        job.failed.connect(lambda message: QMessageBox.critical(
+            self, LANG["error_title"], LANG["error_save_system"].format(e=message)))
+        return True
+
+    def on_project_saved(self, document, path):
+        document.current_project_file = path
+        document.notify_title()
+        self.status_bar.showMessage(LANG["status_project_saved"].format(file=path))
+
     def sync_table_to_lrc_before_save(self):
-        for row in range(self.lyrics_table.rowCount()):
-            ts_str = self.lyrics_table.item(row, 0).text()
-            original = self.lyrics_table.item(row, 1).text()
-            translated = self.lyrics_table.item(row, 2).text()
-            ts = None
-            match = re.match(r'(\d+):(\d{2,2})\.(\d{2,2})', ts_str)
-            if match: 
-                m, s, cs = map(int, match.groups())
-                ts = m * 60 + s + cs / 100.0
-            self.lrc.lyrics[row] = {'ts': ts, 'original': original, 'translated': translated}
+        # 提交仍在输入框中编辑的歌曲信息
+        self.commit_meta_edit('ti', "编辑标题")
+        self.commit_meta_edit('ar', "编辑歌手")
+        self.commit_meta_edit('al', "编辑专辑")
 
     def update_ui_from_lrc(self):
-        self.lyrics_table.blockSignals(True)
-        self.title_edit.setText(self.lrc.meta.get('ti', ''))
-        self.artist_edit.setText(self.lrc.meta.get('ar', ''))
-        self.album_edit.setText(self.lrc.meta.get('al', ''))
-        self.lyrics_table.blockSignals(False)
+        self.update_meta_fields()
         self.update_lyrics_table()
 
-    def sync_table_to_lrc(self, item=None):
-        if not item: return
-        
-        row = item.row()
+    @timed("sync_table_to_lrc")
+    def sync_table_to_lrc(self, row, field, value):
+        """用户在表格中编辑单元格后，把修改作为撤销命令提交到歌词数据"""
         if not (0 <= row < len(self.lrc.lyrics)): return
-
-        self.create_command("编辑歌词")
-        
-        ts_str = self.lyrics_table.item(row, 0).text()
-        original = self.lyrics_table.item(row, 1).text()
-        translated = self.lyrics_table.item(row, 2).text()
-        
-        ts = None
-        match = re.match(r'(\d+):(\d{2,2})\.(\d{2,2})', ts_str)
-        if match: 
-            m, s, cs = map(int, match.groups())
-            ts = m * 60 + s + cs / 100.0
-            
-        self.lrc.lyrics[row] = {'ts': ts, 'original': original, 'translated': translated}
-        
-        # 更新罗马音工具提示
-        if item.column() == 1 and self.romaji_tooltips_action.isChecked():
-            original_item = self.lyrics_table.item(row, 1)
-            if original and original_item:
-                romaji = self.lrc.convert_to_romaji(original)
-                if romaji:
-                    original_item.setToolTip(romaji)
-                else:
-                    original_item.setToolTip("")
-        
-        if item.column() == 0: 
-            self.update_highlight_styles()
+        if value == self.lrc.lyrics.get(row, field):
+            return
+        self.push_command(SetCellCommand(self, row, field, value))
 
     def get_selected_rows(self): 
         return sorted(list(set(self.user_selected_row)))
 
     def update_edit_buttons_state(self):
+        if self.editing_locked:
+            return
         count = len(self.get_selected_rows())
         self.remove_row_button.setEnabled(count > 0)
         self.act_remove_row.setEnabled(count > 0) # 更新 Action 状态
@@ -953,11 +1660,11 @@ class MainWindow(QMainWindow):
         self.merge_rows_button.setEnabled(count > 1)
         self.act_merge_rows.setEnabled(count > 1)
 
-    def play_from_selection(self, item):
-        row = item.row()
+    def play_from_selection(self, index):
+        row = index.row()
         if 0 <= row < len(self.lrc.lyrics):
-            lyric = self.lrc.lyrics[row]
-            if lyric and lyric.get('ts') is not None:
-                self.player.set_pos(int(lyric['ts'] * 1000))
+            ts = self.lrc.lyrics.get(row, 'ts')
+            if ts is not None:
+                self.player.set_pos(int(ts * 1000))
                 if not self.player.is_playing(): 
                     self.player.play()
\ No newline at end of file
@@ -0,0 +1,194 @@
+# onsets.py
+"""基于音频的打轴建议：计算短时能量和频谱通量起音包络，找出乐句起点，
+为没有时间戳的歌词行给出建议时间。
+
+分析以解码接收器（见 audio_decode）的形式在工作线程中边解码边进行，
+所有逐帧计算都按块向量化，一张专辑的分析只需几秒。
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+FRAME_SIZE = 1024
+HOP_SIZE = 512
+# 每次至少凑够这么多帧再做一次 FFT，避免解码器的小块数据带来的调用开销
+_BATCH_FRAMES = 256
+# 只统计人声主要所在频段的通量，减少低音鼓和镲片的干扰
+_BAND_HZ = (150.0, 5000.0)
+
+# 乐句起点检测参数（秒 / dB）
+_CONTEXT = 0.4         # 比较起点前后能量的窗口长度
+_THRESHOLD_WINDOW = 1.5
+_MIN_RISE_DB = 3.0
+MIN_GAP = 0.6          # 两个乐句起点之间的最小间隔
+
+
+class OnsetEnvelope:
+    """逐帧的能量（dB）和频谱通量"""
+    def __init__(self, frame_rate, energy_db, flux):
+        self.frame_rate = frame_rate
+        self.energy_db = energy_db
+        self.flux = flux
+
+    @property
+    def duration(self):
+        return len(self.flux) / self.frame_rate
+
+
+class PhraseStarts:
+    """检测到的乐句起点：按时间升序的时间（秒）和对应强度"""
+    def __init__(self, times, strengths, duration):
+        self.times = times
+        self.strengths = strengths
+        self.duration = duration
+
+    def __len__(self):
+        return len(self.times)
+
+
+class OnsetAccumulator:
+    """解码接收器：分帧计算能量和通量，结束时返回 PhraseStarts"""
+    def __init__(self):
+        self.sample_rate = 0
+        self._window = np.hanning(FRAME_SIZE).astype(np.float32)
+        self._band = slice(0, 0)
+        self._pending = []
+        self._pending_len = 0
+        self._prev_spectrum = None
+        self._energy = []
+        self._flux = []
+
+    def begin(self, sample_rate):
+        self.sample_rate = sample_rate
+        bin_hz = sample_rate / FRAME_SIZE
+        self._band = slice(int(_BAND_HZ[0] / bin_hz), int(_BAND_HZ[1] / bin_hz) + 1)
+
+    def feed(self, samples):
+        self._pending.append(samples)
+        self._pending_len += len(samples)
+        if self._pending_len >= FRAME_SIZE + _BATCH_FRAMES * HOP_SIZE:
+            self._process(final=False)
+
+    def _process(self, final):
+        buf = np.concatenate(self._pending) if len(self._pending) > 1 else self._pending[0]
+        if final:
+            # 末尾补零，使最后的样本也落入完整的一帧
+            pad = (-(len(buf) - FRAME_SIZE)) % HOP_SIZE if len(buf) >= FRAME_SIZE else FRAME_SIZE - len(buf)
+            buf = np.concatenate((buf, np.zeros(pad, dtype=np.float32)))
+        n_frames = (len(buf) - FRAME_SIZE) // HOP_SIZE + 1
+        if n_frames <= 0:
+            return
+        frames = sliding_window_view(buf, FRAME_SIZE)[::HOP_SIZE][:n_frames]
+        energy = np.einsum('ij,ij->i', frames, frames) / FRAME_SIZE
+        self._energy.append(10.0 * np.log10(energy + 1e-10).astype(np.float32))
+
+        spectrum = np.log1p(100.0 * np.abs(np.fft.rfft(frames * self._window, axis=1)[:, self._band]))
+        prev = self._prev_spectrum if self._prev_spectrum is not None else spectrum[:1]
+        diff = np.diff(spectrum, axis=0, prepend=prev)
+        self._flux.append(np.maximum(diff, 0.0).sum(axis=1).astype(np.float32))
+        self._prev_spectrum = spectrum[-1:]
+
+        rest = buf[n_frames * HOP_SIZE:]
+        self._pending = [rest] if len(rest) else []
+        self._pending_len = len(rest)
+
+    def finish(self):
+        if self._pending_len:
+            self._process(final=True)
+        empty = np.empty(0, dtype=np.float32)
+        envelope = OnsetEnvelope(self.sample_rate / HOP_SIZE if self.sample_rate else 1.0,
+                                 np.concatenate(self._energy) if self._energy else empty,
+                                 np.concatenate(self._flux) if self._flux else empty)
+        return detect_phrase_starts(envelope)
+
+
+def _moving_mean(values, width):
+    """长度不变的滑动平均（边缘按实际参与的帧数求平均）"""
+    width = max(1, int(width))
+    kernel = np.ones(width, dtype=np.float64)
+    total = np.convolve(values, kernel, mode='same')
+    count = np.convolve(np.ones(len(values)), kernel, mode='same')
+    return total / count
+
+
+def detect_phrase_starts(envelope, min_gap=MIN_GAP):
+    """在起音包络中找出乐句起点。
+
+    候选点是高于自适应阈值的通量局部峰值，且其后的平均能量比之前高出一定分贝
+    （从停顿或较弱的段落进入新的一句）。强度为通量与能量上升的乘积，
+    最后按强度做非极大值抑制，保证相邻起点之间至少间隔 min_gap 秒。
+    """
+    rate = envelope.frame_rate
+    flux = envelope.flux.astype(np.float64)
+    energy = envelope.energy_db.astype(np.float64)
+    n = len(flux)
+    if n < 3:
+        return PhraseStarts(np.empty(0), np.empty(0), envelope.duration)
+
+    flux = _moving_mean(flux, 3)
+    local = _moving_mean(flux, _THRESHOLD_WINDOW * rate)
+    spread = np.sqrt(_moving_mean((flux - local) ** 2, _THRESHOLD_WINDOW * rate))
+    peaks = np.flatnonzero((flux[1:-1] > flux[:-2]) & (flux[1:-1] >= flux[2:])
+                           & (flux[1:-1] > local[1:-1] + 0.5 * spread[1:-1])) + 1
+
+    # 起点前后各 _CONTEXT 秒的平均能量（前缀和计算）
+    w = max(1, int(_CONTEXT * rate))
+    cumsum = np.concatenate(([0.0], np.cumsum(energy)))
+    before_lo = np.maximum(peaks - w, 0)
+    after_hi = np.minimum(peaks + w, n)
+    before = (cumsum[peaks] - cumsum[before_lo]) / np.maximum(peaks - before_lo, 1)
+    after = (cumsum[after_hi] - cumsum[peaks]) / np.maximum(after_hi - peaks, 1)
+    before[peaks - before_lo == 0] = energy.min()  # 文件开头之前视为静音
+    rise = after - before
+    keep = rise >= _MIN_RISE_DB
+    peaks, rise = peaks[keep], rise[keep]
+    strengths = (flux[peaks] / (flux.max() or 1.0)) * rise
+
+    # 非极大值抑制：从最强的起点开始，占用其前后 min_gap 范围
+    gap = int(min_gap * rate)
+    taken = np.zeros(n + 1, dtype=bool)
+    chosen = []
+    for i in np.argsort(-strengths, kind='stable').tolist():
+        frame = int(peaks[i])
+        if taken[frame]:
+            continue
+        chosen.append(i)
+        taken[max(0, frame - gap):frame + gap + 1] = True
+    chosen = np.sort(np.array(chosen, dtype=np.int64))
+    return PhraseStarts(peaks[chosen] / rate, strengths[chosen], envelope.duration)
+
+
+def suggest_timestamps(timestamps, starts, min_gap=MIN_GAP):
+    """为没有时间戳的行选取建议时间，返回 {行号: 秒}。
+
+    每段连续的无时间戳行夹在前后两个已打轴的行之间（文件首尾以音频首尾为界），
+    在这个区间内选取最强的若干个乐句起点并按时间顺序分配。区间内起点数量
+    少于行数时无法可靠对应，这一段不给出建议。
+    """
+    times, strengths = starts.times, starts.strengths
+    ts = np.asarray(timestamps, dtype=np.float64)
+    untimed = np.isnan(ts)
+    # 每段连续无时间戳行的 [起始, 结束)
+    edges = np.diff(np.concatenate(([0], untimed.view(np.int8), [0])))
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+    # 每行之前（含该行）最近一个已打轴的时间戳，用于确定区间下界
+    timed_rows = np.where(untimed, -1, np.arange(len(ts)))
+    last_timed = np.maximum.accumulate(timed_rows) if len(ts) else timed_rows
+
+    suggestions = {}
+    for start, end in zip(run_starts.tolist(), run_ends.tolist()):
+        prev = last_timed[start - 1] if start else -1
+        lower = ts[prev] + min_gap if prev >= 0 else 0.0
+        upper = ts[end] - min_gap if end < len(ts) else starts.duration
+        count = end - start
+        lo = np.searchsorted(times, lower, side='left')
+        hi = np.searchsorted(times, upper, side='right')
+        if hi - lo < count:
+            continue
+        if hi - lo > count:
+            best = np.sort(lo + np.argpartition(-strengths[lo:hi], count - 1)[:count])
+        else:
+            best = np.arange(lo, hi)
+        for row, t in zip(range(start, end), times[best].tolist()):
+            suggestions[row] = round(t, 2)
+    return suggestions
@@ -0,0 +1,135 @@
+# perf.py
+"""可选的热点路径计时：按名称累计每次调用耗时的对数直方图。
+
+默认关闭，关闭时被装饰的函数只多一次属性判断。可以在 帮助 > 性能统计 中开启，
+或在启动前设置环境变量 LRC_PERF=1。
+"""
+import functools
+import json
+import os
+import platform
+import time
+from contextlib import contextmanager
+
+# 直方图桶：第 i 个桶统计 [2^(i-1), 2^i) 微秒的调用，最后一个桶收纳更慢的调用
+_BUCKETS = 32
+
+
+class Histogram:
+    """单个计时点的耗时分布（微秒，按 2 的幂分桶）"""
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def record(self, seconds):
+        us = seconds * 1e6
+        self.counts[min(int(us).bit_length(), _BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += us
+        if us < self.min:
+            self.min = us
+        if us > self.max:
+            self.max = us
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p):
+        """近似百分位数（微秒）：返回所在桶的上界，不超过实际最大值"""
+        if not self.count:
+            return 0.0
+        target = p / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(float(1 << i), self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_us": round(self.total, 1),
+            "mean_us": round(self.mean, 1),
+            "min_us": round(self.min, 1) if self.count else 0.0,
+            "max_us": round(self.max, 1),
+            "p50_us": self.percentile(50),
+            "p95_us": self.percentile(95),
+            "p99_us": self.percentile(99),
+            # 桶 i 的上界为 2^i 微秒
+            "buckets": {str(1 << i): n for i, n in enumerate(self.counts) if n},
+        }
+
+
+class PerfRecorder:
+    """所有计时点的直方图集合，以及简单的累加计数器（如界面刷新次数）"""
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}
+        self.counters = {}
+        self.started = time.time()
+
+    def record(self, name, seconds):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.record(seconds)
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self):
+        self.histograms.clear()
+        self.counters.clear()
+        self.started = time.time()
+
+    def snapshot(self):
+        return {
+            "started": self.started,
+            "duration_s": round(time.time() - self.started, 3),
+            "environment": {"python": platform.python_version(), "platform": platform.platform()},
+            "timings": {name: h.to_dict() for name, h in sorted(self.histograms.items())},
+            "counters": {name: round(value, 3) for name, value in sorted(self.counters.items())},
+        }
+
+    def dump_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2, ensure_ascii=False)
+
+
+recorder = PerfRecorder(enabled=os.environ.get("LRC_PERF", "") not in ("", "0"))
+
+
+def timed(name):
+    """装饰器：开启计时时记录函数每次调用的耗时"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not recorder.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                recorder.record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def measure(name):
+    """上下文管理器形式的计时，用于只统计函数中的一段代码（如不含文件对话框的读写）"""
+    if not recorder.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.record(name, time.perf_counter() - start)
@@ -0,0 +1,103 @@
+# perf_dialog.py
+"""帮助 > 性能统计 对话框：查看各热点路径的耗时分布并导出为 JSON"""
+import time
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton,
+    QCheckBox, QFileDialog, QMessageBox, QHeaderView, QAbstractItemView, QLabel
+)
+from PySide6.QtCore import Qt, QTimer
+
+from perf import recorder
+from i18n import LANG
+
+_COLUMNS = ("perf_col_name", "perf_col_count", "perf_col_mean", "perf_col_p50",
+            "perf_col_p95", "perf_col_p99", "perf_col_max")
+
+
+class PerformanceDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(LANG["perf_dialog_title"])
+        self.resize(720, 360)
+        layout = QVBoxLayout(self)
+
+        self.enable_check = QCheckBox(LANG["perf_enable"])
+        self.enable_check.setChecked(recorder.enabled)
+        self.enable_check.toggled.connect(self.set_enabled)
+        layout.addWidget(self.enable_check)
+
+        self.table = QTableWidget(0, len(_COLUMNS))
+        self.table.setHorizontalHeaderLabels([LANG[key] for key in _COLUMNS])
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        # 计数器和进程 CPU 占用（相邻两次刷新之间的 CPU 时间 / 墙钟时间）
+        self.counters_label = QLabel()
+        self.counters_label.setWordWrap(True)
+        self.counters_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        layout.addWidget(self.counters_label)
+        self._last_cpu = (time.process_time(), time.perf_counter())
+
+        buttons = QHBoxLayout()
+        reset_button = QPushButton(LANG["perf_reset"])
+        export_button = QPushButton(LANG["perf_export"])
+        close_button = QPushButton(LANG["perf_close"])
+        reset_button.clicked.connect(self.reset)
+        export_button.clicked.connect(self.export_json)
+        close_button.clicked.connect(self.accept)
+        buttons.addWidget(reset_button)
+        buttons.addWidget(export_button)
+        buttons.addStretch()
+        buttons.addWidget(close_button)
+        layout.addLayout(buttons)
+
+        # 对话框打开期间每秒刷新一次
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(1000)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start()
+        self.refresh()
+
+    def set_enabled(self, checked):
+        recorder.enabled = checked
+
+    def reset(self):
+        recorder.reset()
+        self.refresh()
+
+    def refresh(self):
+        histograms = sorted(recorder.histograms.items())
+        self.table.setRowCount(len(histograms))
+        for row, (name, h) in enumerate(histograms):
+            values = (name, str(h.count), f"{h.mean / 1000:.3f}", f"{h.percentile(50) / 1000:.3f}",
+                      f"{h.percentile(95) / 1000:.3f}", f"{h.percentile(99) / 1000:.3f}",
+                      f"{h.max / 1000:.3f}")
+            for column, text in enumerate(values):
+                item = QTableWidgetItem(text)
+                if column:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, column, item)
+
+        cpu, wall = time.process_time(), time.perf_counter()
+        usage = (cpu - self._last_cpu[0]) / max(wall - self._last_cpu[1], 1e-6)
+        self._last_cpu = (cpu, wall)
+        parts = [LANG["perf_cpu_usage"].format(p=usage)]
+        parts += [f"{name}: {value:g}" if isinstance(value, int) else f"{name}: {value:.1f}"
+                  for name, value in sorted(recorder.counters.items())]
+        self.counters_label.setText("    ".join(parts))
+
+    def export_json(self):
+        path, _ = QFileDialog.getSaveFileName(self, LANG["perf_export_title"], "lrc-perf.json", LANG["perf_json_filter"])
+        if not path:
+            return
+        try:
+            recorder.dump_json(path)
+        except OSError as e:
+            QMessageBox.critical(self, LANG["error_title"], LANG["error_save_system"].format(e=e))
+
+    def done(self, result):
+        self.refresh_timer.stop()
+        super().done(result)
@@ -2,9 +2,17 @@
 from PySide6.QtCore import QObject, QUrl, Signal
 from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
 import functools
+import time
+
+# 插值位置比后端报告的位置超前不超过这么多毫秒时，视为后端抖动而保持单调；更大的回退视为跳转
+_JITTER_MS = 250.0
 
 class Player(QObject):
-    """封装 QMediaPlayer 提供播放控制"""
+    """封装 QMediaPlayer 提供播放控制。
+
+    后端的位置只按其自身的节奏更新（通常几十到几百毫秒一次），播放时 get_pos()
+    以最近一次更新为锚点，用单调时钟按播放速度插值，并保证不会因后端抖动而倒退。
+    """
     positionChanged = Signal(int)
     durationChanged = Signal(int)
     playbackStateChanged = Signal(QMediaPlayer.PlaybackState)
@@ -15,6 +23,14 @@ class Player(QObject):
         self._audio_output = QAudioOutput()
         self._player.setAudioOutput(self._audio_output)
 
+        # 插值时钟：锚点（后端位置, 单调时间）、播放速度、上次返回的位置
+        self._anchor_pos = 0.0
+        self._anchor_time = time.perf_counter()
+        self._rate = 1.0
+        self._last_pos = 0.0
+        self._player.positionChanged.connect(self._on_backend_position)
+        self._player.playbackStateChanged.connect(self._reset_clock)
+
         # 使用partial替代lambda避免创建额外闭包
         self._player.positionChanged.connect(functools.partial(self.positionChanged.emit))
         self._player.durationChanged.connect(functools.partial(self.durationChanged.emit))
@@ -34,13 +50,37 @@ class Player(QObject):
     def stop(self):
         self._player.stop()
 
+    def _on_backend_position(self, position):
+        self._anchor_pos = float(position)
+        self._anchor_time = time.perf_counter()
+
+    def _reset_clock(self, *args):
+        """跳转、暂停、变速后重新以后端位置为锚点，并取消单调约束"""
+        self._on_backend_position(self._player.position())
+        self._last_pos = self._anchor_pos
+
+    def get_precise_pos(self) -> float:
+        """插值后的播放位置（毫秒，浮点数）"""
+        if not self.is_playing():
+            return float(self._player.position())
+        pos = self._anchor_pos + (time.perf_counter() - self._anchor_time) * 1000.0 * self._rate
+        if self._last_pos - _JITTER_MS < pos < self._last_pos:
+            pos = self._last_pos
+        duration = self._player.duration()
+        if duration > 0:
+            pos = min(pos, float(duration))
+        self._last_pos = pos
+        return pos
+
     def get_pos(self) -> int:
         """获取当前播放位置（毫秒）"""
-        return self._player.position()
+        return int(self.get_precise_pos())
 
     def set_pos(self, position: int):
         """设置播放位置（毫秒）"""
         self._player.setPosition(position)
+        self._on_backend_position(position)
+        self._last_pos = self._anchor_pos
     
     def get_duration(self) -> int:
         """获取总时长（毫秒）"""
@@ -56,4 +96,7 @@ class Player(QObject):
 
     def set_playback_rate(self, rate: float):
         """设置播放速度"""
+        pos = self.get_precise_pos()
         self._player.setPlaybackRate(rate)
+        self._on_backend_position(pos)
+        self._rate = rate
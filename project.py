@@ -0,0 +1,212 @@
+# project.py
+"""二进制工程文件（.lrcproj）：把歌词各列、罗马音缓存、撤销历史和音频引用存进一个文件。
+
+打开时内存映射文件，直接从各段取出列数据，不再解析 LRC 文本。
+"""
+import io
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+import tempfile
+from array import array
+from itertools import accumulate, chain, pairwise
+
+from lrc import Lrc, LyricList, cached_romaji
+
+try:
+    from waveform import peak_cache_key
+    PEAK_CACHE_AVAILABLE = True
+except ImportError:
+    PEAK_CACHE_AVAILABLE = False
+
+PROJECT_SUFFIX = ".lrcproj"
+_MAGIC = b"LRCPROJ\0"
+_VERSION = 1
+# 文件头：魔数、版本、字节序（0 小端 / 1 大端）、段数；随后是段表，每项为段名、偏移和长度
+_HEADER = struct.Struct('<8sHHI')
+_ENTRY = struct.Struct('<8sQQ')
+_ALIGN = 8
+
+
+class Project:
+    """工程文件的内容。
+
+    - lrc：歌曲信息和歌词
+    - lrc_path：对应的 LRC 文件（可能为 None）
+    - audio：音频引用 {'path', 'size', 'mtime_ns', 'key'}，key 为波形峰值缓存键（同时是内容哈希）
+    - history / history_index：撤销历史（commands.command_state 的结果）和当前位置
+    - dirty：保存工程时歌词相对 LRC 文件是否有未保存的修改
+    - romaji：读取时恢复的罗马音缓存 [(原文, 罗马音), ...]（写入时取自全局缓存）
+    """
+
+    def __init__(self, lrc, lrc_path=None, audio=None, history=(), history_index=0, dirty=False):
+        self.lrc = lrc
+        self.lrc_path = lrc_path
+        self.audio = audio
+        self.history = list(history)
+        self.history_index = history_index
+        self.dirty = dirty
+        self.romaji = []
+
+
+def audio_reference(audio_path):
+    """记录音频文件的路径、大小、修改时间和内容哈希"""
+    st = os.stat(audio_path)
+    return {"path": os.path.abspath(audio_path), "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+            "key": peak_cache_key(audio_path) if PEAK_CACHE_AVAILABLE else None}
+
+
+def audio_unchanged(reference):
+    """音频文件是否仍在原处且未被修改（据此可直接使用波形缓存，不必重新哈希）"""
+    try:
+        st = os.stat(reference["path"])
+    except OSError:
+        return False
+    return (st.st_size, st.st_mtime_ns) == (reference["size"], reference["mtime_ns"])
+
+
+# ---- 写入 ----
+def _text_column(strings):
+    """字符串列：UTF-8 拼接的文本 + 每项结束位置（按字符计）"""
+    return "".join(strings).encode('utf-8'), array('I', accumulate(map(len, strings)))
+
+
+def write_project(path, project):
+    """原子地写入工程文件（先写临时文件并 fsync，再重命名覆盖）"""
+    lyrics = project.lrc.lyrics
+    ts, original, translated, words = lyrics.columns()
+    originals, original_ends = _text_column(original)
+    translations, translated_ends = _text_column(translated)
+    word_data = array('H')
+    for row_words in words:
+        if row_words:
+            word_data.extend(row_words)
+    word_ends = array('I', accumulate(len(row_words) if row_words else 0 for row_words in words))
+    # 罗马音缓存：只保存当前歌词中已转换过的行
+    romaji_rows = array('I')
+    romaji = []
+    for row, text in enumerate(original):
+        value = cached_romaji(text) if text else None
+        if value is not None:
+            romaji_rows.append(row)
+            romaji.append(value)
+    romaji_text, romaji_ends = _text_column(romaji)
+    info = {"meta": project.lrc.meta, "lrc_path": project.lrc_path, "audio": project.audio,
+            "history_index": project.history_index, "dirty": project.dirty}
+    sections = [
+        (b"info", json.dumps(info, ensure_ascii=False).encode('utf-8')),
+        (b"ts", ts),
+        (b"orig", originals), (b"origend", original_ends),
+        (b"trans", translations), (b"transend", translated_ends),
+        (b"words", word_data), (b"wordend", word_ends),
+        (b"rjrows", romaji_rows), (b"romaji", romaji_text), (b"rjend", romaji_ends),
+        (b"history", pickle.dumps(project.history, protocol=pickle.HIGHEST_PROTOCOL)),
+    ]
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".lrcproj-", suffix=".tmp", dir=directory)
+    try:
+        with open(fd, 'wb') as f:
+            table_size = _HEADER.size + _ENTRY.size * len(sections)
+            offset = -table_size % _ALIGN + table_size
+            entries = []
+            for name, data in sections:
+                size = memoryview(data).nbytes
+                entries.append(_ENTRY.pack(name, offset, size))
+                offset += size + (-size % _ALIGN)
+            f.write(_HEADER.pack(_MAGIC, _VERSION, sys.byteorder == 'big', len(sections)))
+            f.write(b"".join(entries))
+            f.write(b"\0" * (-table_size % _ALIGN))
+            for name, data in sections:
+                size = memoryview(data).nbytes
+                f.write(data)
+                f.write(b"\0" * (-size % _ALIGN))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+# ---- 读取 ----
+class _HistoryUnpickler(pickle.Unpickler):
+    """撤销历史只含普通值、数组和歌词容器，拒绝加载其他任何类型"""
+    _ALLOWED = {("array", "array"), ("array", "_array_reconstructor"),
+                ("lrc", "LyricList"), ("lrc", "LyricLine")}
+
+    def find_class(self, module, name):
+        if (module, name) not in self._ALLOWED:
+            raise pickle.UnpicklingError(f"{module}.{name} is not allowed in a project file")
+        return super().find_class(module, name)
+
+
+def _split_text(text, ends):
+    return [text[a:b] for a, b in pairwise(chain((0,), ends))]
+
+
+def read_project(path):
+    """内存映射读取工程文件，格式不符时抛出 ValueError"""
+    with open(path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ValueError("empty project file") from None
+    with data, memoryview(data) as view:
+        if len(view) < _HEADER.size:
+            raise ValueError("not a project file")
+        magic, version, big_endian, count = _HEADER.unpack_from(view)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("not a project file or unsupported version")
+        sections = {}
+        for i in range(count):
+            name, offset, size = _ENTRY.unpack_from(view, _HEADER.size + i * _ENTRY.size)
+            if offset + size > len(view):
+                raise ValueError("truncated project file")
+            sections[name.rstrip(b"\0")] = (offset, size)
+        swap = big_endian != (sys.byteorder == 'big')
+
+        def column(name, typecode):
+            offset, size = sections[name]
+            values = array(typecode)
+            with view[offset:offset + size] as part:
+                values.frombytes(part)
+            if swap:
+                values.byteswap()
+            return values
+
+        def text(name):
+            offset, size = sections[name]
+            with view[offset:offset + size] as part:
+                return str(part, 'utf-8')
+
+        try:
+            info = json.loads(text(b"info"))
+            ts = column(b"ts", 'd')
+            original = _split_text(text(b"orig"), column(b"origend", 'I'))
+            translated = _split_text(text(b"trans"), column(b"transend", 'I'))
+            word_data = column(b"words", 'H')
+            words = [word_data[a:b] if b > a else None
+                     for a, b in pairwise(chain((0,), column(b"wordend", 'I')))]
+            romaji = list(zip((original[row] for row in column(b"rjrows", 'I')),
+                              _split_text(text(b"romaji"), column(b"rjend", 'I'))))
+            offset, size = sections[b"history"]
+            with view[offset:offset + size] as part:
+                history = _HistoryUnpickler(io.BytesIO(part)).load()
+        except KeyError as e:
+            raise ValueError(f"project file is missing section {e}") from None
+        except (pickle.UnpicklingError, EOFError) as e:
+            raise ValueError(f"damaged undo history: {e}") from None
+
+    lrc = Lrc()
+    lrc.meta = info["meta"]
+    lrc.lyrics = LyricList.from_columns(ts, original, translated, words)
+    project = Project(lrc, info["lrc_path"], info["audio"], history, info["history_index"], info["dirty"])
+    project.romaji = romaji
+    return project
@@ -0,0 +1,93 @@
+# refresh_scheduler.py
+"""播放时的界面刷新调度：根据窗口状态调整刷新频率。
+
+- 窗口可见且处于激活状态：按显示器刷新率刷新（精确定时器，间隔为一帧）
+- 窗口可见但未激活：降到 10 次/秒
+- 窗口最小化或隐藏：暂停刷新，恢复显示时立即补一次
+
+回调函数返回 False 表示本次没有任何变化（如位置未变），计为空闲 tick。
+开启性能统计时，各模式的 tick 数、空闲 tick 数和 tick 内的 CPU 时间计入 perf 计数器。
+"""
+import time
+
+from PySide6.QtCore import QObject, QEvent, QTimer, Qt
+
+from perf import recorder
+
+ACTIVE = "active"
+INACTIVE = "inactive"
+HIDDEN = "hidden"
+
+_INACTIVE_INTERVAL_MS = 100
+_MIN_FRAME_MS = 8    # 高刷新率显示器上也不超过约 120 次/秒
+_MAX_FRAME_MS = 33
+
+
+class RefreshScheduler(QObject):
+    def __init__(self, window, callback, parent=None):
+        super().__init__(parent or window)
+        self.window = window
+        self.callback = callback
+        self.running = False
+        self.mode = HIDDEN
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.tick)
+        window.installEventFilter(self)
+
+    def start(self):
+        self.running = True
+        self._update_mode()
+        self.tick()
+
+    def stop(self):
+        self.running = False
+        self.timer.stop()
+
+    def frame_interval(self):
+        """当前屏幕一帧的毫秒数"""
+        screen = self.window.screen()
+        rate = screen.refreshRate() if screen is not None else 60.0
+        return min(max(int(1000.0 / (rate or 60.0)), _MIN_FRAME_MS), _MAX_FRAME_MS)
+
+    def _current_mode(self):
+        window = self.window
+        if not window.isVisible() or window.isMinimized():
+            return HIDDEN
+        return ACTIVE if window.isActiveWindow() else INACTIVE
+
+    def _update_mode(self):
+        mode = self._current_mode()
+        resumed = mode != HIDDEN and self.mode == HIDDEN
+        self.mode = mode
+        if not self.running:
+            return
+        if mode == HIDDEN:
+            self.timer.stop()
+            return
+        if mode == ACTIVE:
+            self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+            self.timer.setInterval(self.frame_interval())
+        else:
+            self.timer.setTimerType(Qt.TimerType.CoarseTimer)
+            self.timer.setInterval(_INACTIVE_INTERVAL_MS)
+        self.timer.start()
+        if resumed:
+            self.tick()
+
+    def eventFilter(self, obj, event):
+        if event.type() in (QEvent.Type.WindowStateChange, QEvent.Type.Show, QEvent.Type.Hide,
+                            QEvent.Type.WindowActivate, QEvent.Type.WindowDeactivate):
+            # 事件处理完成后窗口状态才会更新，延后到下一轮事件循环再判断
+            QTimer.singleShot(0, self._update_mode)
+        return False
+
+    def tick(self):
+        if not recorder.enabled:
+            self.callback()
+            return
+        start = time.process_time()
+        changed = self.callback()
+        recorder.count(f"ui_tick.{self.mode}")
+        if changed is False:
+            recorder.count("ui_tick.idle")
+        recorder.count("ui_tick.cpu_ms", (time.process_time() - start) * 1000.0)
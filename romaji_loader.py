@@ -0,0 +1,128 @@
+# romaji_loader.py
+"""在后台线程中为歌词行计算罗马音提示，优先处理可见行"""
+import atexit
+import threading
+import weakref
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+# 每批回传给界面的结果条数
+_BATCH_SIZE = 64
+# 仍然存活的加载器：解释器退出时窗口可能没有经过 closeEvent 就被销毁，
+# 须在 Qt 对象被删除之前停止工作线程
+_loaders = weakref.WeakSet()
+
+
+@atexit.register
+def _shutdown_loaders():
+    for loader in list(_loaders):
+        loader.shutdown()
+
+
+class _DrainTask(QRunnable):
+    """在线程池中逐批取出待转换的行，直到队列为空或任务被取消"""
+    def __init__(self, loader):
+        super().__init__()
+        self.loader = loader
+
+    def run(self):
+        loader = self.loader
+        while True:
+            generation, batch = loader._take_batch()
+            if not batch:
+                return
+            results = []
+            for row, text in batch:
+                if generation != loader._generation:
+                    break
+                results.append((row, text, loader._convert(text)))
+            if results:
+                # 与 cancel()/shutdown() 互斥：代号已变（加载器可能正在销毁）时不再发出信号
+                with loader._lock:
+                    if generation != loader._generation:
+                        continue
+                    loader.resultsReady.emit(generation, results)
+
+
+class RomajiTooltipLoader(QObject):
+    """罗马音提示的后台加载器。
+
+    界面线程调用 schedule() 提交 {行号: 原文}，工作线程转换后通过 resultsReady
+    信号（跨线程自动排队）分批送回界面线程。cancel() 会丢弃尚未处理的行，
+    已经在途的结果因代号（generation）不匹配而被忽略。
+    """
+    resultsReady = Signal(int, list)  # generation, [(row, text, romaji), ...]
+
+    def __init__(self, convert, parent=None):
+        super().__init__(parent)
+        self._convert = convert
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._priority = range(0)
+        self._generation = 0
+        self._running = False
+        self._pool = QThreadPool(self)
+        # 单线程即可：转换器本身是串行的，多线程只会争抢锁
+        self._pool.setMaxThreadCount(1)
+        self._closed = False
+        _loaders.add(self)
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def schedule(self, items, visible_rows=None):
+        """提交待转换的 {行号: 原文}，visible_rows 中的行会被优先处理"""
+        if not items:
+            return
+        with self._lock:
+            if self._closed:
+                return
+            self._pending.update(items)
+            if visible_rows is not None:
+                self._priority = visible_rows
+            if self._running:
+                return
+            self._running = True
+        self._pool.start(_DrainTask(self))
+
+    def prioritize(self, visible_rows):
+        """视口滚动后更新优先处理的行范围"""
+        with self._lock:
+            self._priority = visible_rows
+
+    def cancel(self):
+        """丢弃所有待处理的行（文档变化时调用）"""
+        with self._lock:
+            self._pending.clear()
+            self._generation += 1
+
+    def shutdown(self):
+        """停止加载：丢弃待处理的行并等待工作线程结束，之后 schedule() 不再启动新任务"""
+        with self._lock:
+            self._closed = True
+            self._pending.clear()
+            self._generation += 1
+        _loaders.discard(self)
+        try:
+            self._pool.waitForDone()
+        except RuntimeError:
+            # Qt 对象已被删除：代号已变，在途的结果不会再发出
+            pass
+
+    def _take_batch(self):
+        with self._lock:
+            pending = self._pending
+            batch = []
+            for row in self._priority:
+                if len(batch) >= _BATCH_SIZE:
+                    break
+                text = pending.pop(row, None)
+                if text is not None:
+                    batch.append((row, text))
+            while pending and len(batch) < _BATCH_SIZE:
+                row = next(iter(pending))
+                batch.append((row, pending.pop(row)))
+            if not batch:
+                self._running = False
+            return self._generation, batch
@@ -0,0 +1,117 @@
+# row_sizer.py
+"""按需计算表格行高：只测量视口中可见的行，并按行缓存测量结果"""
+from PySide6.QtCore import QObject, QEvent, QTimer, Qt
+
+
+class LazyRowSizer(QObject):
+    """代替 resizeRowsToContents 的惰性行高计算。
+
+    每行的测量结果缓存在 _heights 中（0 表示尚未测量）。行文字变化只作废该行，
+    列宽变化作废全部；插入、删除行时缓存随之移动。实际测量推迟到事件循环空闲时，
+    并且只针对当前可见的行，屏幕外的行保持默认行高，滚动到时才测量。
+    """
+    # 测量可见行后行高变化会改变可见范围，最多重复这么多轮
+    _MAX_PASSES = 4
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self._heights = []
+        self._model = None
+        self._pending = False
+
+        view.verticalScrollBar().valueChanged.connect(self.schedule)
+        view.horizontalHeader().sectionResized.connect(self._on_column_resized)
+        view.viewport().installEventFilter(self)
+        self.set_model(view.model())
+
+    def set_model(self, model):
+        if self._model is not None:
+            self._model.modelReset.disconnect(self._on_reset)
+            self._model.rowsInserted.disconnect(self._on_rows_inserted)
+            self._model.rowsRemoved.disconnect(self._on_rows_removed)
+            self._model.dataChanged.disconnect(self._on_data_changed)
+        self._model = model
+        if model is None:
+            self._heights = []
+            return
+        model.modelReset.connect(self._on_reset)
+        model.rowsInserted.connect(self._on_rows_inserted)
+        model.rowsRemoved.connect(self._on_rows_removed)
+        model.dataChanged.connect(self._on_data_changed)
+        self._on_reset()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Resize:
+            self.schedule()
+        return False
+
+    # ---- 缓存维护 ----
+
+    def _on_reset(self):
+        self._heights = [0] * self._model.rowCount()
+        self.schedule()
+
+    def _on_rows_inserted(self, parent, first, last):
+        self._heights[first:first] = [0] * (last - first + 1)
+        self.schedule()
+
+    def _on_rows_removed(self, parent, first, last):
+        del self._heights[first:last + 1]
+        self.schedule()
+
+    def _on_data_changed(self, top_left, bottom_right, roles=()):
+        # 只有显示文字变化才可能改变行高，背景、提示等角色的变化忽略
+        if roles and Qt.ItemDataRole.DisplayRole not in roles:
+            return
+        heights = self._heights
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            heights[row] = 0
+        self.schedule()
+
+    def _on_column_resized(self, *args):
+        self.invalidate_all()
+
+    def invalidate_all(self):
+        """作废所有行的测量结果（列宽、字体或显示的列变化时）"""
+        self._heights = [0] * len(self._heights)
+        self.schedule()
+
+    # ---- 测量 ----
+
+    def schedule(self, *args):
+        """把测量推迟到事件循环空闲时，合并同一轮中的多次请求"""
+        if not self._pending:
+            self._pending = True
+            QTimer.singleShot(0, self.size_visible_rows)
+
+    def visible_rows(self):
+        view = self.view
+        first = view.rowAt(0)
+        if first < 0:
+            return range(0)
+        last = view.rowAt(view.viewport().height() - 1)
+        if last < 0:
+            last = len(self._heights) - 1
+        return range(first, last + 1)
+
+    def size_visible_rows(self):
+        """测量可见行中尚未缓存的行，返回本次测量的行数"""
+        self._pending = False
+        view = self.view
+        heights = self._heights
+        measured = 0
+        for _ in range(self._MAX_PASSES):
+            changed = False
+            for row in self.visible_rows():
+                if heights[row]:
+                    continue
+                height = view.sizeHintForRow(row)
+                heights[row] = height
+                measured += 1
+                if view.rowHeight(row) != height:
+                    view.setRowHeight(row, height)
+                    changed = True
+            if not changed:
+                break
+        return measured
@@ -0,0 +1,208 @@
+# search_index.py
+"""歌词全文检索：原文、译文和罗马音的三元组（trigram）倒排索引，随 LyricList 变更增量维护"""
+import re
+
+from lrc import cached_romaji
+
+FIELDS = ('original', 'translated', 'romaji')
+# 罗马音由原文生成，只能查找不能替换
+REPLACEABLE_FIELDS = ('original', 'translated')
+_GRAM = 3
+# 每个已索引字符的大致内存开销（折叠文本加上倒排表中的条目）
+_BYTES_PER_CHAR = 70
+
+
+def _grams(text):
+    return {text[i:i + _GRAM] for i in range(len(text) - _GRAM + 1)}
+
+
+def replace_text(text, query, replacement, match_case=False):
+    """把 text 中所有 query 替换为 replacement（不区分大小写时按忽略大小写匹配）"""
+    if match_case:
+        return text.replace(query, replacement)
+    return re.sub(re.escape(query), lambda m: replacement, text, flags=re.IGNORECASE)
+
+
+class TextSearchIndex:
+    """不区分大小写的子串检索。
+
+    每行分配一个稳定的键，倒排表 gram -> {键} 按字段分开保存。插入、删除行时
+    只需移动键列表，不必改写倒排表；键到行号的映射在结构变化后的第一次查询时重建。
+    查询先用查询串的三元组求交集得到候选行，再逐个确认子串确实出现；
+    不足三个字符的查询（常见于中日文单字）直接扫描已折叠的文本。
+
+    罗马音只索引已在缓存中的结果，后台转换完成后调用 refresh_romaji() 补上。
+    """
+
+    def __init__(self, lyrics):
+        self._lyrics = lyrics
+        self._keys = []
+        self._next_key = 0
+        self._texts = {field: {} for field in FIELDS}
+        self._postings = {field: {} for field in FIELDS}
+        self._row_of = None
+        self._stale = True
+        lyrics.add_listener(self._on_lyrics_changed)
+
+    def detach(self):
+        """停止跟踪歌词变更"""
+        self._lyrics.remove_listener(self._on_lyrics_changed)
+
+    def release(self):
+        """丢弃已建立的索引释放内存，下次查询时重建"""
+        self._texts = {field: {} for field in FIELDS}
+        self._postings = {field: {} for field in FIELDS}
+        self._keys = []
+        self._row_of = None
+        self._stale = True
+
+    def memory_estimate(self):
+        """估算索引占用的内存（字节），未建立时为 0"""
+        if self._stale:
+            return 0
+        return _BYTES_PER_CHAR * sum(len(text) for texts in self._texts.values() for text in texts.values())
+
+    # ---- 维护 ----
+    def ensure_built(self):
+        """索引过期（尚未建立或歌词被整体替换）时重建"""
+        if self._stale:
+            self.rebuild()
+
+    def rebuild(self):
+        self._texts = {field: {} for field in FIELDS}
+        self._postings = {field: {} for field in FIELDS}
+        self._keys = list(range(len(self._lyrics)))
+        self._next_key = len(self._keys)
+        self._row_of = None
+        self._stale = False
+        for row, key in enumerate(self._keys):
+            self._index_row(row, key)
+
+    def _add(self, field, key, text):
+        if not text:
+            return
+        folded = text.lower()
+        self._texts[field][key] = folded
+        postings = self._postings[field]
+        for gram in _grams(folded):
+            keys = postings.get(gram)
+            if keys is None:
+                postings[gram] = {key}
+            else:
+                keys.add(key)
+
+    def _discard(self, field, key):
+        folded = self._texts[field].pop(key, None)
+        if folded is None:
+            return
+        postings = self._postings[field]
+        for gram in _grams(folded):
+            keys = postings[gram]
+            keys.discard(key)
+            if not keys:
+                del postings[gram]
+
+    def _index_row(self, row, key):
+        original = self._lyrics.get(row, 'original')
+        self._add('original', key, original)
+        self._add('translated', key, self._lyrics.get(row, 'translated'))
+        self._add('romaji', key, cached_romaji(original) if original else None)
+
+    def _on_lyrics_changed(self, kind, row, count, field, old):
+        if self._stale:
+            return
+        if kind == 'update':
+            if field not in ('original', 'translated'):
+                return
+            key = self._keys[row]
+            self._discard(field, key)
+            value = self._lyrics.get(row, field)
+            self._add(field, key, value)
+            if field == 'original':
+                self._discard('romaji', key)
+                self._add('romaji', key, cached_romaji(value) if value else None)
+        elif kind == 'insert':
+            keys = list(range(self._next_key, self._next_key + count))
+            self._next_key += count
+            self._keys[row:row] = keys
+            for r, key in enumerate(keys, row):
+                self._index_row(r, key)
+            self._row_of = None
+        elif kind == 'remove':
+            for key in self._keys[row:row + count]:
+                for f in FIELDS:
+                    self._discard(f, key)
+            del self._keys[row:row + count]
+            self._row_of = None
+        elif field != 'ts':
+            # 整体替换：下次查询时再重建（批量修改时间戳不影响文本）
+            self._stale = True
+
+    def refresh_romaji(self, rows):
+        """后台罗马音转换完成后，把新缓存的结果加入索引"""
+        if self._stale:
+            return
+        lyrics = self._lyrics
+        for row in rows:
+            if row >= len(self._keys):
+                continue
+            key = self._keys[row]
+            original = lyrics.get(row, 'original')
+            self._discard('romaji', key)
+            self._add('romaji', key, cached_romaji(original) if original else None)
+
+    def missing_romaji(self):
+        """还没有罗马音的行 {行号: 原文}，供后台转换"""
+        self.ensure_built()
+        indexed = self._texts['romaji']
+        lyrics = self._lyrics
+        return {row: lyrics.get(row, 'original') for row, key in enumerate(self._keys)
+                if key not in indexed and lyrics.get(row, 'original')}
+
+    # ---- 查询 ----
+    def search(self, query, fields=FIELDS, match_case=False):
+        """返回任一字段包含 query 的行号（升序）"""
+        if not query:
+            return []
+        self.ensure_built()
+        folded = query.lower()
+        found = set()
+        for field in fields:
+            found |= self._search_field(field, folded)
+        row_of = self._row_map()
+        if match_case:
+            found = {key for key in found if self._contains(row_of[key], query, fields)}
+        return sorted(row_of[key] for key in found)
+
+    def _row_map(self):
+        if self._row_of is None:
+            self._row_of = {key: row for row, key in enumerate(self._keys)}
+        return self._row_of
+
+    def _search_field(self, field, folded):
+        texts = self._texts[field]
+        if len(folded) < _GRAM:
+            return {key for key, text in texts.items() if folded in text}
+        postings = self._postings[field]
+        candidates = None
+        # 从最短的倒排表开始求交集
+        for keys in sorted((postings.get(gram, ()) for gram in _grams(folded)), key=len):
+            if not keys:
+                return set()
+            candidates = set(keys) if candidates is None else candidates & keys
+            if not candidates:
+                return set()
+        return {key for key in candidates if folded in texts[key]}
+
+    def _contains(self, row, query, fields):
+        """区分大小写时在原始文本上确认"""
+        lyrics = self._lyrics
+        for field in fields:
+            if field == 'romaji':
+                original = lyrics.get(row, 'original')
+                text = cached_romaji(original) if original else None
+            else:
+                text = lyrics.get(row, field)
+            if text and query in text:
+                return True
+        return False
@@ -0,0 +1,21 @@
+# tests/conftest.py
+"""测试公共设置：让测试能直接导入项目根目录下的模块，Qt 使用无界面平台"""
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PySide6.QtCore import QStandardPaths
+    from PySide6.QtWidgets import QApplication
+    # 设置和恢复日志写到测试专用目录，不碰用户数据
+    QStandardPaths.setTestModeEnabled(True)
+    app = QApplication.instance() or QApplication([])
+    app.setOrganizationName("SkyDream01")
+    app.setApplicationName("LRC Timeline Editor Tests")
+    return app
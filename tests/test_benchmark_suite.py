@@ -0,0 +1,22 @@
+# tests/test_benchmark_suite.py
+"""回归套件的基线比较：基线缺失时立即失败，新增用例不参与比较"""
+import io
+
+import pytest
+
+from benchmarks import suite
+
+
+def test_missing_baseline_fails_before_running(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exc:
+        suite.main(["--compare", str(tmp_path / "baseline.json")])
+    assert exc.value.code == 2
+    assert "--save" in capsys.readouterr().err
+
+
+def test_compare_flags_regressions_and_skips_new_cases():
+    results = {"parse/a/1000": 1.5, "parse/b/1000": 1.0, "parse/c/1000": 9.0}
+    baseline = {"parse/a/1000": 1.0, "parse/b/1000": 1.0}
+    regressions, compared = suite.compare(results, baseline, 0.25, 0.05, out=io.StringIO())
+    assert regressions == ["parse/a/1000"]
+    assert compared == 2
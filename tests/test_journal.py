@@ -0,0 +1,64 @@
+# tests/test_journal.py
+"""崩溃恢复日志：重放结果与编辑器中的内容一致，整份替换内容时不写多余的快照"""
+import os
+
+from lrc import Lrc, LyricLine
+import journal
+
+
+def _replay(log):
+    log.close(discard=False)
+    return journal.RecoveredSession(log.path).replay()
+
+
+def _state(lrc):
+    return list(lrc.lyrics.rows()), dict(lrc.meta)
+
+
+def test_edits_after_open_replay_on_the_file(tmp_path):
+    path = tmp_path / "song.lrc"
+    path.write_text("[ti:t]\n[00:02.00]b\n[00:01.00]a\nuntimed\n", encoding="utf-8")
+    lrc = Lrc()
+    lrc.parse_from_file(str(path))
+    log = journal.RecoveryJournal(str(tmp_path), lrc)
+    log.start(str(path), parsed=True)
+    lrc.lyrics.set(0, 'original', "a-edited")
+    lrc.lyrics.insert_lines(2, [LyricLine(3.0, "c")])
+    del lrc.lyrics[1]
+    expected = _state(lrc)
+    assert _state(_replay(log)) == expected
+
+
+def test_edits_after_save_survive_reparse_reordering(tmp_path):
+    # 重新解析保存的文件会排序、把无时间戳的行移到最后并丢弃空行
+    path = str(tmp_path / "song.lrc")
+    lrc = Lrc()
+    lrc.lyrics.extend([LyricLine(1.0, "a"), LyricLine(None, "b"), LyricLine(2.0, "c"), LyricLine(3.0, "")])
+    lrc.save_to_file(path)
+    log = journal.RecoveryJournal(str(tmp_path), lrc)
+    log.start(path)
+    lrc.lyrics.set(2, 'original', "C-edited")
+    expected = _state(lrc)
+    assert _state(_replay(log)) == expected
+
+
+def test_suspended_reset_writes_no_snapshot(tmp_path):
+    path = tmp_path / "song.lrc"
+    path.write_text("[00:01.00]a\n", encoding="utf-8")
+    lrc = Lrc()
+    log = journal.RecoveryJournal(str(tmp_path), lrc)
+    snapshots = []
+    take_snapshot = log._snapshot
+    log._snapshot = lambda: snapshots.append(1) or take_snapshot()
+    log.start()
+
+    log.suspend()
+    lrc.lyrics[:] = [LyricLine(float(i), f"line {i}") for i in range(100)]
+    log.start(str(path), parsed=True)
+    assert snapshots == []
+
+    # 没有 suspend 时整份替换会立即写快照
+    lrc.lyrics[:] = [LyricLine(1.0, "a")]
+    assert snapshots == [1]
+    log.close()
+    assert not os.path.exists(log.path)
@@ -0,0 +1,86 @@
+# tests/test_lrc.py
+"""LRC 解析与时间轴索引：与旧版实现和整体重建的结果对照"""
+import random
+
+import pytest
+
+from lrc import Lrc, LyricLine, TimelineIndex, pack_word_timings
+from benchmarks.legacy import legacy_parse
+from benchmarks.lrc_gen import generate_lrc
+from benchmarks.bench_parse import KINDS
+from benchmarks.bench_timeline import legacy_find_current_play_row
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_parse_matches_legacy(kind):
+    text = generate_lrc(2000, kind, seed=3)
+    lrc = Lrc()
+    lrc.parse_from_text(text)
+    meta, expected = legacy_parse(text)
+    assert list(lrc.lyrics.rows()) == [(l['ts'], l['original'], l['translated']) for l in expected]
+    assert {k: lrc.meta[k] for k in ("ti", "ar", "al")} == meta
+
+
+def test_parse_from_file_matches_text(tmp_path):
+    text = generate_lrc(500, "bilingual", seed=4)
+    path = tmp_path / "song.lrc"
+    path.write_text(text, encoding="utf-8")
+    from_file, from_text = Lrc(), Lrc()
+    assert from_file.parse_from_file(str(path)) == "utf-8"
+    from_text.parse_from_text(text)
+    assert from_file.lyrics == from_text.lyrics
+    assert from_file.meta == from_text.meta
+
+
+def _random_ts(rng):
+    return None if rng.random() < 0.2 else round(rng.uniform(0, 60), 2)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_timeline_index_matches_rebuild(seed):
+    rng = random.Random(seed)
+    lrc = Lrc()
+    lyrics = lrc.lyrics
+    lyrics.extend(LyricLine(_random_ts(rng), "x") for _ in range(30))
+    index = lrc.timeline
+    for step in range(600):
+        n = len(lyrics)
+        op = rng.randrange(5)
+        if op == 0 and n:
+            lyrics.set(rng.randrange(n), 'ts', _random_ts(rng))
+        elif op == 1 or not n:
+            lyrics.insert_lines(rng.randint(0, n), [LyricLine(_random_ts(rng)) for _ in range(rng.randint(1, 3))])
+        elif op == 2 and n > 1:
+            row = rng.randrange(n)
+            del lyrics[row:row + rng.randint(1, 3)]
+        elif op == 3 and n:
+            rows = sorted({rng.randrange(n) for _ in range(rng.randint(1, 5))})
+            lyrics.set_timestamps(rows, [_random_ts(rng) for _ in rows])
+        else:
+            lyrics[:] = [LyricLine(_random_ts(rng)) for _ in range(rng.randint(0, 30))]
+
+        fresh = TimelineIndex(lyrics)
+        fresh.detach()
+        assert (index._times, index._rows) == (fresh._times, fresh._rows)
+        timestamps = list(lyrics.timestamps)
+        if sorted(ts for ts in timestamps if ts == ts) == [ts for ts in timestamps if ts == ts]:
+            # 时间戳有序时与旧版线性扫描的结果一致
+            for seconds in (rng.uniform(-1, 61) for _ in range(5)):
+                assert index.active_row(seconds) == legacy_find_current_play_row(lyrics, seconds)
+
+
+def test_untimed_word_tag_only_line_is_skipped():
+    lrc = Lrc()
+    lrc.parse_from_text("[00:01.00]a\n<00:01.50>\nplain <00:02.00>text\n")
+    assert list(lrc.lyrics.rows()) == [(1.0, "a", ""), (None, "plain text", "")]
+
+
+def test_word_timing_before_line_is_rejected():
+    with pytest.raises(ValueError):
+        pack_word_timings(2.0, [(1.5, 0)])
+    lrc = Lrc()
+    lrc.parse_from_text("[00:02.00]<00:01.50>early <00:02.50>word\n[00:03.00]<00:03.00>ok <00:03.40>line\n")
+    assert lrc.invalid_word_timings == 1
+    assert lrc.lyrics.get(0, 'original') == "early word"
+    assert lrc.lyrics.get(0, 'words') is None
+    assert list(lrc.lyrics.get(1, 'words')) == [0, 0, 40, 3]
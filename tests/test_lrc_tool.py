@@ -0,0 +1,46 @@
+# tests/test_lrc_tool.py
+"""批量命令行工具：validate 按文件中的行序报告乱序，无效编码在解析参数时被拒绝"""
+import argparse
+import io
+
+import pytest
+
+import lrc_tool
+
+
+def _validate(path):
+    options = argparse.Namespace(command="validate", paths=[str(path)], pattern="*.lrc",
+                                 recursive=False, jobs=1, quiet=False)
+    out = io.StringIO()
+    return lrc_tool.run(options, out), out.getvalue()
+
+
+def test_validate_reports_disorder_in_file_order(tmp_path):
+    path = tmp_path / "song.lrc"
+    path.write_text("[ti:t]\n[00:03.00]c\n[00:01.00]a\n[00:02.00]b\n", encoding="utf-8")
+    code, output = _validate(path)
+    assert code == 1
+    assert "first at line 3" in output
+
+
+def test_validate_accepts_ordered_bilingual(tmp_path):
+    path = tmp_path / "song.lrc"
+    path.write_text("[00:01.00]a\n[00:01.00]A\n[00:02.00][00:05.00]b\n[00:03.00]c\n", encoding="utf-8")
+    code, output = _validate(path)
+    assert code == 0, output
+
+
+def test_unknown_encoding_is_rejected(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exc:
+        lrc_tool.build_parser().parse_args(["convert", str(tmp_path), "--encoding", "no-such-codec"])
+    assert exc.value.code == 2
+    assert "unknown encoding" in capsys.readouterr().err
+
+
+def test_lookup_error_is_reported(tmp_path):
+    path = tmp_path / "song.lrc"
+    path.write_text("[00:01.00]a\n", encoding="utf-8")
+    options = argparse.Namespace(encoding="no-such-codec", single_line=False)
+    _, ok, message, _, _ = lrc_tool.process_file(("convert", str(path), str(tmp_path / "out.lrc"), options))
+    assert not ok
+    assert message.startswith("error:")
@@ -0,0 +1,56 @@
+# tests/test_lyrics_model.py
+"""表格模型的乱序标记：随机修改后增量维护的位图必须与整体重算的结果一致"""
+import random
+
+import pytest
+
+from lrc import Lrc, LyricLine, iter_disordered_rows
+from lyrics_model import LyricsTableModel, _BULK_DISORDER_ROWS
+
+
+def _random_ts(rng):
+    return None if rng.random() < 0.2 else round(rng.uniform(0, 60), 2)
+
+
+def _check(model):
+    timestamps = model.lrc.lyrics.timestamps
+    expected = bytearray(len(timestamps))
+    for row in iter_disordered_rows(timestamps):
+        expected[row] = 1
+    assert model._disorder == expected
+    timed = [ts == ts for ts in timestamps]
+    assert model._timed == bytearray(timed)
+    for row in range(len(timestamps) + 1):
+        following = [r for r in range(row, len(timed)) if timed[r]]
+        preceding = [r for r in range(row) if timed[r]]
+        assert model._next_timed(row) == (following[0] if following else -1)
+        assert model._prev_timed(row) == (preceding[-1] if preceding else -1)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_disorder_bitmap_matches_rebuild(qapp, seed):
+    rng = random.Random(seed)
+    lrc = Lrc()
+    lrc.lyrics.extend(LyricLine(_random_ts(rng), f"line {i}") for i in range(20))
+    model = LyricsTableModel(lrc)
+    _check(model)
+    for step in range(600):
+        n = len(lrc.lyrics)
+        op = rng.randrange(5)
+        if op == 0 and n:
+            model.set_value(rng.randrange(n), 'ts', _random_ts(rng))
+        elif op == 1 and n:
+            # 少量行逐行检查，超过阈值时整体重算
+            count = rng.choice((rng.randint(1, 4), _BULK_DISORDER_ROWS + 1))
+            rows = [rng.randrange(n) for _ in range(count)]
+            model.set_timestamps(rows, [_random_ts(rng) for _ in rows])
+        elif op == 2 or not n:
+            lines = [LyricLine(_random_ts(rng), "new") for _ in range(rng.randint(1, 3))]
+            model.insert_lines(rng.randint(0, n), lines)
+        elif op == 3 and n > 1:
+            row = rng.randrange(n)
+            model.remove_rows(row, rng.randint(1, min(3, n - row)))
+        else:
+            with model.resetting():
+                lrc.lyrics[:] = [LyricLine(_random_ts(rng), "reset") for _ in range(rng.randint(0, 25))]
+        _check(model)
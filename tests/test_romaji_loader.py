@@ -0,0 +1,43 @@
+# tests/test_romaji_loader.py
+"""罗马音后台加载器：结果送回界面线程，退出时工作线程不再向已删除的对象发信号"""
+import os
+import subprocess
+import sys
+import time
+
+from romaji_loader import RomajiTooltipLoader
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 仍有大量待转换的行时直接退出解释器，不调用 shutdown()
+_EXIT_SCRIPT = """
+import time
+from PySide6.QtCore import QCoreApplication
+from romaji_loader import RomajiTooltipLoader
+app = QCoreApplication([])
+loader = RomajiTooltipLoader(lambda text: time.sleep(0.001) or text.upper())
+loader.schedule({i: f"t{i}" for i in range(5000)})
+time.sleep(0.2)
+"""
+
+
+def test_results_reach_the_ui_thread(qapp):
+    loader = RomajiTooltipLoader(str.upper)
+    received = {}
+    loader.resultsReady.connect(lambda generation, results: received.update(
+        (row, romaji) for row, _, romaji in results))
+    loader.schedule({i: f"t{i}" for i in range(200)})
+    deadline = time.monotonic() + 10
+    while len(received) < 200 and time.monotonic() < deadline:
+        qapp.processEvents()
+    loader.shutdown()
+    assert received == {i: f"T{i}" for i in range(200)}
+
+
+def test_exit_without_shutdown_does_not_emit_on_deleted_loader():
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    proc = subprocess.run([sys.executable, "-c", _EXIT_SCRIPT], cwd=_ROOT, env=env,
+                          capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    assert "Signal source has been deleted" not in proc.stderr
+    assert "Traceback" not in proc.stderr
@@ -0,0 +1,50 @@
+# tests/test_search_index.py
+"""查找索引：随机修改歌词后，增量维护的索引与逐行扫描的查找结果一致"""
+import random
+
+import pytest
+
+from lrc import LyricLine, LyricList
+from search_index import TextSearchIndex
+
+_WORDS = ["夜空", "ひかり", "君", "Love", "dream", "星", "sky", "Heart", "声", "abc"]
+_QUERIES = ["夜", "夜空", "love", "Love", "ream", "sky h", "君 声", "ab", "heart", "zz"]
+
+
+def _text(rng):
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(0, 4)))
+
+
+def _scan(lyrics, query, match_case):
+    fold = (lambda s: s) if match_case else str.lower
+    query = fold(query)
+    return [row for row, (_, original, translated) in enumerate(lyrics.rows())
+            if query in fold(original) or query in fold(translated)]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_search_matches_scan(seed):
+    rng = random.Random(seed)
+    lyrics = LyricList(LyricLine(None, _text(rng), _text(rng)) for _ in range(30))
+    index = TextSearchIndex(lyrics)
+    fields = ('original', 'translated')
+    for step in range(400):
+        n = len(lyrics)
+        op = rng.randrange(6)
+        if op == 0 and n:
+            lyrics.set(rng.randrange(n), rng.choice(fields), _text(rng))
+        elif op == 1 or not n:
+            lyrics.insert_lines(rng.randint(0, n), [LyricLine(None, _text(rng), _text(rng))
+                                                    for _ in range(rng.randint(1, 3))])
+        elif op == 2 and n > 1:
+            row = rng.randrange(n)
+            del lyrics[row:row + rng.randint(1, 3)]
+        elif op == 3 and n:
+            lyrics.set(rng.randrange(n), 'ts', rng.uniform(0, 60))
+        elif op == 4:
+            lyrics[:] = [LyricLine(None, _text(rng)) for _ in range(rng.randint(0, 30))]
+        else:
+            index.release()
+        query = rng.choice(_QUERIES)
+        match_case = rng.random() < 0.3
+        assert index.search(query, fields, match_case) == _scan(lyrics, query, match_case)
@@ -0,0 +1,32 @@
+# tests/test_tabs.py
+"""多标签页：在新标签页中打开文件后各标签页的编辑状态"""
+import pytest
+
+# 主窗口需要 QtMultimedia（Linux 上依赖 libpulse）
+pytest.importorskip("PySide6.QtMultimedia", exc_type=ImportError)
+
+from PySide6.QtWidgets import QAbstractItemView  # noqa: E402
+
+
+@pytest.fixture
+def window(qapp):
+    from main_window import MainWindow
+    window = MainWindow()
+    yield window
+    for document in window.documents:
+        document.is_dirty = False
+    window.close()
+
+
+def test_open_into_new_tab_unlocks_both_tabs(window, tmp_path):
+    for name in "ab":
+        path = tmp_path / f"{name}.lrc"
+        path.write_text(f"[00:01.00]{name}\n", encoding="utf-8")
+        window.open_lyric_file(str(path))
+        assert window.file_job.wait()
+
+    assert len(window.documents) == 2
+    assert not window.editing_locked
+    for document in window.documents:
+        assert document.view is not None
+        assert document.view.editTriggers() != QAbstractItemView.EditTrigger.NoEditTriggers
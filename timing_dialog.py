@@ -0,0 +1,162 @@
+# timing_dialog.py
+"""编辑 > 变换时间戳 对话框：对选中行或整份歌词做平移、伸缩或两点对齐"""
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QTabWidget, QWidget, QLabel, QLineEdit,
+    QRadioButton, QDoubleSpinBox, QSpinBox, QDialogButtonBox, QButtonGroup
+)
+
+from lrc import TimingTransform
+from lyrics_model import format_time, parse_time
+from i18n import LANG
+
+
+class TransformTimingsDialog(QDialog):
+    def __init__(self, lyrics, selected_rows, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(LANG["transform_title"])
+        self.lyrics = lyrics
+        self.selected_rows = sorted(selected_rows)
+        layout = QVBoxLayout(self)
+
+        # 作用范围
+        scope = QHBoxLayout()
+        self.scope_selected = QRadioButton(LANG["transform_scope_selected"].format(n=len(self.selected_rows)))
+        self.scope_all = QRadioButton(LANG["transform_scope_all"])
+        self.scope_group = QButtonGroup(self)
+        self.scope_group.addButton(self.scope_selected)
+        self.scope_group.addButton(self.scope_all)
+        self.scope_selected.setEnabled(len(self.selected_rows) > 1)
+        (self.scope_selected if len(self.selected_rows) > 1 else self.scope_all).setChecked(True)
+        scope.addWidget(self.scope_selected)
+        scope.addWidget(self.scope_all)
+        scope.addStretch()
+        layout.addLayout(scope)
+
+        self.tabs = QTabWidget()
+        layout.addWidget(self.tabs)
+
+        # 平移
+        offset_tab = QWidget()
+        form = QFormLayout(offset_tab)
+        self.offset_spin = QDoubleSpinBox()
+        self.offset_spin.setRange(-3600000, 3600000)
+        self.offset_spin.setDecimals(0)
+        self.offset_spin.setSingleStep(10)
+        self.offset_spin.setSuffix(" ms")
+        form.addRow(LANG["transform_offset"], self.offset_spin)
+        self.tabs.addTab(offset_tab, LANG["transform_tab_offset"])
+
+        # 按比例伸缩
+        scale_tab = QWidget()
+        form = QFormLayout(scale_tab)
+        self.scale_spin = QDoubleSpinBox()
+        self.scale_spin.setRange(0.01, 100.0)
+        self.scale_spin.setDecimals(6)
+        self.scale_spin.setSingleStep(0.001)
+        self.scale_spin.setValue(1.0)
+        self.origin_edit = QLineEdit(format_time(0))
+        form.addRow(LANG["transform_scale"], self.scale_spin)
+        form.addRow(LANG["transform_origin"], self.origin_edit)
+        hint = QLabel(LANG["transform_scale_hint"])
+        hint.setWordWrap(True)
+        form.addRow(hint)
+        self.tabs.addTab(scale_tab, LANG["transform_tab_scale"])
+
+        # 两点对齐
+        anchor_tab = QWidget()
+        form = QFormLayout(anchor_tab)
+        self.anchor_rows, self.anchor_labels, self.anchor_edits = [], [], []
+        for i in range(2):
+            row_spin = QSpinBox()
+            row_spin.setRange(1, max(1, len(lyrics)))
+            label = QLabel()
+            edit = QLineEdit()
+            line = QHBoxLayout()
+            line.addWidget(row_spin)
+            line.addWidget(label)
+            line.addWidget(QLabel("→"))
+            line.addWidget(edit)
+            form.addRow(LANG["transform_anchor"].format(n=i + 1), line)
+            row_spin.valueChanged.connect(lambda value, i=i: self._on_anchor_row_changed(i))
+            self.anchor_rows.append(row_spin)
+            self.anchor_labels.append(label)
+            self.anchor_edits.append(edit)
+        self.tabs.addTab(anchor_tab, LANG["transform_tab_anchors"])
+
+        self.preview_label = QLabel()
+        self.preview_label.setWordWrap(True)
+        layout.addWidget(self.preview_label)
+
+        self.buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        self.buttons.accepted.connect(self.accept)
+        self.buttons.rejected.connect(self.reject)
+        layout.addWidget(self.buttons)
+
+        self._init_anchors()
+        for signal in (self.scope_group.buttonToggled, self.tabs.currentChanged, self.offset_spin.valueChanged,
+                       self.scale_spin.valueChanged, self.origin_edit.textChanged,
+                       self.anchor_edits[0].textChanged, self.anchor_edits[1].textChanged):
+            signal.connect(self.update_preview)
+        self.update_preview()
+
+    def _init_anchors(self):
+        """默认以范围内第一个和最后一个有时间戳的行作为锚点"""
+        rows = self.rows()
+        if rows:
+            self.anchor_rows[0].setValue(rows[0] + 1)
+            self.anchor_rows[1].setValue(rows[-1] + 1)
+        for i in range(2):
+            self._on_anchor_row_changed(i)
+
+    def _on_anchor_row_changed(self, i):
+        ts = self.lyrics.get(self.anchor_rows[i].value() - 1, 'ts') if len(self.lyrics) else None
+        self.anchor_labels[i].setText(format_time(ts * 1000) if ts is not None else LANG["transform_no_ts"])
+        self.anchor_edits[i].setText(format_time(ts * 1000) if ts is not None else "")
+
+    def rows(self):
+        """作用范围内有时间戳的行"""
+        rows = self.selected_rows if self.scope_selected.isChecked() else range(len(self.lyrics))
+        timestamps = self.lyrics.timestamps
+        return [row for row in rows if timestamps[row] == timestamps[row]]
+
+    def transform(self):
+        """根据当前输入构造变换，输入无效时抛出 ValueError"""
+        tab = self.tabs.currentIndex()
+        if tab == 0:
+            return TimingTransform.shift(self.offset_spin.value() / 1000.0)
+        if tab == 1:
+            origin = parse_time(self.origin_edit.text())
+            if origin is None:
+                raise ValueError(LANG["transform_bad_time"])
+            return TimingTransform.stretch(self.scale_spin.value(), origin)
+        sources = [self.lyrics.get(spin.value() - 1, 'ts') for spin in self.anchor_rows]
+        targets = [parse_time(edit.text()) for edit in self.anchor_edits]
+        if None in sources:
+            raise ValueError(LANG["transform_no_ts"])
+        if None in targets:
+            raise ValueError(LANG["transform_bad_time"])
+        try:
+            return TimingTransform.from_anchors(sources[0], targets[0], sources[1], targets[1])
+        except ValueError:
+            raise ValueError(LANG["transform_bad_anchors"]) from None
+
+    def update_preview(self, *args):
+        ok = self.buttons.button(QDialogButtonBox.StandardButton.Ok)
+        rows = self.rows()
+        try:
+            transform = self.transform()
+        except ValueError as e:
+            self.preview_label.setText(str(e))
+            ok.setEnabled(False)
+            return
+        ok.setEnabled(bool(rows))
+        if not rows:
+            self.preview_label.setText(LANG["transform_nothing"])
+            return
+        first, last = rows[0], rows[-1]
+        old = [self.lyrics.get(first, 'ts'), self.lyrics.get(last, 'ts')]
+        new = transform.apply(old)
+        self.preview_label.setText(LANG["transform_preview"].format(
+            n=len(rows), first=first + 1, last=last + 1,
+            a=format_time(old[0] * 1000), b=format_time(new[0] * 1000),
+            c=format_time(old[1] * 1000), d=format_time(new[1] * 1000)))
@@ -0,0 +1,320 @@
+# waveform.py
+"""波形条：后台解码音频，生成多级 min/max 峰值金字塔并缓存到磁盘，绘制时按缩放级别取用"""
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from PySide6.QtCore import Qt, QLineF, QPointF, QRectF, QStandardPaths, Signal
+from PySide6.QtGui import QColor, QPainter, QPen
+from PySide6.QtWidgets import QWidget
+
+from i18n import LANG
+
+# 金字塔第 0 级每块的样本数，以及相邻两级之间的倍数
+_BASE_BLOCK = 256
+_LEVEL_FACTOR = 4
+# 最粗一级不少于这么多块，再粗就没有意义了
+_MIN_LEVEL_BLOCKS = 512
+_CACHE_VERSION = 1
+_HASH_CHUNK = 1 << 20
+
+
+class PeakPyramid:
+    """多级峰值金字塔：每级是 (块数, 2) 的 float32 数组，两列分别是块内最小值和最大值"""
+    def __init__(self, sample_rate, levels, base_block=_BASE_BLOCK, factor=_LEVEL_FACTOR):
+        self.sample_rate = sample_rate
+        self.levels = levels
+        self.base_block = base_block
+        self.factor = factor
+
+    @property
+    def duration(self):
+        """音频时长（秒，按第 0 级块数估算）"""
+        if not self.levels:
+            return 0.0
+        return len(self.levels[0]) * self.base_block / self.sample_rate
+
+    def block_size(self, level):
+        return self.base_block * self.factor ** level
+
+    @classmethod
+    def from_base(cls, sample_rate, base, base_block=_BASE_BLOCK, factor=_LEVEL_FACTOR):
+        """由第 0 级逐级归并出更粗的级别"""
+        levels = [base]
+        while len(levels[-1]) >= _MIN_LEVEL_BLOCKS * factor:
+            prev = levels[-1]
+            n = len(prev) // factor * factor
+            grouped = prev[:n].reshape(-1, factor, 2)
+            level = np.empty((len(grouped) + (n < len(prev)), 2), dtype=np.float32)
+            level[:len(grouped), 0] = grouped[:, :, 0].min(axis=1)
+            level[:len(grouped), 1] = grouped[:, :, 1].max(axis=1)
+            if n < len(prev):
+                level[-1, 0] = prev[n:, 0].min()
+                level[-1, 1] = prev[n:, 1].max()
+            levels.append(level)
+        return cls(sample_rate, levels, base_block, factor)
+
+    def pixel_peaks(self, start, span, width):
+        """计算 [start, start + span) 秒在 width 个像素上的 (最小值, 最大值) 数组。
+
+        选择每像素至少包含一块的最粗级别，再用 reduceat 按像素边界归并。
+        返回的数组可能短于 width（视图超出音频末尾时）。
+        """
+        empty = np.empty(0, dtype=np.float32)
+        if width <= 0 or span <= 0 or not self.levels or not len(self.levels[0]):
+            return empty, empty
+        samples_per_px = span * self.sample_rate / width
+        level = 0
+        while level + 1 < len(self.levels) and self.block_size(level + 1) <= samples_per_px:
+            level += 1
+        peaks = self.levels[level]
+        block = self.block_size(level)
+        n = len(peaks)
+        edges = (start * self.sample_rate + np.arange(width + 1) * samples_per_px) / block
+        edges = np.clip(edges.astype(np.int64), 0, n)
+        count = int(np.searchsorted(edges[:-1], n))  # 起点仍在音频内的像素数
+        if not count:
+            return empty, empty
+        lo = edges[:count]
+        hi = max(int(edges[count]), int(lo[-1]) + 1)
+        mins = np.minimum.reduceat(peaks[:hi, 0], lo)
+        maxs = np.maximum.reduceat(peaks[:hi, 1], lo)
+        return mins, maxs
+
+    # ---- 磁盘缓存 ----
+
+    def save(self, path):
+        """写入 path（.npy 数据）和 path + '.json'（级别索引）。两者都先写临时文件再替换"""
+        directory = os.path.dirname(path)
+        data = np.concatenate(self.levels) if self.levels else np.empty((0, 2), dtype=np.float32)
+        offsets, offset = [], 0
+        for level in self.levels:
+            offsets.append([offset, len(level)])
+            offset += len(level)
+        header = {"version": _CACHE_VERSION, "sample_rate": self.sample_rate,
+                  "base_block": self.base_block, "factor": self.factor, "levels": offsets}
+
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".npy.tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, data)
+            os.replace(tmp, path)
+            # 索引最后写入：只有索引存在时缓存才被视为完整
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix=".json.tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(header, f)
+            os.replace(tmp, path + ".json")
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """内存映射方式加载缓存；缓存不存在或版本不符时返回 None"""
+        try:
+            with open(path + ".json", encoding='utf-8') as f:
+                header = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if header.get("version") != _CACHE_VERSION:
+            return None
+        try:
+            data = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        levels = [data[offset:offset + count] for offset, count in header["levels"]]
+        return cls(header["sample_rate"], levels, header["base_block"], header["factor"])
+
+
+class PeakAccumulator:
+    """解码接收器：边解码边计算第 0 级峰值，结束时生成金字塔并写入缓存"""
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        self.cache_path = None
+        self.sample_rate = 0
+        self._chunks = []
+        self._tail = np.empty(0, dtype=np.float32)
+
+    def prepare(self, audio_path):
+        """在工作线程中计算缓存键；命中缓存则直接返回金字塔，跳过解码"""
+        if not self.cache_dir:
+            return None
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.cache_path = peak_cache_path(self.cache_dir, peak_cache_key(audio_path))
+        return PeakPyramid.load(self.cache_path)
+
+    def begin(self, sample_rate):
+        self.sample_rate = sample_rate
+
+    def feed(self, samples):
+        if len(self._tail):
+            samples = np.concatenate((self._tail, samples))
+        n = len(samples) // _BASE_BLOCK * _BASE_BLOCK
+        if n:
+            blocks = samples[:n].reshape(-1, _BASE_BLOCK)
+            peaks = np.empty((len(blocks), 2), dtype=np.float32)
+            peaks[:, 0] = blocks.min(axis=1)
+            peaks[:, 1] = blocks.max(axis=1)
+            self._chunks.append(peaks)
+        self._tail = samples[n:].copy()
+
+    def finish(self):
+        chunks = self._chunks
+        if len(self._tail):
+            chunks.append(np.array([[self._tail.min(), self._tail.max()]], dtype=np.float32))
+        base = np.concatenate(chunks) if chunks else np.empty((0, 2), dtype=np.float32)
+        pyramid = PeakPyramid.from_base(self.sample_rate, base)
+        if self.cache_path:
+            try:
+                pyramid.save(self.cache_path)
+            except OSError:
+                pass  # 缓存写入失败不影响显示
+        return pyramid
+
+
+def peak_cache_key(audio_path):
+    """缓存键：文件内容哈希 + 修改时间"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(audio_path, 'rb') as f:
+        while True:
+            chunk = f.read(_HASH_CHUNK)
+            if not chunk:
+                break
+            digest.update(chunk)
+    mtime = os.stat(audio_path).st_mtime_ns
+    return f"{digest.hexdigest()}-{mtime}"
+
+
+def peak_cache_path(cache_dir, key):
+    return os.path.join(cache_dir, key + ".npy")
+
+
+def default_cache_dir():
+    base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+    return os.path.join(base, "waveforms") if base else None
+
+
+class WaveformView(QWidget):
+    """波形条：显示当前视窗内的波形、歌词时间戳标记和播放位置。
+
+    单击跳转播放位置，滚轮以鼠标位置为中心缩放。播放位置离开视窗时自动翻页。
+    """
+    seekRequested = Signal(int)  # 毫秒
+
+    _MIN_SPAN = 0.5
+
+    def __init__(self, lrc, parent=None):
+        super().__init__(parent)
+        self.lrc = lrc
+        self.pyramid = None
+        self.message = ""
+        self.position = 0.0      # 秒
+        self.view_start = 0.0    # 秒
+        self.view_span = 10.0    # 秒
+        self.setMinimumHeight(70)
+        self.setMaximumHeight(110)
+
+        self.background_color = QColor("#1E1E1E")
+        self.wave_color = QColor("#4FC3F7")
+        self.marker_color = QColor("#FFB74D")
+        self.cursor_color = QColor("#FFFFFF")
+
+    def set_lrc(self, lrc):
+        """切换显示时间戳标记的歌词（切换标签页时）"""
+        self.lrc = lrc
+        self.update()
+
+    def set_pyramid(self, pyramid):
+        self.pyramid = pyramid
+        self.message = ""
+        self.view_start = 0.0
+        self.update()
+
+    def set_loading(self, fraction=None):
+        text = LANG["waveform_loading"]
+        self.set_message(text if fraction is None else f"{text} {fraction:.0%}")
+
+    def set_message(self, message):
+        """没有波形时显示的提示（加载中、失败等）"""
+        self.pyramid = None
+        self.message = message
+        self.update()
+
+    def set_position(self, ms):
+        """更新播放位置，返回是否需要重绘"""
+        seconds = ms / 1000.0
+        if seconds == self.position:
+            return False
+        old_x = self._seconds_to_x(self.position)
+        self.position = seconds
+        if not self.view_start <= seconds < self.view_start + self.view_span:
+            self.view_start = max(0.0, seconds - self.view_span * 0.1)
+        elif self._seconds_to_x(seconds) == old_x:
+            return False  # 播放线没有移动到新的像素
+        self.update()
+        return True
+
+    def _seconds_to_x(self, seconds):
+        return int((seconds - self.view_start) * self.width() / self.view_span)
+
+    def _x_to_seconds(self, x):
+        return self.view_start + x / max(1, self.width()) * self.view_span
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton and self.pyramid is not None:
+            seconds = max(0.0, self._x_to_seconds(event.position().x()))
+            self.seekRequested.emit(int(seconds * 1000))
+
+    def wheelEvent(self, event):
+        if self.pyramid is None:
+            return
+        anchor = self._x_to_seconds(event.position().x())
+        factor = 0.8 if event.angleDelta().y() > 0 else 1.25
+        duration = max(self.pyramid.duration, self._MIN_SPAN)
+        span = min(max(self.view_span * factor, self._MIN_SPAN), duration)
+        ratio = (anchor - self.view_start) / self.view_span
+        self.view_start = max(0.0, anchor - ratio * span)
+        self.view_span = span
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        width, height = self.width(), self.height()
+        painter.fillRect(self.rect(), self.background_color)
+
+        if self.pyramid is None:
+            if self.message:
+                painter.setPen(self.cursor_color)
+                painter.drawText(QRectF(0, 0, width, height), Qt.AlignmentFlag.AlignCenter, self.message)
+            return
+
+        mid = height / 2.0
+        half = height / 2.0 - 2
+        mins, maxs = self.pyramid.pixel_peaks(self.view_start, self.view_span, width)
+        if len(mins):
+            tops = mid - np.clip(maxs, -1.0, 1.0) * half
+            bottoms = mid - np.clip(mins, -1.0, 1.0) * half
+            painter.setPen(QPen(self.wave_color, 1))
+            painter.drawLines([QLineF(x, top, x, bottom) for x, (top, bottom) in
+                               enumerate(zip(tops.tolist(), bottoms.tolist()))])
+
+        # 歌词时间戳标记：只取视窗内的时间戳（时间轴索引二分查找）
+        end = self.view_start + self.view_span
+        scale = width / self.view_span
+        painter.setPen(QPen(self.marker_color, 1))
+        for ts, row in self.lrc.timeline.items_between(self.view_start, end):
+            x = (ts - self.view_start) * scale
+            painter.drawLine(QLineF(x, 0, x, height))
+            painter.drawText(QPointF(x + 2, 11), str(row + 1))
+
+        if self.view_start <= self.position < end:
+            x = (self.position - self.view_start) * scale
+            painter.setPen(QPen(self.cursor_color, 1))
+            painter.drawLine(QLineF(x, 0, x, height))
+